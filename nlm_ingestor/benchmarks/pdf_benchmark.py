@@ -0,0 +1,243 @@
+"""
+End to end benchmark of the PDF pipeline over a directory of documents.
+
+The tika output is replayed from the recordings in TIKA_RECORDINGS_DIR (see
+`make record-tika`), so only the python side of the pipeline is measured.
+The page and sentence worker pools are turned off, as the stages run in worker
+processes would not be recorded.
+For every document the wall time and peak memory of each pipeline stage
+(see ingestor_utils.stage_timer) is written to a JSON file:
+
+    python -m nlm_ingestor.benchmarks.pdf_benchmark run --output bench.json
+
+Time and memory are measured in separate passes, as tracing allocations slows the
+pipeline down. Two result files can be compared to flag regressions:
+
+    python -m nlm_ingestor.benchmarks.pdf_benchmark compare baseline.json bench.json
+"""
+
+import argparse
+import contextlib
+import datetime
+import glob
+import io
+import json
+import os
+import platform
+import sys
+import traceback
+
+from nlm_ingestor.ingestor_utils import stage_timer
+
+TOTAL_STAGE = "total"
+# stages only record in the process that runs the benchmark
+SERIAL_WORKERS = {"PDF_PAGE_WORKERS": "1", "SENT_TOKENIZE_WORKERS": "1"}
+
+
+def parse_document(doc_location, render_format):
+    # imported late so that TIKA_MODE is set before the parser module is loaded
+    from nlm_ingestor.ingestor import pdf_ingestor
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        with stage_timer.stage(TOTAL_STAGE):
+            ingestor = pdf_ingestor.PDFIngestor(
+                doc_location, {"render_format": render_format}
+            )
+    return ingestor.return_dict
+
+
+def benchmark_document(doc_location, render_format="all", repeat=1, memory=True):
+    """
+    :param doc_location: PDF file with a tika recording
+    :param repeat: Number of timed runs, the fastest one is kept
+    :param memory: Run an extra pass to record the peak memory of every stage
+    :return: Dict with the number of pages and the stats of every stage
+    """
+    best = None
+    for _ in range(max(repeat, 1)):
+        with stage_timer.StageRecorder() as recorder:
+            return_dict = parse_document(doc_location, render_format)
+        stages = recorder.stages
+        if (
+            best is None
+            or stages[TOTAL_STAGE]["wall_ms"] < best[TOTAL_STAGE]["wall_ms"]
+        ):
+            best = stages
+    if memory:
+        with stage_timer.StageRecorder(trace_memory=True) as recorder:
+            parse_document(doc_location, render_format)
+        for name, stats in recorder.stages.items():
+            if name in best:
+                best[name]["peak_mem_mb"] = stats["peak_mem_mb"]
+    for stats in best.values():
+        stats["wall_ms"] = round(stats["wall_ms"], 3)
+        stats["peak_mem_mb"] = round(stats["peak_mem_mb"], 3)
+    return {
+        "num_pages": return_dict.get("num_pages", 0) + 1,
+        "stages": best,
+    }
+
+
+def run(args):
+    os.environ.setdefault("TIKA_MODE", "replay")
+    os.environ.setdefault("TIKA_CACHE", "no")
+    os.environ.update(SERIAL_WORKERS)
+    print(f"worker pools are off: {', '.join(sorted(SERIAL_WORKERS))} set to 1")
+    from nlm_ingestor.ingestor import VERSION
+
+    results = {
+        "version": VERSION,
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "tika_mode": os.environ["TIKA_MODE"],
+        "workers": {key: int(value) for key, value in SERIAL_WORKERS.items()},
+        "render_format": args.render_format,
+        "documents": {},
+        "errors": {},
+    }
+    doc_locations = sorted(glob.glob(os.path.join(args.doc_dir, "*.pdf")))
+    if os.environ["TIKA_MODE"] == "replay":
+        from nlm_ingestor.file_parser.tika_parser import get_recorded_documents
+
+        recorded = get_recorded_documents(args.doc_dir)
+        if not recorded:
+            print(f"no tika recordings for {args.doc_dir}, run make fixtures")
+            return 1
+        for doc_location in sorted(set(doc_locations) - set(recorded)):
+            print(f"skipping {os.path.basename(doc_location)}, it is not recorded")
+        doc_locations = recorded
+    for doc_location in doc_locations:
+        doc_name = os.path.basename(doc_location)
+        try:
+            doc_stats = benchmark_document(
+                doc_location,
+                render_format=args.render_format,
+                repeat=args.repeat,
+                memory=not args.no_memory,
+            )
+        except Exception as e:
+            print(
+                f"error benchmarking {doc_name}, stacktrace: ", traceback.format_exc()
+            )
+            results["errors"][doc_name] = str(e)
+            continue
+        results["documents"][doc_name] = doc_stats
+        total = doc_stats["stages"][TOTAL_STAGE]
+        print(
+            f"{doc_name[:60]:60s} {doc_stats['num_pages']:4d} pages "
+            f"{total['wall_ms']:10.1f}ms {total['peak_mem_mb']:8.1f}MB"
+        )
+    with open(args.output, "w") as file:
+        json.dump(results, file, indent=2, sort_keys=True)
+    print(f"wrote results for {len(results['documents'])} documents to {args.output}")
+    return 1 if results["errors"] else 0
+
+
+def compare_results(
+    baseline,
+    current,
+    time_threshold=0.2,
+    memory_threshold=0.2,
+    min_ms=10.0,
+    min_mb=1.0,
+):
+    """
+    Compares two benchmark results stage by stage.
+    A stage regresses when it got slower (or used more memory) by more than the
+    threshold ratio and by more than the absolute minimum, which keeps short stages
+    from being flagged for noise.
+    :return: List of (document, stage, metric, baseline value, current value)
+    """
+    regressions = []
+    checks = (
+        ("wall_ms", time_threshold, min_ms),
+        ("peak_mem_mb", memory_threshold, min_mb),
+    )
+    for doc_name, base_doc in baseline["documents"].items():
+        curr_doc = current["documents"].get(doc_name)
+        if curr_doc is None:
+            continue
+        for stage_name, base_stats in base_doc["stages"].items():
+            curr_stats = curr_doc["stages"].get(stage_name)
+            if curr_stats is None:
+                continue
+            for metric, threshold, minimum in checks:
+                base_value = base_stats.get(metric, 0)
+                curr_value = curr_stats.get(metric, 0)
+                if (
+                    curr_value > base_value * (1 + threshold)
+                    and curr_value - base_value > minimum
+                ):
+                    regressions.append(
+                        (doc_name, stage_name, metric, base_value, curr_value)
+                    )
+    return regressions
+
+
+def compare(args):
+    if not os.path.exists(args.baseline):
+        print(f"no baseline at {args.baseline}, run make fixtures")
+        return 1
+    with open(args.baseline) as file:
+        baseline = json.load(file)
+    with open(args.current) as file:
+        current = json.load(file)
+    missing = set(baseline["documents"]) - set(current["documents"])
+    for doc_name in sorted(missing):
+        print(f"missing from current results: {doc_name}")
+    regressions = compare_results(
+        baseline,
+        current,
+        time_threshold=args.time_threshold,
+        memory_threshold=args.memory_threshold,
+        min_ms=args.min_ms,
+        min_mb=args.min_mb,
+    )
+    for doc_name, stage_name, metric, base_value, curr_value in regressions:
+        change = (curr_value / base_value - 1) * 100 if base_value else float("inf")
+        print(
+            f"REGRESSION {doc_name[:50]:50s} {stage_name:28s} {metric:12s} "
+            f"{base_value:10.1f} -> {curr_value:10.1f} (+{change:.0f}%)"
+        )
+    if not regressions:
+        print(
+            f"no regressions in {len(current['documents'])} documents "
+            f"(baseline version {baseline.get('version')}, "
+            f"current version {current.get('version')})"
+        )
+    return 1 if regressions else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the PDF pipeline")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="benchmark a directory of PDFs")
+    run_parser.add_argument("--doc-dir", default="files/pdf")
+    run_parser.add_argument("--output", default="bench_results.json")
+    run_parser.add_argument("--render-format", default="all")
+    run_parser.add_argument(
+        "--repeat", type=int, default=1, help="timed runs, the fastest is kept"
+    )
+    run_parser.add_argument(
+        "--no-memory", action="store_true", help="skip the memory tracing pass"
+    )
+    run_parser.set_defaults(func=run)
+
+    compare_parser = subparsers.add_parser(
+        "compare", help="flag regressions against a baseline"
+    )
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--time-threshold", type=float, default=0.2)
+    compare_parser.add_argument("--memory-threshold", type=float, default=0.2)
+    compare_parser.add_argument("--min-ms", type=float, default=10.0)
+    compare_parser.add_argument("--min-mb", type=float, default=1.0)
+    compare_parser.set_defaults(func=compare)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
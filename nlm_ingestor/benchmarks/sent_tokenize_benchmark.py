@@ -0,0 +1,121 @@
+"""
+Microbenchmark of the sentence tokenizer.
+
+Times utils.sent_tokenize against the reference tokenizer that ran every
+abbreviation rule over each paragraph, on the lines of the text files in
+files/text (the block texts of the test documents), and checks that both split
+them the same way:
+
+    python -m nlm_ingestor.benchmarks.sent_tokenize_benchmark
+"""
+
+import argparse
+import glob
+import os
+import re
+import sys
+from timeit import default_timer
+
+from nlm_ingestor.ingestor_utils import utils
+from nlm_ingestor.ingestor_utils.utils import sent_tokenize
+
+
+def sent_tokenize_reference(org_texts):
+    """
+    sent_tokenize as it was before the abbreviation rules that match were found in
+    a single pass, kept to check that both split the texts the same way.
+    """
+    if not org_texts:
+        return org_texts
+
+    sents = []
+
+    for org_text in org_texts.split("\n"):
+        org_text = utils.space_rule.sub(r"\1", org_text)
+        modified_text = re.sub(r"^([.,?!]\s+)+", "", org_text)
+        orig_offset = abs(len(org_text) - len(modified_text))
+
+        for span_group in utils.bracket_rule.finditer(modified_text):
+            start_byte, end_byte = span_group.span()
+            span = modified_text[start_byte:end_byte]
+            modified_text = modified_text.replace(
+                f"({span})",
+                f"_{span.replace('.','_')}_",
+            )
+
+        for rule, replaced in utils.rules:
+            modified_text = rule.sub(replaced, modified_text)
+        modified_text = utils.quotation_pattern.sub('"', modified_text)
+
+        modified_sents = utils.nltk_tokenzier.tokenize(modified_text)
+
+        offset = orig_offset
+        sent_idx = 0
+        while offset < len(modified_text) and sent_idx < len(modified_sents):
+            if modified_text[offset] == " ":
+                offset += 1
+                continue
+            modified_sent = modified_sents[sent_idx]
+            sents.append(org_text[offset : offset + len(modified_sent)])
+            offset += len(modified_sent)
+            sent_idx += 1
+    if len(sents) >= 2 and re.match(r"^.\.$", sents[0]):
+        sents[1] = sents[0] + " " + sents[1]
+        sents = sents[1:]
+
+    return sents
+
+
+def read_block_texts(text_dir):
+    """
+    :return: Non empty lines of the text files in text_dir
+    """
+    block_texts = []
+    for text_path in sorted(glob.glob(os.path.join(text_dir, "*.txt"))):
+        with open(text_path) as text_file:
+            block_texts += [line for line in text_file.read().split("\n") if line]
+    return block_texts
+
+
+def time_tokenize(tokenize_fn, block_texts, repeat):
+    best = None
+    for _ in range(repeat):
+        start = default_timer()
+        for block_text in block_texts:
+            tokenize_fn(block_text)
+        elapsed = default_timer() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark sentence tokenization")
+    parser.add_argument("--text-dir", default="files/text")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    block_texts = read_block_texts(args.text_dir)
+    num_chars = sum(len(block_text) for block_text in block_texts)
+    same_sents = all(
+        sent_tokenize(block_text) == sent_tokenize_reference(block_text)
+        for block_text in block_texts
+    )
+    reference_s = time_tokenize(sent_tokenize_reference, block_texts, args.repeat)
+    current_s = time_tokenize(sent_tokenize, block_texts, args.repeat)
+    print(
+        f"block texts: {len(block_texts)}, chars: {num_chars}, "
+        f"abbreviation rules: {len(utils.rules)}"
+    )
+    print(f"same sentences as reference: {same_sents}")
+    for name, elapsed in [("all rules", reference_s), ("sent_tokenize", current_s)]:
+        texts_per_s = len(block_texts) / elapsed
+        print(
+            f"{name}: {elapsed * 1000:.1f}ms, {texts_per_s:.0f} texts/s, "
+            f"{num_chars / elapsed / 1e6:.2f} MB/s"
+        )
+    print(f"speedup: {reference_s / current_s:.2f}x")
+    return 0 if same_sents else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
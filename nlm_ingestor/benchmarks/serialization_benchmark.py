@@ -0,0 +1,146 @@
+"""
+Microbenchmark of the serialization of an ingestion result.
+
+Times the json.dumps with NpEncoder that flask's jsonify and the caches used, on a
+result with numpy numbers as the stats used to leave, against encoding.dumps on
+the same result with plain python numbers, and the encoding and decoding of the
+result in each format of encoding.mimetypes(), for a synthetic document:
+
+    python -m nlm_ingestor.benchmarks.serialization_benchmark --pages 500
+"""
+
+import argparse
+import json
+import random
+import sys
+from timeit import default_timer
+
+import numpy as np
+
+from nlm_ingestor.ingestor_utils import encoding
+from nlm_ingestor.ingestor_utils.utils import NpEncoder
+
+
+def make_result(num_pages, use_numpy, seed=0):
+    """
+    :return: return_dict of a document of num_pages pages of paras and a table,
+    with numpy numbers in the bboxes if use_numpy
+    """
+    rng = random.Random(seed)
+    number = np.float64 if use_numpy else float
+    blocks = []
+    for page_idx in range(num_pages):
+        for block_idx in range(30):
+            top = number(round(rng.uniform(40.0, 750.0), 3))
+            left = number(round(rng.uniform(40.0, 300.0), 3))
+            blocks.append(
+                {
+                    "tag": "para",
+                    "page_idx": page_idx,
+                    "block_class": f"cls_{block_idx % 7}",
+                    "sentences": [
+                        " ".join(f"word{rng.randint(0, 999)}" for _ in range(20))
+                        for _ in range(3)
+                    ],
+                    "block_idx": len(blocks),
+                    "bbox": [left, top, left + number(250.0), top + number(12.0)],
+                    "level": block_idx % 3,
+                }
+            )
+        blocks.append(
+            {
+                "tag": "table",
+                "page_idx": page_idx,
+                "block_class": "cls_0",
+                "top": number(500.0),
+                "left": number(50.0),
+                "name": "",
+                "block_idx": len(blocks),
+                "table_rows": [
+                    {
+                        "type": "table_data_row",
+                        "cells": [{"cell_value": f"{rng.random():.2f}"}] * 5,
+                        "block_idx": len(blocks),
+                    }
+                    for _ in range(10)
+                ],
+                "bbox": [number(50.0), number(500.0), number(550.0), number(700.0)],
+            }
+        )
+    return {
+        "page_dim": [number(612.0), number(792.0)],
+        "num_pages": num_pages,
+        "result": {"styles": [], "blocks": blocks},
+    }
+
+
+def time_dumps(dumps_fn, obj, repeat):
+    best = None
+    for _ in range(repeat):
+        start = default_timer()
+        dumps_fn(obj)
+        elapsed = default_timer() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark result serialization")
+    parser.add_argument("--pages", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    numpy_result = make_result(args.pages, use_numpy=True)
+    native_result = make_result(args.pages, use_numpy=False)
+
+    def stdlib_dumps(obj):
+        return json.dumps(
+            obj, cls=NpEncoder, sort_keys=True, separators=(",", ":")
+        ).encode("utf-8")
+
+    def fast_dumps(obj):
+        return encoding.dumps(obj, sort_keys=True)
+
+    same_json = json.loads(stdlib_dumps(numpy_result)) == json.loads(
+        fast_dumps(native_result)
+    )
+    timings = [
+        (name, time_dumps(fn, result, args.repeat))
+        for name, fn, result in [
+            ("json + NpEncoder, numpy values", stdlib_dumps, numpy_result),
+            ("json + NpEncoder, native values", stdlib_dumps, native_result),
+            ("encoding.dumps, native values", fast_dumps, native_result),
+        ]
+    ]
+    print(
+        f"pages: {args.pages}, bytes: {len(fast_dumps(native_result))}, "
+        f"orjson: {encoding.orjson is not None}, "
+        f"ormsgpack: {encoding.ormsgpack is not None}"
+    )
+    print(f"same json: {same_json}")
+    for name, elapsed in timings:
+        print(f"{name}: {elapsed * 1000:.1f}ms")
+    print(f"speedup: {timings[0][1] / timings[-1][1]:.2f}x")
+
+    json_result = encoding.loads(fast_dumps(native_result))
+    for mimetype in encoding.mimetypes():
+        if mimetype in encoding.MSGPACK_MIMETYPES[1:]:
+            continue
+        data = encoding.encode(native_result, mimetype)
+        same_json = same_json and encoding.decode(data, mimetype) == json_result
+        encode_s = time_dumps(
+            lambda obj: encoding.encode(obj, mimetype), native_result, args.repeat
+        )
+        decode_s = time_dumps(
+            lambda data: encoding.decode(data, mimetype), data, args.repeat
+        )
+        print(
+            f"{mimetype}: {len(data)} bytes, encode {encode_s * 1000:.1f}ms, "
+            f"decode {decode_s * 1000:.1f}ms"
+        )
+    print(f"same result in every format: {same_json}")
+    return 0 if same_json else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,182 @@
+"""
+Microbenchmark of the tika style parser.
+
+Times style_utils.parse_tika_style against the reference parser it replaced on the
+p tags of the tika recordings in TIKA_RECORDINGS_DIR and checks that both produce
+the same output:
+
+    python -m nlm_ingestor.benchmarks.style_benchmark
+"""
+
+import argparse
+import glob
+import gzip
+import json
+import os
+import sys
+from timeit import default_timer
+
+from nlm_ingestor.file_parser.tika_parser import get_recording_path
+from nlm_ingestor.ingestor.visual_ingestor import style_utils
+from nlm_ingestor.ingestor.visual_ingestor.page_reader import TikaPageReader
+from nlm_ingestor.ingestor_utils.ing_named_tuples import BoxStyle, LineStyle
+
+
+def get_style_kv_reference(style_str):
+    parts = style_str.split(";")
+    input_style = {}
+    for part in parts:
+        kv = part.split(":")
+        if len(kv) == 2:
+            input_style[kv[0].strip()] = kv[1].strip()
+    return input_style
+
+
+def parse_tika_style_reference(
+    style_str: str, text_str: str, page_width: float
+) -> dict:
+    """
+    The straightforward style parser that style_utils.parse_tika_style replaced
+    (along with get_style_kv), kept to check that both produce the same output.
+    """
+
+    input_style = get_style_kv_reference(style_str)
+    word_start_pos = input_style["word-start-positions"][2:-2].split("), (")
+    word_end_pos = input_style["word-end-positions"][2:-2].split("), (")
+    word_fonts = input_style["word-fonts"][2:-2].split("), (")
+    left = round(float(word_start_pos[0].split(",")[0]), 2)
+    right = round(float(word_end_pos[-1].split(",")[0]), 2)
+    # height = style_utils.parse_px(input_style['height'])
+    font_size_height = style_utils.parse_px(input_style["font-size"])
+    if right < left:
+        # We have some issues here with Tika
+        # Are all the word end positions having the same top? aka, same line are we dealing with?
+        same_top = True
+        for idx, _ in enumerate(word_end_pos[:-1]):
+            if (
+                abs(
+                    round(float(word_end_pos[idx].split(",")[1]), 2)
+                    - round(float(word_end_pos[idx + 1].split(",")[1]), 2)
+                )
+                <= 2
+            ):
+                same_top = True
+            else:
+                same_top = False
+                break
+        # We are on the same Visual Line and we cannot have a right before left.
+        if same_top:
+            last_word_start_pos = round(float(word_start_pos[-1].split(",")[0]), 2)
+            if last_word_start_pos >= right:
+                last_word_len = len(text_str.split()[-1].strip())
+                font_space_width = round(float(word_fonts[-1].split(",")[5]), 2)
+                right = last_word_start_pos + (last_word_len * font_space_width)
+            else:
+                # Last word also is on the left side of the first word.
+                font_space_width = round(float(word_fonts[0].split(",")[5]), 2)
+                right = left + (len(text_str) * font_space_width)
+    box_style = BoxStyle(
+        style_utils.parse_px(input_style["top"]),
+        left,
+        right,
+        right - left,
+        font_size_height,
+    )
+    font_family = input_style["font-family"]
+    font_weight = input_style["font-weight"]
+    font_weight = style_utils.get_numeric_font_weight(font_family, font_weight)
+    font_size = round(style_utils.font_scale * font_size_height, 1)
+    text_transform = "none"  # "uppercase" if text_str.isupper() else "none"
+    text_align = "left"  # "center" if is_center_aligned else "left"
+    font_space_width = 1.5
+    word_line_styles = []
+    for wf_idx, wf in enumerate(word_fonts):
+        if "," in font_family and font_family in wf:
+            new_font_family = font_family.replace(",", "-")
+            wf = wf.replace(font_family, new_font_family)
+        wf_parts = wf.split(",")
+        wf_font_space_width = round(float(wf_parts[5]), 2)
+        word_line_styles.append(
+            LineStyle(
+                wf_parts[0],
+                wf_parts[2],
+                round(style_utils.font_scale * float(wf_parts[3]), 1),
+                style_utils.get_numeric_font_weight(wf_parts[0], wf_parts[1]),
+                text_transform,
+                wf_font_space_width,
+                text_align,
+            )
+        )
+        if wf_idx == 0:
+            font_space_width = wf_font_space_width
+
+    line_style = LineStyle(
+        font_family,
+        input_style["font-style"],
+        font_size,
+        font_weight,
+        text_transform,
+        font_space_width,
+        text_align,
+    )
+    # print(word_start_pos[1])
+    # for word_font in word_fonts:
+    #     print(word_font)
+    return box_style, line_style, word_line_styles
+
+
+def load_lines(recordings_dir):
+    """
+    :return: List of (style, text, page width) of the non empty p tags in the recordings
+    """
+    lines = []
+    for recording in sorted(glob.glob(os.path.join(recordings_dir, "*.json.gz"))):
+        with gzip.open(recording, "rt", encoding="utf-8") as file:
+            content = json.load(file).get("content") or ""
+        for page in TikaPageReader(content):
+            page_style_kv = style_utils.get_style_kv(page.attrs["style"])
+            page_width = style_utils.parse_px(page_style_kv["width"])
+            for p in page.find_all("p"):
+                if p.text.strip():
+                    lines.append((p["style"], p.text, page_width))
+    return lines
+
+
+def time_parser(parser, lines, repeat):
+    best = None
+    for _ in range(repeat):
+        start = default_timer()
+        for style_str, text_str, page_width in lines:
+            parser(style_str, text_str, page_width)
+        elapsed = default_timer() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best / len(lines) * 1e6
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark parse_tika_style")
+    parser.add_argument(
+        "--recordings-dir", default=os.path.dirname(get_recording_path("key"))
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    lines = load_lines(args.recordings_dir)
+    if not lines:
+        print(f"no tika recordings in {args.recordings_dir}, run make record-tika")
+        return 1
+    mismatches = sum(
+        style_utils.parse_tika_style(*line) != parse_tika_style_reference(*line)
+        for line in lines
+    )
+    reference_us = time_parser(parse_tika_style_reference, lines, args.repeat)
+    current_us = time_parser(style_utils.parse_tika_style, lines, args.repeat)
+    print(f"lines: {len(lines)}, mismatches: {mismatches}")
+    print(f"reference parser: {reference_us:.2f}us per line")
+    print(f"parse_tika_style: {current_us:.2f}us per line")
+    print(f"speedup: {reference_us / current_us:.2f}x")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
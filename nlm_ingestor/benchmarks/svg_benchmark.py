@@ -0,0 +1,136 @@
+"""
+Microbenchmark of the svg line deduplication.
+
+Times SvgLineMerger against the pairwise scan it replaced on a synthetic page of
+table rulings and checks that both keep the same lines:
+
+    python -m nlm_ingestor.benchmarks.svg_benchmark --segments 5000
+"""
+
+import argparse
+import random
+import sys
+from timeit import default_timer
+
+from nlm_ingestor.ingestor.visual_ingestor.svg_lines import SvgLineMerger
+
+
+def svg_line_operations_reference(lines_list, x1, y1, x2, y2, style):
+    """
+    The pairwise scan that SvgLineMerger replaced (Doc.svg_line_operations), kept to
+    check that both keep the same lines.
+    """
+    for line in lines_list:
+        if (
+            abs(x1 - line["x1"]) < 1.0
+            and abs(y1 - line["y1"]) < 1.0
+            and abs(x2 - line["x2"]) < 1.0
+            and abs(y2 - line["y2"]) < 1.0
+        ):
+            return lines_list
+        elif (
+            (abs(x2 - line["x1"]) < 1.0 or abs(x1 - line["x2"]) < 1.0)
+            and abs(y1 - y2) < 1.0
+            and abs(line["y1"] - line["y2"]) < 1.0
+            and abs(y1 - line["y1"]) < 1.0
+        ):
+            line["x1"] = min(x1, line["x1"])
+            line["x2"] = max(x2, line["x2"])
+            return lines_list
+        elif (
+            (abs(y2 - line["y1"]) < 1.0 or abs(y1 - line["y2"]) < 1.0)
+            and abs(x1 - x2) < 1.0
+            and abs(line["x1"] - line["x2"]) < 1.0
+            and abs(x1 - line["x1"]) < 1.0
+        ):
+            line["y1"] = min(y1, line["y1"])
+            line["y2"] = max(y2, line["y2"])
+            return lines_list
+    lines_list.append({"x1": x1, "y1": y1, "x2": x2, "y2": y2, "style": style})
+    return lines_list
+
+
+def make_page_segments(num_segments, seed=0, page_width=612.0, page_height=792.0):
+    """
+    :return: (x1, y1, x2, y2, style) of the rulings of a table heavy page, cell borders
+    split into short segments that touch or overlap, some of them drawn twice and
+    some slightly off, in random order
+    """
+    rng = random.Random(seed)
+    style = "stroke:rgb(0,0,0);stroke-width:0.5"
+    segments = []
+    while len(segments) < num_segments:
+        if rng.random() < 0.5:
+            y = round(rng.uniform(0, page_height), 1)
+            x1 = round(rng.uniform(0, page_width - 40), 1)
+            x2 = round(x1 + rng.uniform(5, 40), 1)
+            segment = (x1, y, x2, y, style)
+        else:
+            x = round(rng.uniform(0, page_width), 1)
+            y1 = round(rng.uniform(0, page_height - 20), 1)
+            y2 = round(y1 + rng.uniform(5, 20), 1)
+            segment = (x, y1, x, y2, style)
+        segments.append(segment)
+        if rng.random() < 0.3:
+            # drawn twice, off by a fraction of a pixel
+            x1, y1, x2, y2, style = segment
+            jitter = round(rng.uniform(-0.5, 0.5), 2)
+            segments.append((x1 + jitter, y1, x2 + jitter, y2, style))
+        if rng.random() < 0.3:
+            # continued by the next segment of the ruling
+            x1, y1, x2, y2, style = segment
+            if y1 == y2:
+                segments.append((x2, y1, x2 + rng.uniform(5, 40), y2, style))
+            else:
+                segments.append((x1, y2, x2, y2 + rng.uniform(5, 20), style))
+    segments = segments[:num_segments]
+    rng.shuffle(segments)
+    return segments
+
+
+def dedupe_reference(segments):
+    lines_list = []
+    for segment in segments:
+        svg_line_operations_reference(lines_list, *segment)
+    return lines_list
+
+
+def dedupe(segments):
+    line_merger = SvgLineMerger()
+    for segment in segments:
+        line_merger.add(*segment)
+    return line_merger.lines
+
+
+def time_dedupe(dedupe_fn, segments, repeat):
+    best = None
+    for _ in range(repeat):
+        start = default_timer()
+        dedupe_fn(segments)
+        elapsed = default_timer() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark svg line deduplication")
+    parser.add_argument("--segments", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    segments = make_page_segments(args.segments, args.seed)
+    kept_lines = dedupe(segments)
+    same_lines = kept_lines == dedupe_reference(segments)
+    reference_ms = time_dedupe(dedupe_reference, segments, args.repeat)
+    current_ms = time_dedupe(dedupe, segments, args.repeat)
+    print(f"segments: {len(segments)}, kept lines: {len(kept_lines)}")
+    print(f"same lines as reference: {same_lines}")
+    print(f"pairwise scan: {reference_ms:.1f}ms per page")
+    print(f"SvgLineMerger: {current_ms:.1f}ms per page")
+    print(f"speedup: {reference_ms / current_ms:.2f}x")
+    return 0 if same_lines else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
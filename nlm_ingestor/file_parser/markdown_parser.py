@@ -7,7 +7,7 @@ import mistune
 import nlm_ingestor.ingestion_daemon.config as cfg
 from nlm_ingestor.ingestor.visual_ingestor import block_renderer
 from nlm_ingestor.ingestor_utils.ing_named_tuples import LineStyle
-from nlm_ingestor.ingestor_utils.utils import sent_tokenize
+from nlm_ingestor.ingestor_utils.utils import cached_sent_tokenize
 
 # initialize logging
 logger = logging.getLogger(__name__)
@@ -60,7 +60,7 @@ def convert_mistune_to_paragraph(token, level):
         {
             "block_type": "para",
             "block_text": token["text"],
-            "block_sents": sent_tokenize(token["text"]),
+            "block_sents": cached_sent_tokenize(token["text"]),
             "level": level,
         },
     ]
@@ -71,7 +71,7 @@ def convert_mistune_to_code_paragraph(token, level):
         {
             "block_type": "para",
             "block_text": token["raw"],
-            "block_sents": sent_tokenize(token["raw"]),
+            "block_sents": cached_sent_tokenize(token["raw"]),
             "level": level,
         },
     ]
@@ -142,7 +142,7 @@ def convert_mistune_to_paragraphs(token, level):
             block = {
                 "block_type": "para",
                 "block_text": child["text"],
-                "block_sents": sent_tokenize(child["text"]),
+                "block_sents": cached_sent_tokenize(child["text"]),
                 "level": level,
             }
             blocks.append(block)
@@ -150,7 +150,7 @@ def convert_mistune_to_paragraphs(token, level):
             block = {
                 "block_type": "para",
                 "block_text": child["raw"],
-                "block_sents": sent_tokenize(child["raw"]),
+                "block_sents": cached_sent_tokenize(child["raw"]),
                 "level": level,
             }
             blocks.append(block)
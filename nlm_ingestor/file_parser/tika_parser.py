@@ -1,20 +1,69 @@
+import gzip
+import hashlib
+import json
 import logging
 import os
+import sys
+import tempfile
 
 from bs4 import BeautifulSoup
 from nlm_utils.utils.utils import ensure_bool
 from tika import parser
 
+import nlm_ingestor.ingestion_daemon.config as cfg
 from nlm_ingestor.file_parser.file_parser import FileParser
+from nlm_ingestor.ingestor_utils.disk_cache import DiskCache, file_hash
+
+tika_timeout = 3000
+TIKA_MODE_LIVE = "live"
+TIKA_MODE_RECORD = "record"
+TIKA_MODE_REPLAY = "replay"
+
+
+def get_tika_mode():
+    """
+    TIKA_MODE=record saves every tika response in TIKA_RECORDINGS_DIR,
+    TIKA_MODE=replay serves the saved responses without calling the tika server.
+    """
+    mode = cfg.get_config("TIKA_MODE", TIKA_MODE_LIVE).lower()
+    if mode not in {TIKA_MODE_LIVE, TIKA_MODE_RECORD, TIKA_MODE_REPLAY}:
+        raise ValueError(f"unknown TIKA_MODE {mode}")
+    return mode
+
+
+def get_recording_path(key):
+    return os.path.join(
+        cfg.get_config("TIKA_RECORDINGS_DIR", os.path.join("files", "tika")),
+        key + ".json.gz",
+    )
+
+
+def create_tika_cache():
+    """
+    Creates the on-disk cache of raw tika output from the service configuration.
+    Returns None when caching is turned off with TIKA_CACHE=no.
+    """
+    if not cfg.get_config_as_bool("TIKA_CACHE", "yes"):
+        return None
+    cache_dir = cfg.get_config(
+        "TIKA_CACHE_DIR",
+        os.path.join(tempfile.gettempdir(), "nlm-ingestor-tika"),
+    )
+    return DiskCache(
+        cache_dir,
+        cfg.get_config_as_int("TIKA_CACHE_MAX_MB", 2048) << 20,
+        ".json.gz",
+    )
 
 
 class TikaFileParser(FileParser):
     def __init__(self):
-        pass
+        self.cache = create_tika_cache()
 
-    def parse_to_html(self, filepath, do_ocr=False):
+    @staticmethod
+    def get_headers(do_ocr=False):
         # Turn off OCR by default
-        timeout = 3000
+        timeout = tika_timeout
         headers = {
             "X-Tika-OCRskipOcr": "true",
             "X-Tika-PDFOcrStrategy": "auto",
@@ -31,11 +80,67 @@ class TikaFileParser(FileParser):
 
         if ensure_bool(os.environ.get("TIKA_OCR", False)):
             headers = None
-        return parser.from_file(
+        return headers
+
+    @staticmethod
+    def get_cache_key(filepath, headers):
+        """
+        Tika output depends on the file and on the headers sent with it (OCR or not)
+        """
+        key_parts = {"file_hash": file_hash(filepath), "headers": headers}
+        return hashlib.sha256(
+            json.dumps(key_parts, sort_keys=True).encode("utf-8")
+        ).hexdigest()
+
+    @staticmethod
+    def load_recording(filepath, cache_key):
+        recording_path = get_recording_path(cache_key)
+        if not os.path.exists(recording_path):
+            raise FileNotFoundError(
+                f"no tika recording for {filepath} at {recording_path}, "
+                f"record it first with TIKA_MODE=record"
+            )
+        with gzip.open(recording_path, "rt", encoding="utf-8") as file:
+            return json.load(file)
+
+    @staticmethod
+    def save_recording(cache_key, parsed_content):
+        recording_path = get_recording_path(cache_key)
+        os.makedirs(os.path.dirname(recording_path), exist_ok=True)
+        # fixed mtime so that re-recording the same response gives identical bytes
+        with (
+            open(recording_path, "wb") as raw_file,
+            gzip.GzipFile(fileobj=raw_file, mode="wb", mtime=0) as file,
+        ):
+            file.write(json.dumps(parsed_content, sort_keys=True).encode("utf-8"))
+
+    def parse_to_html(self, filepath, do_ocr=False):
+        headers = self.get_headers(do_ocr)
+        tika_mode = get_tika_mode()
+        cache_key = None
+        if self.cache or tika_mode != TIKA_MODE_LIVE:
+            cache_key = self.get_cache_key(filepath, headers)
+        if tika_mode == TIKA_MODE_REPLAY:
+            return self.load_recording(filepath, cache_key)
+        if self.cache:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                parsed_content = json.loads(cached)
+                if tika_mode == TIKA_MODE_RECORD:
+                    self.save_recording(cache_key, parsed_content)
+                return parsed_content
+        parsed_content = parser.from_file(
             filepath,
             xmlContent=True,
-            requestOptions={"headers": headers, "timeout": timeout},
+            requestOptions={"headers": headers, "timeout": tika_timeout},
         )
+        # don't cache failed calls, they may succeed on a retry
+        if parsed_content.get("status") == 200:
+            if self.cache:
+                self.cache.put(cache_key, json.dumps(parsed_content).encode("utf-8"))
+            if tika_mode == TIKA_MODE_RECORD:
+                self.save_recording(cache_key, parsed_content)
+        return parsed_content
 
     def parse_to_clean_html(self, filepath):
         if not find_tika_header(filepath):
@@ -62,3 +167,39 @@ def find_tika_header(fp):
     except Exception as e:
         logging.error(e)
         return False
+
+
+def get_recorded_documents(doc_dir, do_ocr=False):
+    """
+    :return: Paths of the PDFs in doc_dir whose tika output is recorded
+    """
+    if not os.path.isdir(doc_dir):
+        return []
+    headers = TikaFileParser.get_headers(do_ocr)
+    recorded = []
+    for filename in sorted(os.listdir(doc_dir)):
+        doc_location = os.path.join(doc_dir, filename)
+        if filename.lower().endswith(".pdf") and os.path.exists(
+            get_recording_path(TikaFileParser.get_cache_key(doc_location, headers))
+        ):
+            recorded.append(doc_location)
+    return recorded
+
+
+def record_directory(doc_dir, do_ocr=False):
+    """
+    Records the tika output of every PDF in doc_dir (TIKA_MODE is forced to record).
+    """
+    cfg.set_config("TIKA_MODE", TIKA_MODE_RECORD)
+    file_parser = TikaFileParser()
+    for filename in sorted(os.listdir(doc_dir)):
+        if not filename.lower().endswith(".pdf"):
+            continue
+        parsed_content = file_parser.parse_to_html(
+            os.path.join(doc_dir, filename), do_ocr=do_ocr
+        )
+        print(f"recorded {filename}, status: {parsed_content.get('status')}")
+
+
+if __name__ == "__main__":
+    record_directory(sys.argv[1] if len(sys.argv) > 1 else os.path.join("files", "pdf"))
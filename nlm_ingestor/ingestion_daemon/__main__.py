@@ -4,18 +4,96 @@ import tempfile
 import traceback
 
 from flask import Flask, jsonify, make_response, request
+from flask.json.provider import DefaultJSONProvider
 from nlm_utils.utils import file_utils
 from werkzeug.utils import secure_filename
 
 import nlm_ingestor.ingestion_daemon.config as cfg
+from nlm_ingestor.ingestion_daemon.job_store import JOB_DONE, JOB_FAILED
+from nlm_ingestor.ingestion_daemon.jobs import (
+    JobManager,
+    JobQueueFull,
+    recover_interrupted_jobs,
+)
 from nlm_ingestor.ingestor import ingestor_api
+from nlm_ingestor.ingestor_utils import compact_json, encoding
+
+
+class ResultJSONProvider(DefaultJSONProvider):
+    """
+    JSON provider of the app that serializes the responses with encoding.dumps,
+    which uses orjson when it is installed
+    """
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return encoding.dumps(obj, sort_keys=self.sort_keys).decode("utf-8")
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            encoding.dumps(obj, sort_keys=self.sort_keys) + b"\n",
+            mimetype=self.mimetype,
+        )
+
 
 app = Flask(__name__)
+app.json = ResultJSONProvider(app)
 
 # initialize logging
 logger = logging.getLogger(__name__)
 logger.setLevel(cfg.log_level())
 
+job_manager = None
+
+
+def get_job_manager():
+    global job_manager
+    if job_manager is None:
+        job_manager = JobManager()
+    return job_manager
+
+
+def result_response(payload, rc=200):
+    """
+    :param payload: Response of a result endpoint
+    :param rc: Status code of the response
+    :return: Response with the payload encoded in the format the Accept header asks
+    for: json, msgpack or cbor, json by default
+    """
+    mimetype = request.accept_mimetypes.best_match(
+        encoding.mimetypes(), default=encoding.JSON_MIMETYPE
+    )
+    if mimetype == encoding.JSON_MIMETYPE:
+        response = make_response(jsonify(payload), rc)
+    else:
+        response = app.response_class(
+            encoding.encode(payload, mimetype), status=rc, mimetype=mimetype
+        )
+    response.vary.add("Accept")
+    return response
+
+
+def get_parse_options():
+    render_format = request.args.get("renderFormat", "all")
+    use_new_indent_parser = request.args.get("useNewIndentParser", "no")
+    apply_ocr = request.args.get("applyOcr", "no")
+    schema_version = request.args.get("schemaVersion", "1")
+    if (
+        not schema_version.isdigit()
+        or int(schema_version) not in compact_json.SCHEMA_VERSIONS
+    ):
+        raise ValueError(f"unsupported schemaVersion {schema_version}")
+    return {
+        "parse_and_render_only": True,
+        "render_format": render_format,
+        "use_new_indent_parser": use_new_indent_parser == "yes",
+        "parse_pages": (),
+        "apply_ocr": apply_ocr == "yes",
+        "schema_version": int(schema_version),
+    }
+
 
 @app.route("/", methods=["GET"])
 def health_check():
@@ -27,19 +105,13 @@ def parse_document(
     file=None,
     render_format: str = "all",
 ):
-    render_format = request.args.get("renderFormat", "all")
-    use_new_indent_parser = request.args.get("useNewIndentParser", "no")
-    apply_ocr = request.args.get("applyOcr", "no")
     file = request.files["file"]
     tmp_file = None
     try:
-        parse_options = {
-            "parse_and_render_only": True,
-            "render_format": render_format,
-            "use_new_indent_parser": use_new_indent_parser == "yes",
-            "parse_pages": (),
-            "apply_ocr": apply_ocr == "yes",
-        }
+        parse_options = get_parse_options()
+    except ValueError as e:
+        return result_response({"status": "fail", "reason": str(e)}, 400)
+    try:
         # save the incoming file to a temporary location
         filename = secure_filename(file.filename)
         _, file_extension = os.path.splitext(file.filename)
@@ -54,16 +126,15 @@ def parse_document(
             tmp_file,
             props["mimeType"],
             parse_options=parse_options,
+            use_cache=True,
         )
         if tmp_file and os.path.exists(tmp_file):
             os.unlink(tmp_file)
-        return make_response(
-            jsonify({"status": 200, "return_dict": return_dict or {}}),
-        )
+        return result_response({"status": 200, "return_dict": return_dict or {}})
 
     except Exception as e:
         print("error uploading file, stacktrace: ", traceback.format_exc())
-        print(
+        logger.error(
             f"error uploading file, stacktrace: {traceback.format_exc()}",
             exc_info=True,
         )
@@ -72,11 +143,92 @@ def parse_document(
     finally:
         if tmp_file and os.path.exists(tmp_file):
             os.unlink(tmp_file)
-    return make_response(jsonify({"status": status, "reason": msg}), rc)
+    return result_response({"status": status, "reason": msg}, rc)
+
+
+@app.route("/api/cacheStats", methods=["GET"])
+def cache_stats():
+    cache = ingestor_api.get_result_cache()
+    return make_response(
+        jsonify({"status": 200, "result_cache": cache.stats() if cache else None})
+    )
+
+
+@app.route("/api/jobs", methods=["POST"])
+def submit_job():
+    file = request.files["file"]
+    store = get_job_manager().store
+    tmp_file = None
+    job_id = None
+    try:
+        parse_options = get_parse_options()
+    except ValueError as e:
+        return result_response({"status": "fail", "reason": str(e)}, 400)
+    try:
+        filename = secure_filename(file.filename)
+        _, file_extension = os.path.splitext(file.filename)
+        # the mime type is needed up front, detect it on a scratch copy
+        tempfile_handler, tmp_file = tempfile.mkstemp(suffix=file_extension)
+        os.close(tempfile_handler)
+        file.save(tmp_file)
+        props = file_utils.extract_file_properties(tmp_file)
+        job_id, doc_location = store.create_job(
+            filename,
+            props["mimeType"],
+            parse_options,
+            file_extension,
+        )
+        os.replace(tmp_file, doc_location)
+        print(f"Queued document {filename} as job {job_id}")
+        get_job_manager().submit(job_id, doc_location)
+        return make_response(jsonify({"status": 202, "job_id": job_id}), 202)
+    except JobQueueFull as e:
+        if job_id:
+            store.delete_job(job_id)
+        status, rc, msg = "busy", 503, str(e)
+    except Exception as e:
+        print("error submitting job, stacktrace: ", traceback.format_exc())
+        if job_id:
+            store.set_status(job_id, JOB_FAILED, str(e))
+        status, rc, msg = "fail", 500, str(e)
+    finally:
+        if tmp_file and os.path.exists(tmp_file):
+            os.unlink(tmp_file)
+    return result_response({"status": status, "reason": msg}, rc)
+
+
+@app.route("/api/jobs/<job_id>", methods=["GET"])
+def get_job(job_id):
+    get_job_manager().expire_jobs()
+    job = get_job_manager().store.get_job(job_id)
+    if not job:
+        return make_response(
+            jsonify({"status": "fail", "reason": f"unknown job {job_id}"}), 404
+        )
+    return make_response(jsonify({"status": 200, "job": job}))
+
+
+@app.route("/api/jobs/<job_id>/result", methods=["GET"])
+def get_job_result(job_id):
+    get_job_manager().expire_jobs()
+    store = get_job_manager().store
+    job = store.get_job(job_id)
+    if not job:
+        return result_response(
+            {"status": "fail", "reason": f"unknown job {job_id}"}, 404
+        )
+    if job["status"] == JOB_FAILED:
+        return result_response({"status": "fail", "reason": job["reason"]}, 500)
+    if job["status"] != JOB_DONE:
+        return result_response(
+            {"status": job["status"], "reason": "job is not finished"}, 409
+        )
+    return result_response({"status": 200, "return_dict": store.load_result(job_id)})
 
 
 def main():
     print("Starting ingestor service..")
+    recover_interrupted_jobs()
     app.run(host="0.0.0.0", port=5001, debug=False)
 
 
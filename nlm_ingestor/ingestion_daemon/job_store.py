@@ -0,0 +1,219 @@
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+
+import nlm_ingestor.ingestion_daemon.config as cfg
+from nlm_ingestor.ingestor_utils import encoding
+
+# initialize logging
+logger = logging.getLogger(__name__)
+logger.setLevel(cfg.log_level())
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+_create_table_sql = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    filename TEXT,
+    mime_type TEXT,
+    parse_options TEXT,
+    reason TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+)
+"""
+_job_columns = (
+    "job_id",
+    "status",
+    "filename",
+    "mime_type",
+    "parse_options",
+    "reason",
+    "created_at",
+    "updated_at",
+)
+
+
+def default_job_dir():
+    return cfg.get_config(
+        "INGESTOR_JOB_DIR",
+        os.path.join(tempfile.gettempdir(), "nlm-ingestor-jobs"),
+    )
+
+
+class JobStore:
+    """
+    Persistent local store for asynchronous parse jobs.
+    Job metadata lives in a SQLite database and every job gets its own directory
+    holding the uploaded input (until it is parsed) and the JSON result.
+    The store is safe to open from several processes (worker pool) at once.
+    """
+
+    def __init__(self, root_dir=None):
+        self.root_dir = root_dir or default_job_dir()
+        os.makedirs(self.root_dir, exist_ok=True)
+        self.db_path = os.path.join(self.root_dir, "jobs.db")
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(_create_table_sql)
+
+    def _connect(self):
+        # sqlite connections can't be shared across threads, keep one per thread
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            self._local.conn = conn
+        return conn
+
+    def job_dir(self, job_id):
+        return os.path.join(self.root_dir, job_id)
+
+    def result_path(self, job_id):
+        return os.path.join(self.job_dir(job_id), "result.json")
+
+    def create_job(self, filename, mime_type, parse_options, file_extension=""):
+        """
+        Registers a new job in queued state.
+        :param filename: Name of the uploaded document
+        :param mime_type: Mime type used to pick the ingestor
+        :param parse_options: Parse options passed to ingestor_api.ingest_document
+        :param file_extension: Extension to keep on the stored input file
+        :return: job id and the location where the input file must be saved
+        """
+        job_id = uuid.uuid4().hex
+        os.makedirs(self.job_dir(job_id), exist_ok=True)
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    job_id,
+                    JOB_QUEUED,
+                    filename,
+                    mime_type,
+                    json.dumps(parse_options or {}),
+                    None,
+                    now,
+                    now,
+                ),
+            )
+        return job_id, os.path.join(self.job_dir(job_id), "input" + file_extension)
+
+    def get_job(self, job_id):
+        """
+        :param job_id: Job id returned by create_job
+        :return: Job metadata as a dictionary or None if the job is unknown
+        """
+        row = (
+            self._connect()
+            .execute(
+                f"SELECT {', '.join(_job_columns)} FROM jobs WHERE job_id = ?",
+                (job_id,),
+            )
+            .fetchone()
+        )
+        if not row:
+            return None
+        job = dict(zip(_job_columns, row))
+        job["parse_options"] = json.loads(job["parse_options"] or "{}")
+        return job
+
+    def set_status(self, job_id, status, reason=None):
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, reason = ?, updated_at = ? WHERE job_id = ?",
+                (status, reason, time.time(), job_id),
+            )
+
+    def save_result(self, job_id, return_dict):
+        """
+        Writes the result of a job and marks it as done.
+        The result is written to a temporary file first so that readers never see a partial result.
+        """
+        tmp_path = self.result_path(job_id) + ".tmp"
+        with open(tmp_path, "wb") as file:
+            file.write(encoding.dumps(return_dict))
+        os.replace(tmp_path, self.result_path(job_id))
+        self.set_status(job_id, JOB_DONE)
+
+    def load_result(self, job_id):
+        with open(self.result_path(job_id), "rb") as file:
+            return encoding.loads(file.read())
+
+    def _fail_unfinished_jobs(self, reason, cutoff):
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = ?, reason = ?, updated_at = ? "
+                "WHERE status IN (?, ?) AND updated_at < ?",
+                (JOB_FAILED, reason, time.time(), JOB_QUEUED, JOB_RUNNING, cutoff),
+            )
+            return cursor.rowcount
+
+    def fail_interrupted_jobs(self):
+        """
+        Marks jobs left queued or running by a previous process as failed.
+        :return: Number of jobs marked as failed
+        """
+        return self._fail_unfinished_jobs(
+            "interrupted by service restart", float("inf")
+        )
+
+    def fail_stale_jobs(self, max_age_secs):
+        """
+        Marks jobs queued or running for longer than max_age_secs as failed, e.g. the
+        jobs of a web worker that gunicorn restarted.
+        :return: Number of jobs marked as failed
+        """
+        return self._fail_unfinished_jobs(
+            f"not finished after {max_age_secs} seconds", time.time() - max_age_secs
+        )
+
+    def count_unfinished_jobs(self, job_id):
+        """
+        :param job_id: Job id returned by create_job
+        :return: Number of jobs queued or running that were created no later than
+        job_id, which counts job_id itself while it is unfinished
+        """
+        return (
+            self._connect()
+            .execute(
+                "SELECT COUNT(*) FROM jobs WHERE status IN (?, ?) AND created_at <= "
+                "(SELECT created_at FROM jobs WHERE job_id = ?)",
+                (JOB_QUEUED, JOB_RUNNING, job_id),
+            )
+            .fetchone()[0]
+        )
+
+    def delete_job(self, job_id):
+        with self._connect() as conn:
+            conn.execute("DELETE FROM jobs WHERE job_id = ?", (job_id,))
+        shutil.rmtree(self.job_dir(job_id), ignore_errors=True)
+
+    def purge_jobs(self, max_age_secs):
+        """
+        Deletes finished jobs (and their results) older than max_age_secs.
+        :return: Number of jobs deleted
+        """
+        cutoff = time.time() - max_age_secs
+        rows = (
+            self._connect()
+            .execute(
+                "SELECT job_id FROM jobs WHERE status IN (?, ?) AND updated_at < ?",
+                (JOB_DONE, JOB_FAILED, cutoff),
+            )
+            .fetchall()
+        )
+        for (job_id,) in rows:
+            self.delete_job(job_id)
+        return len(rows)
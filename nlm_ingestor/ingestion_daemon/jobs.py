@@ -0,0 +1,149 @@
+import logging
+import os
+import threading
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import nlm_ingestor.ingestion_daemon.config as cfg
+from nlm_ingestor.ingestion_daemon.job_store import JOB_FAILED, JOB_RUNNING, JobStore
+
+# initialize logging
+logger = logging.getLogger(__name__)
+logger.setLevel(cfg.log_level())
+
+
+class JobQueueFull(Exception):
+    pass
+
+
+def run_job(store_root, job_id, doc_location):
+    """
+    Parses the input of a job and stores the result. Runs inside a pool worker.
+    """
+    # imported here so that the worker processes load the ingestors, not the web process
+    from nlm_ingestor.ingestor import ingestor_api
+
+    store = JobStore(store_root)
+    job = store.get_job(job_id)
+    try:
+        store.set_status(job_id, JOB_RUNNING)
+        return_dict, _ = ingestor_api.ingest_document(
+            job["filename"],
+            doc_location,
+            job["mime_type"],
+            parse_options=job["parse_options"],
+            use_cache=True,
+        )
+        store.save_result(job_id, return_dict or {})
+    except Exception as e:
+        print(f"error parsing job {job_id}, stacktrace: ", traceback.format_exc())
+        store.set_status(job_id, JOB_FAILED, str(e))
+    finally:
+        if doc_location and os.path.exists(doc_location):
+            os.unlink(doc_location)
+
+
+def recover_interrupted_jobs(store=None):
+    """
+    Fails jobs that a previous service process left unfinished.
+    Must run once per service start, before any job manager accepts work.
+    """
+    interrupted = (store or JobStore()).fail_interrupted_jobs()
+    if interrupted:
+        logger.info(f"marked {interrupted} interrupted jobs as failed")
+
+
+class JobManager:
+    """
+    Runs submitted jobs on a bounded pool of worker processes.
+    At most max_workers jobs are parsed concurrently by the pool and at most
+    max_pending jobs of the store may be waiting or running, across all the managers
+    that share the store; submissions over that limit raise JobQueueFull.
+    Finished jobs are deleted job_ttl seconds after they finish, and jobs that are
+    not finished job_timeout seconds after they were queued or started are failed.
+    """
+
+    # seconds between two passes of expire_jobs
+    expire_interval = 60
+
+    def __init__(self, store=None, max_workers=None, max_pending=None):
+        self.store = store or JobStore()
+        self.max_workers = max_workers or cfg.get_config_as_int(
+            "INGESTOR_JOB_WORKERS", os.cpu_count() or 1
+        )
+        # the limit is shared by the job pools of all the web workers of a node
+        self.max_pending = max_pending or cfg.get_config_as_int(
+            "INGESTOR_JOB_MAX_PENDING", 4 * (os.cpu_count() or 1)
+        )
+        self.job_ttl = cfg.get_config_as_int("INGESTOR_JOB_TTL", 24 * 3600)
+        self.job_timeout = cfg.get_config_as_int("INGESTOR_JOB_TIMEOUT", 2 * 3600)
+        self._executor = None
+        self._last_expire = 0
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            return self._executor
+
+    def _drop_executor(self, executor):
+        """
+        Shuts down a pool that lost a worker process, e.g. to the OOM killer.
+        Such a pool fails every job given to it, so the next submit starts a new one.
+        """
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False)
+
+    def _job_finished(self, job_id, future, executor):
+        # run_job records its own failures, this only catches a dead worker process
+        if future.exception() is not None:
+            if isinstance(future.exception(), BrokenProcessPool):
+                self._drop_executor(executor)
+            self.store.set_status(job_id, JOB_FAILED, str(future.exception()))
+
+    def expire_jobs(self, force=False):
+        """
+        Deletes the expired finished jobs and fails the stale unfinished ones, such as
+        the jobs of a web worker that was replaced. Runs at most every expire_interval
+        seconds unless forced.
+        """
+        now = time.time()
+        with self._lock:
+            if not force and now - self._last_expire < self.expire_interval:
+                return
+            self._last_expire = now
+        if self.job_timeout > 0:
+            stale = self.store.fail_stale_jobs(self.job_timeout)
+            if stale:
+                logger.info(f"marked {stale} stale jobs as failed")
+        if self.job_ttl > 0:
+            purged = self.store.purge_jobs(self.job_ttl)
+            if purged:
+                logger.info(f"deleted {purged} expired jobs")
+
+    def submit(self, job_id, doc_location):
+        self.expire_jobs()
+        # the job itself is one of the unfinished jobs
+        pending = self.store.count_unfinished_jobs(job_id)
+        if pending > self.max_pending:
+            raise JobQueueFull(f"{pending - 1} jobs already pending")
+        executor = self._get_executor()
+        try:
+            future = executor.submit(run_job, self.store.root_dir, job_id, doc_location)
+        except BrokenProcessPool:
+            # the pool broke before the callback of its failed job dropped it
+            self._drop_executor(executor)
+            executor = self._get_executor()
+            future = executor.submit(run_job, self.store.root_dir, job_id, doc_location)
+        future.add_done_callback(lambda f: self._job_finished(job_id, f, executor))
+        return future
+
+    def shutdown(self, wait=True):
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
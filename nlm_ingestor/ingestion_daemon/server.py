@@ -0,0 +1,113 @@
+"""
+Production entry point for the ingestor service.
+
+Loads every model and lookup table once in the gunicorn master process and then
+forks the workers, so that they share the loaded data copy-on-write instead of
+each paying the load time and memory for its own copy.
+
+    python -m nlm_ingestor.ingestion_daemon.server
+
+Configuration (environment variables):
+    INGESTOR_PORT     port to bind to, defaults to 5001
+    INGESTOR_WORKERS  number of worker processes, defaults to the number of cores
+    INGESTOR_THREADS  request threads per worker, defaults to 1
+    INGESTOR_TIMEOUT  seconds before a silent worker is restarted, defaults to 3000
+    INGESTOR_JOB_WORKERS  job pool processes per worker, defaults to the number of
+                          cores divided by INGESTOR_WORKERS, at least 1
+
+Each worker runs its own job pool, so the service runs 1 + INGESTOR_WORKERS *
+(1 + INGESTOR_JOB_WORKERS) processes, about twice the number of cores by default.
+"""
+
+import gc
+import logging
+import os
+from timeit import default_timer
+
+from gunicorn.app.base import BaseApplication
+
+import nlm_ingestor.ingestion_daemon.config as cfg
+
+# initialize logging
+logger = logging.getLogger(__name__)
+logger.setLevel(cfg.log_level())
+
+
+def warm_up():
+    """
+    Imports the ingestors and exercises the lazily initialized parts of the pipeline
+    (SymSpell dictionaries, word splitter, punkt tokenizer, stopwords).
+    """
+    wall_time = default_timer() * 1000
+    # importing the app pulls in every ingestor along with
+    # processors.su (SymSpell) and styling_utils.ws (WordSplitter)
+    from nlm_ingestor.ingestion_daemon.__main__ import app
+    from nlm_ingestor.ingestor import line_parser, processors, styling_utils
+    from nlm_ingestor.ingestor_utils.utils import sent_tokenize
+
+    sample = (
+        "Section 1.1 of the Agreement, dated Jan. 1, 2020. The U.S. Company agrees."
+    )
+    sent_tokenize(sample)
+    line_parser.Line(sample)
+    processors.su.segment("theagreement")
+    styling_utils.ws.split("theagreement")
+    print(f"Ingestor warm up finished in {default_timer() * 1000 - wall_time:.4f}ms")
+    return app
+
+
+class IngestorServer(BaseApplication):
+    def __init__(self, app, options=None):
+        self.options = options or {}
+        self.application = app
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            if key in self.cfg.settings and value is not None:
+                self.cfg.set(key.lower(), value)
+
+    def load(self):
+        return self.application
+
+
+def configure_job_workers(workers):
+    """
+    Splits the cores between the job pools of the workers, unless
+    INGESTOR_JOB_WORKERS is set. The workers inherit the setting when they fork.
+    :param workers: Number of worker processes
+    """
+    if cfg.get_config("INGESTOR_JOB_WORKERS") is None:
+        job_workers = max(1, (os.cpu_count() or 1) // workers)
+        cfg.set_config("INGESTOR_JOB_WORKERS", job_workers)
+
+
+def get_server_options():
+    threads = cfg.get_config_as_int("INGESTOR_THREADS", 1)
+    return {
+        "bind": f"0.0.0.0:{cfg.get_config_as_int('INGESTOR_PORT', 5001)}",
+        "workers": cfg.get_config_as_int("INGESTOR_WORKERS", os.cpu_count() or 1),
+        "threads": threads,
+        "worker_class": "gthread" if threads > 1 else "sync",
+        "timeout": cfg.get_config_as_int("INGESTOR_TIMEOUT", 3000),
+        # the app is already loaded in the master, workers only fork it
+        "preload_app": True,
+    }
+
+
+def main():
+    print("Starting ingestor service..")
+    from nlm_ingestor.ingestion_daemon.jobs import recover_interrupted_jobs
+
+    app = warm_up()
+    recover_interrupted_jobs()
+    options = get_server_options()
+    configure_job_workers(options["workers"])
+    # move everything loaded so far out of the collector's reach, so that gc passes in
+    # the workers do not touch (and hence copy) the shared pages
+    gc.freeze()
+    IngestorServer(app, options).run()
+
+
+if __name__ == "__main__":
+    main()
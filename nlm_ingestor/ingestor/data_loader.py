@@ -3,7 +3,7 @@ import pandas as pd
 from nlm_ingestor.ingestor import processors
 from nlm_ingestor.ingestor.visual_ingestor import block_renderer
 from nlm_ingestor.ingestor_utils.ing_named_tuples import LineStyle
-from nlm_ingestor.ingestor_utils.utils import sent_tokenize
+from nlm_ingestor.ingestor_utils.utils import batch_sent_tokenize
 
 
 class DataRowFileInfo:
@@ -56,12 +56,13 @@ class DataRowFileInfo:
             col_val = str(self.row[col_name])
             lines = col_val.split("\n")
             col_blocks = processors.clean_lines(lines)
-            for block in col_blocks:
+            col_sents = batch_sent_tokenize(block["block_text"] for block in col_blocks)
+            for block, block_sents in zip(col_blocks, col_sents):
                 block["header_text"] = header_text
                 block["level"] = 2
                 block["block_idx"] = block_idx
                 block["page_idx"] = 0
-                block["block_sents"] = sent_tokenize(block["block_text"])
+                block["block_sents"] = block_sents
                 block["block_class"] = ("nlm-text-body",)
                 block["level_chain"] = (
                     [self.title, header_text] if self.title else [header_text]
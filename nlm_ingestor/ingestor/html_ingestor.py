@@ -6,7 +6,7 @@ from bs4 import BeautifulSoup
 from nlm_ingestor.ingestor import line_parser
 from nlm_ingestor.ingestor.visual_ingestor import block_renderer
 from nlm_ingestor.ingestor_utils.ing_named_tuples import LineStyle
-from nlm_ingestor.ingestor_utils.utils import sent_tokenize
+from nlm_ingestor.ingestor_utils.utils import cached_sent_tokenize
 
 
 class HTMLIngestor:
@@ -22,6 +22,7 @@ class HTMLIngestor:
             self.html = self.html.find("body")
         self.sec = sec
         self.blocks = []
+        self.line_cache = line_parser.LineCache()
         self.parse_blocks()
 
         self.line_style_classes = {}
@@ -64,7 +65,7 @@ class HTMLIngestor:
                 # use styles to determine headers
                 style = self.parse_style(child.get("style"))
                 if "font-weight" in style and style["font-weight"] == "bold":
-                    line = line_parser.Line(child.text)
+                    line = self.line_cache.get_line(child.text)
                     if line.is_header:
                         tag = "h3"
                         if child.text.isupper():
@@ -119,7 +120,7 @@ class HTMLIngestor:
 
             elif tag in para_tags or div_text or div_is_para:
                 is_header = False
-                line = line_parser.Line(child.text)
+                line = self.line_cache.get_line(child.text)
                 para_child_tag = None
                 if line.is_header:
                     is_header = True
@@ -165,7 +166,7 @@ class HTMLIngestor:
                         "block_type": "para",
                         "block_class": "nlm-text-body",
                         "header_block_idx": 0,
-                        "block_sents": sent_tokenize(child.text),
+                        "block_sents": cached_sent_tokenize(child.text),
                         "level": len(level_stack),
                         "header_text": header_stack[-1] if header_stack else "",
                         "level_chain": header_stack[::-1],
@@ -183,7 +184,7 @@ class HTMLIngestor:
                     "list_type": "",
                     "block_class": "nlm-list-item",
                     "header_block_idx": 0,
-                    "block_sents": sent_tokenize(child.text),
+                    "block_sents": cached_sent_tokenize(child.text),
                     "level": len(level_stack),
                     "header_text": header_stack[-1] if header_stack else "",
                     "level_chain": header_stack[::-1],
@@ -229,7 +230,7 @@ class HTMLIngestor:
                             "block_type": "table_row",
                             "block_class": "nlm-table-row",
                             "header_block_idx": 0,
-                            "block_sents": sent_tokenize(
+                            "block_sents": cached_sent_tokenize(
                                 " ".join([c for c in col_text])
                             ),
                             "level": len(level_stack),
@@ -245,7 +246,7 @@ class HTMLIngestor:
                         self.blocks.append(table_row)
                     else:
                         blk_text = " ".join(col_text)
-                        line = line_parser.Line(child.text)
+                        line = self.line_cache.get_line(child.text)
                         is_list_item = False
                         if line.is_list_item:
                             is_list_item = True
@@ -256,7 +257,7 @@ class HTMLIngestor:
                             "block_type": "para",
                             "block_class": "nlm-text-body",
                             "header_block_idx": 0,
-                            "block_sents": sent_tokenize(blk_text),
+                            "block_sents": cached_sent_tokenize(blk_text),
                             "level": len(level_stack),
                             "header_text": header_stack[-1] if header_stack else "",
                             "level_chain": header_stack[::-1],
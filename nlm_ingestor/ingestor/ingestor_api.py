@@ -19,6 +19,8 @@ from nlm_ingestor.ingestor import (
     text_ingestor,
     xml_ingestor,
 )
+from nlm_ingestor.ingestor_utils.compact_json import with_schema_version
+from nlm_ingestor.ingestor_utils.result_cache import create_result_cache
 from nlm_ingestor.ingestor_utils.utils import NpEncoder
 
 # initialize logging
@@ -27,6 +29,16 @@ logger.setLevel(cfg.log_level())
 run_table_detection: bool = ensure_bool(os.getenv("RUN_TABLE_DETECTION", False))
 title_text_only_pattern = re.compile(r"[^a-zA-Z]+")
 title_delimiter_remove_pattern = re.compile(r"[.;'\"\-,\n\r]")
+result_cache = None
+
+
+def get_result_cache():
+    global result_cache
+    if result_cache is None:
+        from nlm_ingestor.ingestor import VERSION
+
+        result_cache = create_result_cache(VERSION) or False
+    return result_cache
 
 
 def ingest_document(
@@ -34,9 +46,31 @@ def ingest_document(
     doc_location,
     mime_type,
     parse_options: dict = None,
+    use_cache: bool = False,
 ):
+    """
+    :param doc_name: Name of the document
+    :param doc_location: Path of the document, deleted once it is parsed
+    :param mime_type: Mime type used to pick the ingestor
+    :param parse_options: Parse options of the ingestor
+    :param use_cache: Whether to look the result up in the result cache first, in
+    which case the returned ingestor is None on a cache hit
+    :return: return_dict with the result and the ingestor that parsed it
+    """
     print(f"Parsing {mime_type} at {doc_location} with name {doc_name}")
+    # the cache holds the v1 result, which is converted to the requested schema
+    schema_version = (parse_options or {}).get("schema_version", 1)
     ingestor = None
+    cache = get_result_cache() if use_cache else None
+    cache_key = None
+    if cache:
+        cache_key = cache.make_key(doc_location, mime_type, parse_options)
+        return_dict = cache.get(cache_key)
+        if return_dict is not None:
+            print(f"Returning cached result for {doc_name}")
+            if doc_location and os.path.exists(doc_location):
+                os.unlink(doc_location)
+            return with_schema_version(return_dict, schema_version), ingestor
     if mime_type == "application/pdf":
         print("using pdf parser")
         ingestor = pdf_ingestor.PDFIngestor(doc_location, parse_options)
@@ -71,7 +105,9 @@ def ingest_document(
             "result": ingestor.json_dict,
         }
 
+    if cache_key:
+        cache.put(cache_key, return_dict)
     if doc_location and os.path.exists(doc_location):
         os.unlink(doc_location)
         print(f"File {doc_location} deleted")
-    return return_dict, ingestor
+    return with_schema_version(return_dict, schema_version), ingestor
@@ -3,9 +3,12 @@ import logging
 import math
 import re
 import string
+from operator import attrgetter
 
 from nltk.corpus import stopwords
 
+from nlm_ingestor.ingestor_utils.lru_cache import LRUCache
+
 from .patterns import abbreviations, states, states_abbreviations
 from .styling_utils import mode_of_list
 
@@ -20,6 +23,10 @@ except Exception as e:
     stop_words = set(stopwords.words("english"))
 
 stop_words.add("per")
+
+# lines kept by the LineCache of a document
+LINE_CACHE_SIZE = 10000
+
 continuing_chars = "!\"&'+,./:;<=?@\\]^_`|}~"
 list_chars = [
     "•",
@@ -95,6 +102,27 @@ conjunction_list = ["for", "and", "not", "but", "or", "yet", "so", "between"]
 
 
 class Word:
+    __slots__ = (
+        "text",
+        "is_percent",
+        "is_number",
+        "is_year",
+        "is_dollar",
+        "is_million",
+        "is_billion",
+        "is_thousand",
+        # is_date_entry is checked when it is first read
+        "_is_date_entry",
+        "is_negative",
+        "length",
+        "is_stop_word",
+        "is_number_range",
+        "parts",
+        "text_without_punct",
+        "is_noun",
+        "num_digits",
+    )
+
     def __init__(self, token):
         self.text = token
         self.is_percent = False
@@ -104,7 +132,7 @@ class Word:
         self.is_million = False
         self.is_billion = False
         self.is_thousand = False
-        self.is_date_entry = False
+        self._is_date_entry = None
         self.is_negative = False
         self.length = len(self.text)
         self.is_stop_word = self.text.lower() in stop_words
@@ -128,7 +156,6 @@ class Word:
         self.is_noun = self.text_without_punct[0].isupper()
 
         n = self.check_numeric()
-        self.check_date()
         try:
             if n:
                 n = round(float(n))
@@ -148,7 +175,16 @@ class Word:
             print(e)
             self.num_digits = 0
 
+    @property
+    def is_date_entry(self):
+        if self._is_date_entry is None:
+            self._is_date_entry = self.check_date()
+        return self._is_date_entry
+
     def check_date(self):
+        """
+        :return: True if the word is a date like 12/31 or Jan-5
+        """
         if "/" in self.text or "-" in self.text:
             text = self.text.replace("/", "-")
             date_patterns = [
@@ -165,12 +201,10 @@ class Word:
             for pat in date_patterns:
                 try:
                     datetime.datetime.strptime(text, pat)
-                    self.is_date_entry = True
-                    return
+                    return True
                 except ValueError:
                     pass
-        else:
-            self.is_date_entry = False
+        return False
 
     def check_numeric(self):
         word = self.text.lower()
@@ -214,8 +248,111 @@ class Word:
             numeric_part = word
             return numeric_part
 
+    def to_json(self):
+        return {
+            "text": self.text,
+            "is_percent": self.is_percent,
+            "is_number": self.is_number,
+            "is_year": self.is_year,
+            "is_dollar": self.is_dollar,
+            "is_million": self.is_million,
+            "is_billion": self.is_billion,
+            "is_thousand": self.is_thousand,
+            "is_date_entry": self.is_date_entry,
+            "is_negative": self.is_negative,
+            "length": self.length,
+            "is_stop_word": self.is_stop_word,
+            "is_number_range": self.is_number_range,
+            "parts": self.parts,
+            "text_without_punct": self.text_without_punct,
+            "is_noun": self.is_noun,
+            "num_digits": self.num_digits,
+        }
+
+
+# features of a Line in the order of its json, a line without text only has the ones
+# up to eff_length and uppercase_word_count, a line that isn't numbered doesn't have
+# start_number, line_without_number and full_number
+LINE_JSON_FIELDS = (
+    "text",
+    "words",
+    "is_independent",
+    "is_header",
+    "is_header_without_comma",
+    "noun_chunks",
+    "quoted_words",
+    "noun_chunk_ending_tokens",
+    "title_word_count",
+    "alpha_count",
+    "list_type",
+    "integer_numbered_line",
+    "roman_numbered_line",
+    "dot_numbered_line",
+    "numbered_line",
+    "stop_word_count",
+    "dollar_count",
+    "pct_count",
+    "number_count",
+    "last_word_number",
+    "first_word_title",
+    "letter_numbered_line",
+    "ends_with_hyphen",
+    "last_word_date",
+    "is_reference_author_name",
+    "date_entry_count",
+    "last_word_is_stop_word",
+    "hit_colon",
+    "is_zipcode_or_po",
+    "contains_state",
+    "addresses",
+    "length",
+    "word_count",
+    "dollar_sign_count",
+    "eff_length",
+    "start_number",
+    "line_without_number",
+    "full_number",
+    "first_word",
+    "last_word",
+    "last_char",
+    "ends_with_period",
+    "ends_with_comma",
+    "end_with_period_single_char",
+    "eff_word_count",
+    "first_char",
+    "has_continuing_chars",
+    "last_continuing_char",
+    "has_list_char",
+    "is_list_item",
+    "is_table_row",
+    "separate_line",
+    "is_list_or_row",
+    "is_header_or_row",
+    "ends_with_abbreviation",
+    "incomplete_line",
+    "continuing_line",
+    "has_spaced_characters",
+    "line_type",
+    "last_word_is_co_ordinate_conjunction",
+    "uppercase_word_count",
+)
+LINE_NUMBER_FIELDS = ("start_number", "line_without_number", "full_number")
+LINE_JSON_FIELDS_WITHOUT_NUMBER = tuple(
+    field for field in LINE_JSON_FIELDS if field not in LINE_NUMBER_FIELDS
+)
+LINE_JSON_FIELDS_WITHOUT_TEXT = LINE_JSON_FIELDS[
+    : LINE_JSON_FIELDS.index("eff_length") + 1
+] + ("uppercase_word_count",)
+# features of a Line that are found when they are first read, from the words only as
+# the other features of a line may be changed after it is parsed
+LINE_LAZY_FIELDS = ("noun_chunks", "last_word_date", "date_entry_count")
+
 
 class Line:
+    __slots__ = tuple(
+        field for field in LINE_JSON_FIELDS if field not in LINE_LAZY_FIELDS
+    ) + ("visual_line", "_noun_chunks", "_date_entry_count", "_last_token_word")
+
     def __init__(
         self,
         line_str,
@@ -230,7 +367,10 @@ class Line:
         self.is_independent = False
         self.is_header = False
         self.is_header_without_comma = False
-        self.noun_chunks = []
+        self._noun_chunks = None
+        self._date_entry_count = None
+        # word of the last token, None if the token was dropped
+        self._last_token_word = None
         self.quoted_words = quote_pattern.findall(self.text)
         self.noun_chunk_ending_tokens = {x.lower() for x in noun_chunk_ending_tokens}
         self.parse_line()
@@ -369,9 +509,6 @@ class Line:
             word_symbols = self.word_count - self.dollar_sign_count
             if word_symbols == 0:
                 word_symbols = 1
-            word_ratio = (
-                value_count + self.title_word_count + self.date_entry_count
-            ) / word_symbols
             # print("Checking table row for text: ", self.text)
             # print("value_count: ", value_count, "word_symbols: ", word_symbols, "word_ratio: ", word_ratio)
             # print("ends_with_period: ", self.ends_with_period, "is_zipcode_or_po: ", self.is_zipcode_or_po)
@@ -379,17 +516,28 @@ class Line:
             # print(".... in text: ", "...." in self.text)
 
             self.is_table_row = (
-                (
-                    (value_count > 0 or self.date_entry_count > 0)
-                    and word_ratio > 0.7
-                    and not self.ends_with_period
-                    and not self.is_zipcode_or_po
-                )
+                not self.ends_with_period
+                and not self.is_zipcode_or_po
                 and not self.last_word_is_stop_word
+                and self.has_value_ratio(value_count, word_symbols)
             ) or ("...." in self.text)
         else:
             self.is_table_row = False
 
+    def has_value_ratio(self, value_count, word_symbols):
+        """
+        :return: True if the line has values or dates and more than 70% of its words
+        are values, dates or titles. Dates are only checked if the values and titles
+        are not enough.
+        """
+        ratio_without_dates = (value_count + self.title_word_count) / word_symbols
+        if value_count > 0 and ratio_without_dates > 0.7:
+            return True
+        word_ratio = (
+            value_count + self.title_word_count + self.date_entry_count
+        ) / word_symbols
+        return (value_count > 0 or self.date_entry_count > 0) and word_ratio > 0.7
+
     def check_list_item(self):
         text = self.text.strip()
         self.has_list_char = text[0] in list_types.keys()
@@ -532,9 +680,7 @@ class Line:
         self.first_word_title = False
         self.letter_numbered_line = False
         self.ends_with_hyphen = False
-        self.last_word_date = False
         self.is_reference_author_name = False
-        self.date_entry_count = 0
         self.last_word_is_stop_word = False  # self.last_word in self.stopwords
         self.hit_colon = False
         self.is_zipcode_or_po = False
@@ -552,7 +698,6 @@ class Line:
 
         self.eff_length = 0
         single_letter_word_count = 0
-        noun_chunk_buf = []
         if self.length == 0:
             return
         for idx, token in enumerate(tokens):
@@ -602,10 +747,8 @@ class Line:
                 self.number_count = self.number_count + 1
                 if idx == last_idx:
                     self.last_word_number = True
-            if word.is_date_entry:
-                self.date_entry_count += 1
-                if idx == last_idx:
-                    self.last_word_date = True
+            if idx == last_idx:
+                self._last_token_word = word
             if word.is_dollar:
                 self.dollar_count = self.dollar_count + 1
                 if idx == last_idx:
@@ -624,45 +767,9 @@ class Line:
                     self.stop_word_count = self.stop_word_count + 1
                 if idx == last_idx and len(token) != 1 and not token.isupper():
                     self.last_word_is_stop_word = True
-            if word.is_noun or word.text == "&":
-                noun = word.text_without_punct
-                prev_word = self.words[-1] if len(self.words) > 0 else None
-                if (
-                    prev_word
-                    and (prev_word.is_number or prev_word.is_number_range)
-                    and not noun_chunk_buf
-                ):
-                    noun_chunk_buf.append(
-                        prev_word.text_without_punct
-                    )  # get stuff like 150 Broadway
-                if noun.endswith("'s"):
-                    noun = noun[0:-2]
-                    noun_chunk_buf.append(noun)
-                    self.noun_chunks.append(" ".join(noun_chunk_buf))
-                    noun_chunk_buf = []
-                elif (
-                    "".join([x.lower() for x in noun if x not in {".", ","}])
-                    in self.noun_chunk_ending_tokens
-                ):
-                    noun_chunk_buf.append(noun)
-                    self.noun_chunks.append(" ".join(noun_chunk_buf))
-                    noun_chunk_buf = []
-                else:
-                    noun_chunk_buf.append(noun)
-            elif len(noun_chunk_buf) and word.is_number and word.text[0] not in ["$"]:
-                noun_chunk_buf.append(word.text_without_punct)
-            elif len(noun_chunk_buf):
-                self.noun_chunks.append(" ".join(noun_chunk_buf))
-                noun_chunk_buf = []
 
             self.words.append(word)
 
-        if len(noun_chunk_buf) > 0:
-            self.noun_chunks.append(" ".join(noun_chunk_buf))
-
-        self.noun_chunks = sorted(
-            list(set(filter(lambda x: x.lower() not in stop_words, self.noun_chunks)))
-        )
         self.first_word = tokens[0]
         self.last_word = tokens[-1]
         self.last_char = self.text[-1]
@@ -728,16 +835,129 @@ class Line:
         # print(self.separate_line)
         # self.continuing_line = not self.separate_line and
 
-    def to_json(self):
-        json_lp = dict(self.__dict__)
-        del json_lp["visual_line"]
-        words = []
+    @property
+    def noun_chunks(self):
+        if self._noun_chunks is None:
+            self._noun_chunks = self.find_noun_chunks()
+        return self._noun_chunks
+
+    @property
+    def date_entry_count(self):
+        if self._date_entry_count is None:
+            self._date_entry_count = sum(word.is_date_entry for word in self.words)
+        return self._date_entry_count
+
+    @property
+    def last_word_date(self):
+        return self._last_token_word is not None and self._last_token_word.is_date_entry
+
+    def find_noun_chunks(self):
+        """
+        :return: Sorted noun chunks of the words that aren't stop words, a chunk is a
+        run of nouns (and numbers after a noun), ended by a possessive or one of the
+        noun_chunk_ending_tokens
+        """
+        noun_chunks = []
+        noun_chunk_buf = []
+        prev_word = None
         for word in self.words:
-            words.append(word.__dict__)
-        json_lp["words"] = words
+            if word.is_noun or word.text == "&":
+                noun = word.text_without_punct
+                if (
+                    prev_word
+                    and (prev_word.is_number or prev_word.is_number_range)
+                    and not noun_chunk_buf
+                ):
+                    noun_chunk_buf.append(
+                        prev_word.text_without_punct
+                    )  # get stuff like 150 Broadway
+                if noun.endswith("'s"):
+                    noun = noun[0:-2]
+                    noun_chunk_buf.append(noun)
+                    noun_chunks.append(" ".join(noun_chunk_buf))
+                    noun_chunk_buf = []
+                elif (
+                    "".join([x.lower() for x in noun if x not in {".", ","}])
+                    in self.noun_chunk_ending_tokens
+                ):
+                    noun_chunk_buf.append(noun)
+                    noun_chunks.append(" ".join(noun_chunk_buf))
+                    noun_chunk_buf = []
+                else:
+                    noun_chunk_buf.append(noun)
+            elif len(noun_chunk_buf) and word.is_number and word.text[0] not in ["$"]:
+                noun_chunk_buf.append(word.text_without_punct)
+            elif len(noun_chunk_buf):
+                noun_chunks.append(" ".join(noun_chunk_buf))
+                noun_chunk_buf = []
+            prev_word = word
+
+        if len(noun_chunk_buf) > 0:
+            noun_chunks.append(" ".join(noun_chunk_buf))
+        return sorted(
+            list(set(filter(lambda x: x.lower() not in stop_words, noun_chunks)))
+        )
+
+    def to_json(self):
+        if self.length == 0:
+            fields = LINE_JSON_FIELDS_WITHOUT_TEXT
+        elif hasattr(self, "start_number"):
+            fields = LINE_JSON_FIELDS
+        else:
+            fields = LINE_JSON_FIELDS_WITHOUT_NUMBER
+        json_lp = dict(zip(fields, attrgetter(*fields)(self)))
+        json_lp["words"] = [word.to_json() for word in self.words]
         return json_lp
 
 
+class LineCache:
+    """
+    Bounded memo of the lines parsed for a document, keyed by the stripped text as a
+    Line only looks at that. Repeated headers, footers and table cells are parsed
+    once. The cached lines are shared and must not be modified.
+    """
+
+    def __init__(self, max_length=LINE_CACHE_SIZE):
+        self.lines = LRUCache(max_length)
+        self.line_jsons = LRUCache(max_length)
+
+    def get_line(self, line_str):
+        """
+        :param line_str: Text of the line
+        :return: Shared Line of the text
+        """
+        key = line_str.strip()
+        if key in self.lines:
+            return self.lines[key]
+        line = Line(key)
+        self.lines[key] = line
+        return line
+
+    def get_line_json(self, line_str):
+        """
+        :param line_str: Text of the line
+        :return: to_json of the Line of the text, as a new dict with a new list of
+        words that share the dicts of the words
+        """
+        key = line_str.strip()
+        if key in self.line_jsons:
+            line_json = self.line_jsons[key]
+        else:
+            line_json = self.get_line(key).to_json()
+            self.line_jsons[key] = line_json
+        return {**line_json, "words": list(line_json["words"])}
+
+
+def get_line(line_str, line_cache=None):
+    """
+    :param line_cache: LineCache of the document, the Line is not shared without one
+    :return: Line of the text
+    """
+    if line_cache is None:
+        return Line(line_str)
+    return line_cache.get_line(line_str)
+
+
 class VisualLine:
     def __init__(self, text_list=[], style_dict={}, page_stats={}):
         self.text_list = text_list
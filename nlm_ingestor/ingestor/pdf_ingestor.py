@@ -1,3 +1,4 @@
+import itertools
 import json
 import logging
 import re
@@ -5,12 +6,11 @@ from collections import defaultdict, namedtuple
 from timeit import default_timer
 from typing import Optional
 
-import numpy as np
 from bs4 import BeautifulSoup
 
 from nlm_ingestor.file_parser import pdf_file_parser
 from nlm_ingestor.ingestor.visual_ingestor.new_indent_parser import NewIndentParser
-from nlm_ingestor.ingestor_utils import utils
+from nlm_ingestor.ingestor_utils import stage_timer, utils
 from nlm_ingestor.ingestor_utils.utils import (
     NpEncoder,
     detect_block_center_aligned,
@@ -18,6 +18,7 @@ from nlm_ingestor.ingestor_utils.utils import (
 )
 
 from .visual_ingestor import visual_ingestor
+from .visual_ingestor.page_reader import TikaPageReader
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -39,32 +40,51 @@ class PDFIngestor:
         )
 
         tika_html_doc = parse_pdf(doc_location, parse_options)
-        # print("tika_html_doc", tika_html_doc)
-        blocks, _block_texts, _sents, _file_data, result, page_dim, num_pages = (
-            parse_blocks(
-                tika_html_doc,
-                render_format=render_format,
-                parse_pages=parse_pages,
-                use_new_indent_parser=use_new_indent_parser,
-            )
+        self.parsed_blocks = parse_blocks(
+            tika_html_doc,
+            render_format=render_format,
+            parse_pages=parse_pages,
+            use_new_indent_parser=use_new_indent_parser,
         )
         print("parsed blocks")
         return_dict = {
-            "page_dim": page_dim,
-            "num_pages": num_pages,
+            "page_dim": self.parsed_blocks.page_dim,
+            "num_pages": self.parsed_blocks.num_pages,
         }
-        if render_format == "json":
-            return_dict["result"] = result[0].get("document", {})
-            self.doc_result_json = result[0]
-        elif render_format == "all":
-            return_dict["result"] = result[1].get("document", {})
-            self.doc_result_json = result[1]
+        # only the json document is returned, the html, sentences and file data
+        # are computed if they are read from the ingestor
+        if render_format in ("json", "all"):
+            return_dict["result"] = self.doc_result_json.get("document", {})
         self.return_dict = return_dict
-        self.file_data = _file_data
-        self.blocks = blocks
+
+    @property
+    def doc_result_json(self):
+        return self.parsed_blocks.json_result
+
+    @property
+    def file_data(self):
+        return self.parsed_blocks.file_data
+
+    @property
+    def blocks(self):
+        return self.parsed_blocks.blocks
+
+
+def parse_tika_html(tika_html_doc):
+    """
+    :param tika_html_doc: Tika response with the XHTML in "content"
+    :return: BeautifulSoup tree of the XHTML
+    """
+    with stage_timer.stage("soup_parsing"):
+        return BeautifulSoup(tika_html_doc.get("content") or "", "html.parser")
 
 
 def parse_pdf(doc_location, parse_options):
+    """
+    Runs the PDF through tika.
+    :return: The tika response, which parse_blocks reads page by page, or with
+    apply_ocr the BeautifulSoup tree of the XHTML with the OCR lines applied
+    """
     apply_ocr = parse_options.get("apply_ocr", False) if parse_options else False
     if not apply_ocr:
         wall_time = default_timer() * 1000
@@ -73,33 +93,23 @@ def parse_pdf(doc_location, parse_options):
         print(
             f"PDF Parsing finished in {default_timer() * 1000 - wall_time:.4f}ms on workspace",
         )
-        soup = BeautifulSoup(str(parsed_content), "html.parser")
-        pages = soup.find_all("div", class_=lambda x: x not in ["annotation"])
-        p_per_page = []
-        for page in pages:
-            p_per_page.append(len(page.find_all("p")))
-        p_per_page = np.array(p_per_page)
-        sparse_page_count = np.count_nonzero(p_per_page < 4)
-        if apply_ocr:
-            # even if ocr is enabled, we don't want to run it if the document is not sparse
-            needs_ocr = sparse_page_count / len(pages) > 0.3
-            if needs_ocr:
-                print(
-                    f"Running PDF OCR: sparse_page_count: {sparse_page_count}, n_pages: {len(pages)}"
-                )
-
+        return parsed_content
     else:
         wall_time = default_timer() * 1000
         parsed_content = pdf_file_parser.parse_to_html(doc_location, do_ocr=True)
-        parse_and_apply_hocr(parsed_content)
+        soup = parse_tika_html(parsed_content)
+        parse_and_apply_hocr(soup)
         print(
             f"PDF OCR finished in {default_timer() * 1000 - wall_time:.4f}ms on workspace",
         )
-    # print("returning parsed_content", parsed_content)
-    return parsed_content
+    return soup
+
 
+def parse_and_apply_hocr(soup):
+    """
+    Converts the hocr lines in the tika output to positioned p tags, in place.
+    """
 
-def parse_and_apply_hocr(parsed_content):
     def get_kv_from_attr(attr_str, sep=" "):
         #     print(attr_str)
         kv_string = attr_str.split(";")
@@ -113,7 +123,6 @@ def parse_and_apply_hocr(parsed_content):
             kvs[k] = v
         return kvs
 
-    soup = BeautifulSoup(str(parsed_content), "html.parser")
     pages = soup.find_all("div", class_="page")
     for page in pages:
         page_kv = get_kv_from_attr(page.get("style"), ":")
@@ -162,10 +171,6 @@ def parse_and_apply_hocr(parsed_content):
                 page.append(p_tag)
             for ocr_block in page.find_all("div", class_="ocr"):
                 ocr_block.decompose()
-    html_str = str(soup.html)
-    html_str = html_str.replace("\\n", "")
-    html_str = html_str.replace("\\t", "")
-    parsed_content["content"] = html_str
 
 
 def parse_blocks(
@@ -174,69 +179,147 @@ def parse_blocks(
     parse_pages: tuple = (),
     use_new_indent_parser: bool = False,
 ):
-    soup = BeautifulSoup(str(tika_html_doc), "html.parser")
-    meta_tags = soup.find_all("meta")
-    title = None
-    for tag in meta_tags:
-        if tag["name"].endswith(":title"):
-            title = tag["content"]
-            break
-    pages = soup.find_all("div", class_=lambda x: x in ["page"])
+    """
+    :param tika_html_doc: Tika response or a BeautifulSoup tree of its XHTML.
+    The pages of a tika response are parsed and processed one at a time.
+    :return: ParsedBlocks, whose outputs are computed when they are read
+    """
+    if isinstance(tika_html_doc, BeautifulSoup):
+        meta_tags = tika_html_doc.find_all("meta")
+        pages = tika_html_doc.find_all("div", class_=lambda x: x in ["page"])
+    else:
+        # pages parsed in a pool are sent to the workers as XHTML
+        page_reader = TikaPageReader(
+            tika_html_doc.get("content") or "",
+            as_html=visual_ingestor.get_page_workers() > 1,
+        )
+        # filled in by the reader as it goes through the head
+        meta_tags = page_reader.meta_tags
+        pages = page_reader
     # read ignore blocks here
     ignore_blocks = []
     if parse_pages:
         start_page_no, end_page_no = parse_pages
-        pages = pages[start_page_no : end_page_no + 1]
+        pages = itertools.islice(pages, start_page_no, end_page_no + 1)
     parsed_doc = visual_ingestor.Doc(pages, ignore_blocks, render_format)
+    title = None
+    for tag in meta_tags:
+        if tag.get("name", "").endswith(":title"):
+            title = tag["content"]
+            break
     if use_new_indent_parser:
+        # the json and html have the levels of the blocks before the new indent
+        # parser
+        parsed_doc.render()
         indent_parser = NewIndentParser(parsed_doc, parsed_doc.blocks)
         indent_parser.indent()
     title_page_fonts = top_pages_info(parsed_doc)
     parsed_doc.compress_blocks()
-    blocks = parsed_doc.blocks
-    sents, _ = utils.blocks_to_sents(blocks)
-    block_texts, _ = utils.get_block_texts(blocks)
-    if render_format == "json":
-        result = [
-            {
-                "title": title,
-                "document": parsed_doc.json_dict,
-                "title_page_fonts": title_page_fonts,
+    return ParsedBlocks(parsed_doc, title, title_page_fonts)
+
+
+class ParsedBlocks:
+    """
+    Outputs of parse_blocks, each computed when it is first read and kept, so that
+    a caller that only needs the json document does not render the html, split the
+    sentences or serialize the results. It unpacks to the tuple (blocks,
+    block_texts, sents, file_data, result, page_dim, num_pages).
+    """
+
+    def __init__(self, parsed_doc, title, title_page_fonts):
+        self.parsed_doc = parsed_doc
+        self.render_format = parsed_doc.render_format
+        self.title = title
+        self.title_page_fonts = title_page_fonts
+        self.page_dim = [parsed_doc.page_width, parsed_doc.page_height]
+        self.num_pages = parsed_doc.num_pages - 1
+        self._json_result = None
+        self._html_result = None
+        self._result = None
+        self._sents = None
+        self._block_texts = None
+        self._file_data = None
+
+    def __iter__(self):
+        return iter(
+            (
+                self.blocks,
+                self.block_texts,
+                self.sents,
+                self.file_data,
+                self.result,
+                self.page_dim,
+                self.num_pages,
+            )
+        )
+
+    @property
+    def json_result(self):
+        if self._json_result is None:
+            self._json_result = {
+                "title": self.title,
+                "document": self.parsed_doc.json_dict,
+                "title_page_fonts": self.title_page_fonts,
             }
-        ]
-    elif render_format == "html":
-        result = [
-            {
-                "title": title,
-                "text": parsed_doc.html_str,
-                "title_page_fonts": title_page_fonts,
+        return self._json_result
+
+    @property
+    def html_result(self):
+        if self._html_result is None:
+            self._html_result = {
+                "title": self.title,
+                "text": self.parsed_doc.html_str,
+                "title_page_fonts": self.title_page_fonts,
             }
-        ]
-    else:
-        result = [
-            {
-                "title": title,
-                "text": parsed_doc.html_str,
-                "title_page_fonts": title_page_fonts,
-            },
-            {
-                "title": title,
-                "document": parsed_doc.json_dict,
-                "title_page_fonts": title_page_fonts,
-            },
-        ]
-
-    file_data = [json.dumps(res, cls=NpEncoder) for res in result]
-
-    return (
-        blocks,
-        block_texts,
-        sents,
-        file_data,
-        result,
-        [parsed_doc.page_width, parsed_doc.page_height],
-        len(pages) - 1,
-    )
+        return self._html_result
+
+    @property
+    def result(self):
+        if self._result is None:
+            if self.render_format == "json":
+                self._result = [self.json_result]
+            elif self.render_format == "html":
+                self._result = [self.html_result]
+            else:
+                self._result = [self.html_result, self.json_result]
+        return self._result
+
+    def split_sents(self):
+        """
+        Splits the blocks into sentences the first time it is called
+        :return: Sentences of the blocks
+        """
+        if self._sents is None:
+            # blocks_to_sents sets the headers and idx of the blocks, which are
+            # rendered as they were before
+            self.parsed_doc.render()
+            with stage_timer.stage("blocks_to_sents"):
+                self._sents, _ = utils.blocks_to_sents(self.parsed_doc.blocks)
+        return self._sents
+
+    @property
+    def sents(self):
+        return self.split_sents()
+
+    @property
+    def blocks(self):
+        """
+        Blocks of the document, with the headers and idx set by blocks_to_sents
+        """
+        self.split_sents()
+        return self.parsed_doc.blocks
+
+    @property
+    def block_texts(self):
+        if self._block_texts is None:
+            self._block_texts, _ = utils.get_block_texts(self.parsed_doc.blocks)
+        return self._block_texts
+
+    @property
+    def file_data(self):
+        if self._file_data is None:
+            self._file_data = [json.dumps(res, cls=NpEncoder) for res in self.result]
+        return self._file_data
 
 
 def top_pages_info(parsed_doc):
@@ -3,7 +3,7 @@ import re
 from collections import Counter, defaultdict
 
 from nlm_ingestor.ingestor_utils import spell_utils
-from nlm_ingestor.ingestor_utils.utils import sent_tokenize
+from nlm_ingestor.ingestor_utils.utils import cached_sent_tokenize
 
 from . import formatter, line_parser, patterns
 
@@ -1194,7 +1194,7 @@ def visual_clean_lines(
             prev_text = page_blocks[-1]["block_text"]
 
             if page_blocks[-1]["block_type"] == "header" and (
-                len(sent_tokenize(prev_text)) >= 2 or len(prev_text.split()) > 16
+                len(cached_sent_tokenize(prev_text)) >= 2 or len(prev_text.split()) > 16
             ):
                 page_blocks[-1]["block_type"] = "para"
 
@@ -5,7 +5,7 @@ from bs4 import BeautifulSoup
 from nlm_ingestor.ingestor import line_parser
 from nlm_ingestor.ingestor.visual_ingestor import block_renderer
 from nlm_ingestor.ingestor_utils.ing_named_tuples import LineStyle
-from nlm_ingestor.ingestor_utils.utils import sent_tokenize
+from nlm_ingestor.ingestor_utils.utils import cached_sent_tokenize
 
 
 class SECDoc:
@@ -134,7 +134,7 @@ class SECDoc:
                     "block_type": "para",
                     "block_class": "nlm-text-body",
                     "header_block_idx": 0,
-                    "block_sents": sent_tokenize(child.text),
+                    "block_sents": cached_sent_tokenize(child.text),
                     "level": len(level_stack),
                     "header_text": header_stack[-1] if header_stack else "",
                     "level_chain": header_stack[::-1],
@@ -151,7 +151,7 @@ class SECDoc:
                     "list_type": "",
                     "block_class": "nlm-list-item",
                     "header_block_idx": 0,
-                    "block_sents": sent_tokenize(child.text),
+                    "block_sents": cached_sent_tokenize(child.text),
                     "level": len(level_stack),
                     "header_text": header_stack[-1] if header_stack else "",
                     "level_chain": header_stack[::-1],
@@ -187,7 +187,7 @@ class SECDoc:
                         "block_type": "table_row",
                         "block_class": "nlm-table-row",
                         "header_block_idx": 0,
-                        "block_sents": sent_tokenize(" ".join(col_text)),
+                        "block_sents": cached_sent_tokenize(" ".join(col_text)),
                         "level": len(level_stack),
                         "header_text": header_stack[-1] if header_stack else "",
                         "level_chain": header_stack[::-1],
@@ -121,14 +121,20 @@ def parse_blocks(raw_lines):
 def blocks_to_json(page_blocks):
     results = []
     block_count = 0
+    # sentences of all the blocks of the document in one batch
+    doc_sents = iter(
+        utils.batch_sent_tokenize(
+            block["block_text"] for blocks in page_blocks for block in blocks
+        )
+    )
     for page_idx, blocks in enumerate(page_blocks):
         result = []
         block_start = block_count
         header_block_idx = -1
         header_block_text = ""
         for block_idx_in_page, block in enumerate(blocks):
+            block_sents = next(doc_sents)
             if block["block_text"]:
-                block_sents = utils.sent_tokenize(block["block_text"])
                 # header_block_idx = block["header_block_idx"]
                 if block["block_type"] == "header":
                     header_block_idx = block["block_idx"]
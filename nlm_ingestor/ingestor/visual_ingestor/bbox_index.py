@@ -0,0 +1,40 @@
+import bisect
+import math
+
+
+class BBoxIndex:
+    """
+    Audited bboxes of a page sorted by their top, with the height of the tallest one.
+    A bbox overlapping the span of a block has its top between the top of the span
+    minus the tallest height and the bottom of the span, so the bboxes that can hold
+    the block are found by bisecting on that range instead of going over all of them.
+    """
+
+    def __init__(self, list_of_bbox):
+        """
+        :param list_of_bbox: Audited bboxes with bbox as (left, top, right, bottom)
+        """
+        indexed_bboxes = []
+        for bbox in list_of_bbox:
+            top, bottom = bbox.bbox[1], bbox.bbox[3]
+            # a bbox without a top or bottom can't hold a block
+            if not (math.isnan(top) or math.isnan(bottom)):
+                indexed_bboxes.append((top, bottom - top, bbox))
+        indexed_bboxes.sort(key=lambda indexed_bbox: indexed_bbox[0])
+        self.tops = [indexed_bbox[0] for indexed_bbox in indexed_bboxes]
+        self.max_height = max(
+            (indexed_bbox[1] for indexed_bbox in indexed_bboxes), default=0
+        )
+        self.bboxes = [indexed_bbox[2] for indexed_bbox in indexed_bboxes]
+
+    def __len__(self):
+        return len(self.bboxes)
+
+    def overlapping(self, span_top, span_bottom):
+        """
+        :return: The bboxes that may overlap the vertical span, a superset of the ones
+        with top <= span_bottom and bottom >= span_top
+        """
+        start = bisect.bisect_left(self.tops, span_top - self.max_height)
+        end = bisect.bisect_right(self.tops, span_bottom)
+        return self.bboxes[start:end]
@@ -12,7 +12,11 @@ class BlockRenderer:
     def __init__(self, doc):
         self.doc = doc
 
-    def render_nested_block(self, block, block_idx, tag, sent_idx, html_str):
+    def render_nested_block(self, block, block_idx, tag, sent_idx, html_chunks):
+        """
+        Appends the html of a para or list item block to html_chunks
+        :return: Index of the sentence after the block
+        """
         block_sents = block["block_sents"]
         block_level = block["level"]
         block_page = block["page_idx"]
@@ -22,7 +26,7 @@ class BlockRenderer:
         block_class_attr = f"class=\"{block['block_class']}"
         sent_attrs = margin_left_attr + " " + block_class_attr
         if len(block_sents) == 1:
-            html_str += (
+            html_chunks.append(
                 f'<{tag} {sent_attrs} nlm_sent_{sent_idx}">{block_sents[0]}</{tag}>'
             )
             sent_idx = sent_idx + 1
@@ -34,22 +38,24 @@ class BlockRenderer:
                 + " nlm_block_"
                 + str(block_idx)
             )
-            html_str = html_str + " <" + tag + " " + block_attrs + '">'
+            html_chunks.append(" <" + tag + " " + block_attrs + '">')
             for sent in block_sents:
-                html_str = (
-                    html_str + f'<span class="nlm_sent_{sent_idx}">{sent} </span>'
-                )
+                html_chunks.append(f'<span class="nlm_sent_{sent_idx}">{sent} </span>')
                 sent_idx = sent_idx + 1
-            html_str = html_str + "</" + tag + ">"
-        return sent_idx, html_str
+            html_chunks.append("</" + tag + ">")
+        return sent_idx
 
-    def render_merged_cell(self, block, block_idx, tag, sent_idx, html_str):
+    def render_merged_cell(self, block, block_idx, tag, sent_idx, html_chunks):
+        """
+        Appends the html of the effective para of a merged table cell to html_chunks
+        :return: Index of the sentence after the cell
+        """
         block_sents = block["block_sents"]
         margin_left_attr = f"style=''"
         block_class_attr = f"class=\"{block['block_class']}"
         sent_attrs = margin_left_attr + " " + block_class_attr
         if len(block_sents) == 1:
-            html_str += (
+            html_chunks.append(
                 f'<{tag} {sent_attrs} nlm_sent_{sent_idx}">{block_sents[0]}</{tag}>'
             )
             sent_idx = sent_idx + 1
@@ -61,19 +67,43 @@ class BlockRenderer:
                 + " nlm_block_"
                 + str(block_idx)
             )
-            html_str = html_str + " <" + tag + " " + block_attrs + "'>"
+            html_chunks.append(" <" + tag + " " + block_attrs + "'>")
             for sent in block_sents:
-                html_str = html_str + f'<p nlm_sent_{sent_idx}">{sent} </p>'
+                html_chunks.append(f'<p nlm_sent_{sent_idx}">{sent} </p>')
                 sent_idx = sent_idx + 1
-            html_str = html_str + "</" + tag + ">"
-        return sent_idx, html_str
+            html_chunks.append("</" + tag + ">")
+        return sent_idx
 
     def render_html(self):
-        body_str = "<body>"
+        """
+        :return: Html of the document
+        """
+        return "".join(self.iter_html())
+
+    def iter_html(self):
+        """
+        Renders the html of the document a fragment at a time, so that it can be
+        streamed: the head with the styles, the body of each page and the end tag.
+        Joined, the fragments are the html of render_html.
+        """
+        yield "<!DOCTYPE html><html><head>" + self.render_css() + "</head>"
+        yield from self.iter_html_pages()
+        yield "</html>"
+
+    def iter_html_pages(self):
+        """
+        Renders the blocks a page at a time. The html of a page starts with the
+        buttons to approve the page before it, and a table is in the html of the
+        page where it ends.
+        :return: Generator of the html of the pages
+        """
+        # html of the page and of the table being rendered, as lists of chunks that
+        # are joined once, instead of strings that are copied on every append
+        html_chunks = []
+        table_chunks = ["<body>"]
         is_rendering_table = False
         is_rendering_merged_cells = False
 
-        html_str = ""
         sent_idx = 0
         nested_block_idx = 0
         prev_page_idx = -1
@@ -87,11 +117,14 @@ class BlockRenderer:
 
             page_idx = block["page_idx"]
             if page_idx != prev_page_idx:
+                if html_chunks:
+                    yield "".join(html_chunks)
+                    html_chunks = []
                 if HTML_DEBUG:
-                    html_str = html_str + f"<h7>---- {page_idx} ----</h7>"
+                    html_chunks.append(f"<h7>---- {page_idx} ----</h7>")
                 if page_idx > 0:
                     # html_str = html_str + f"<button>---- APPROVE ----</button>"
-                    html_str += (
+                    html_chunks.append(
                         f'<br /><div><button class="ant-btn" button_type="approve-page" id="{page_idx - 1}" ">Approve Page {page_idx - 1} Above</button>'
                         f'<button class="ant-btn" button_type="flag-page" id="{page_idx - 1}">Flag Page {page_idx - 1}</button>'
                         f'<button class="ant-btn" button_type="undo-page-approval" id="{page_idx - 1}">Undo Approval</button>'
@@ -114,33 +147,35 @@ class BlockRenderer:
                 top = block["box_style"][0] if "box_style" in block else 0
                 left = block["box_style"][1] if "box_style" in block else 0
                 name = block["header_text"] if "header_text" in block else ""
-                body_str = f'<table {block_attrs} page_idx="{page_idx}" top="{top}" left="{left}" name="{name}"><tbody>'
+                table_chunks = [
+                    f'<table {block_attrs} page_idx="{page_idx}" top="{top}" left="{left}" name="{name}"><tbody>'
+                ]
                 nested_block_idx = nested_block_idx + 1
                 is_rendering_table = True
                 if "has_merged_cells" in block:
                     is_rendering_merged_cells = True
 
             elif block_type == "header" and not is_rendering_table:
-                html_str = html_str + f"<h4 {block_attrs}> {block_text} </h4>"
+                html_chunks.append(f"<h4 {block_attrs}> {block_text} </h4>")
                 sent_idx = sent_idx + 1
             elif block_type == "list_item" and not is_rendering_table:
-                sent_idx, html_str = self.render_nested_block(
+                sent_idx = self.render_nested_block(
                     block,
                     nested_block_idx,
                     "li",
                     sent_idx,
-                    html_str,
+                    html_chunks,
                 )
                 nested_block_idx = nested_block_idx + 1
             elif (
                 block_type == "para" or block_type == "numbered_list_item"
             ) and not is_rendering_table:
-                sent_idx, html_str = self.render_nested_block(
+                sent_idx = self.render_nested_block(
                     block,
                     nested_block_idx,
                     "p",
                     sent_idx,
-                    html_str,
+                    html_chunks,
                 )
                 nested_block_idx = nested_block_idx + 1
             elif (
@@ -148,14 +183,14 @@ class BlockRenderer:
                 and not is_rendering_table
                 and block_type == "table_row"
             ):
-                html_str = html_str + f"<p {block_attrs}> {block_text} </p>"
+                html_chunks.append(f"<p {block_attrs}> {block_text} </p>")
                 sent_idx = sent_idx + 1
 
             elif block_type == "hr":
-                html_str += "<hr>"
+                html_chunks.append("<hr>")
 
             if is_rendering_table:
-                body_str = body_str + f"<tr {block_attrs}>"
+                table_chunks.append(f"<tr {block_attrs}>")
                 if table_parser.TABLE_DEBUG:
                     print("---->", block["block_text"][0:20], block["block_type"])
                 if "cell_values" not in block:
@@ -165,8 +200,8 @@ class BlockRenderer:
                 n_cols = len(cell_values)
                 if table_parser.row_group_key in block:
                     # print(">>>", cell_values)
-                    body_str = (
-                        body_str + f"<td {margin_left_attr} class='nlm_full_row' "
+                    table_chunks.append(
+                        f"<td {margin_left_attr} class='nlm_full_row' "
                         f"colspan={block['col_span']}>{cell_values[0]}</td>"
                     )
 
@@ -175,16 +210,15 @@ class BlockRenderer:
                     for idx, val in enumerate(cell_values):
                         col_span = col_spans[idx] if idx < len(col_spans) else 1
                         # sent_idx = sent_idx + 1
-                        body_str = (
-                            body_str
-                            + f"<th {margin_left_attr} colspan={col_span}>{val}</th>"
+                        table_chunks.append(
+                            f"<th {margin_left_attr} colspan={col_span}>{val}</th>"
                         )
 
                 elif table_parser.header_key in block:
                     # print(cell_values)
                     for val in cell_values:
                         # sent_idx = sent_idx + 1
-                        body_str = body_str + f"<th {margin_left_attr}>{val}</th>"
+                        table_chunks.append(f"<th {margin_left_attr}>{val}</th>")
                 else:
                     # print(cell_values)
                     for cell_idx, val in enumerate(cell_values):
@@ -194,25 +228,26 @@ class BlockRenderer:
                             and cell_idx == 1
                             and "effective_para" in block
                         ):
-                            sent_idx, cell_html = self.render_merged_cell(
+                            cell_chunks = []
+                            sent_idx = self.render_merged_cell(
                                 block["effective_para"],
                                 block["block_idx"],
                                 "p",
                                 sent_idx,
-                                "",
-                            )
-                            body_str = (
-                                body_str + f"<td {margin_left_attr}>{cell_html}</td>"
+                                cell_chunks,
                             )
+                            table_chunks.append(f"<td {margin_left_attr}>")
+                            table_chunks += cell_chunks
+                            table_chunks.append("</td>")
                         else:
-                            body_str = body_str + f"<td {margin_left_attr}>{val}</td>"
-                body_str = body_str + "</tr>"
+                            table_chunks.append(f"<td {margin_left_attr}>{val}</td>")
+                table_chunks.append("</tr>")
 
                 sent_idx = sent_idx + 1
 
             if "is_table_end" in block:
-                body_str = body_str + "</tbody></table>"
-                body_str += (
+                table_chunks.append("</tbody></table>")
+                table_chunks.append(
                     f'<br /><div><button class="ant-btn" button_type="approve-table">Approve Table Above</button>'
                     f'<button class="ant-btn" button_type="flag-table">Flag Table Above</button>'
                     f'<button class="ant-btn" button_type="undo-table-approval">Undo Approval</button>'
@@ -220,9 +255,16 @@ class BlockRenderer:
                     f"</div><br />"
                 )
                 is_rendering_table = False
-                html_str = html_str + body_str
+                html_chunks += table_chunks
+
+        if html_chunks:
+            yield "".join(html_chunks)
 
-        css_str = "<style>\n"
+    def render_css(self):
+        """
+        :return: Style tag with the classes of the line styles of the document
+        """
+        css_chunks = ["<style>\n"]
         for style, class_name in self.doc.line_style_classes.items():
             if class_name in self.doc.class_levels:
                 class_level = self.doc.class_levels[class_name]
@@ -236,24 +278,18 @@ class BlockRenderer:
                 f"margin-left: {class_level * 20}px;"
                 f"text-transform: {style[4]};text-align: {style[6]}"
             )
-            css_str = css_str + "." + class_name + " {\n" + style_str + "\n}\n"
-        css_str = css_str + "table {border-collapse: collapse; margin-top: 10px}"
-        css_str = css_str + "table, th, td {border: 1px solid lightgray;padding: 5px;}"
-        css_str = css_str + "th {background: #337ab773}"
-        css_str = (
-            css_str + "li {padding-left: 30px; list-style: none; margin-top: 10px}"
-        )
-        css_str = css_str + "li::first-letter {color: #5656a3}"
-        css_str = css_str + "h4 {color: #337ab7}"
-        css_str = (
-            css_str
-            + ".nlm_full_row {background: #dfe5e7; font-weight: 600; color: #5656a3}"
-        )
-        css_str = css_str + "</style>"
-        html_str = (
-            "<!DOCTYPE html><html><head>" + css_str + "</head>" + html_str + "</html>"
-        )
-        return html_str
+            css_chunks.append("." + class_name + " {\n" + style_str + "\n}\n")
+        css_chunks += [
+            "table {border-collapse: collapse; margin-top: 10px}",
+            "table, th, td {border: 1px solid lightgray;padding: 5px;}",
+            "th {background: #337ab773}",
+            "li {padding-left: 30px; list-style: none; margin-top: 10px}",
+            "li::first-letter {color: #5656a3}",
+            "h4 {color: #337ab7}",
+            ".nlm_full_row {background: #dfe5e7; font-weight: 600; color: #5656a3}",
+            "</style>",
+        ]
+        return "".join(css_chunks)
 
     def get_styles_from_doc(self):
         """
@@ -2,7 +2,6 @@ import copy
 import operator
 import unicodedata
 
-from nlm_ingestor.ingestor import line_parser
 from nlm_ingestor.ingestor.visual_ingestor import table_parser
 from nlm_ingestor.ingestor_utils.utils import detect_block_center_aligned
 
@@ -149,7 +148,7 @@ class IndentParser:
                 )
                 not_symbol_start = block["block_text"][0].isalnum()
 
-                line = line_parser.Line(block["block_text"])
+                line = self.doc.line_cache.get_line(block["block_text"])
                 if (
                     block["block_text"].isupper()
                     and header_numbers_limit
@@ -0,0 +1,144 @@
+from collections.abc import Mapping
+
+import numpy as np
+
+from nlm_ingestor.ingestor_utils.ing_named_tuples import BoxStyle
+
+LINE_DTYPE = np.dtype(
+    [
+        ("top", np.float64),
+        ("left", np.float64),
+        ("right", np.float64),
+        ("width", np.float64),
+        ("height", np.float64),
+        ("style_id", np.int64),
+        # -1 for lines without text
+        ("word_count", np.int64),
+        ("page_idx", np.int64),
+    ]
+)
+
+
+class LineView(Mapping):
+    """
+    Read only dict like view of a line of a LineTable, with the columns of the table
+    and box_style as keys.
+    """
+
+    def __init__(self, line_table, line_idx):
+        self.line_table = line_table
+        self.line_idx = line_idx
+
+    def __getitem__(self, key):
+        line = self.line_table.lines[self.line_idx]
+        if key == "box_style":
+            return BoxStyle(*(line[field].item() for field in BoxStyle._fields))
+        return line[key].item()
+
+    def __iter__(self):
+        yield from LINE_DTYPE.names
+        yield "box_style"
+
+    def __len__(self):
+        return len(LINE_DTYPE.names) + 1
+
+
+class LineTable:
+    """
+    Box, style id and word count of the lines of a page as a structured array, lines
+    are appended while the page is read and frozen into the array at the end of it.
+    """
+
+    def __init__(self, page_idx):
+        self.page_idx = page_idx
+        self.rows = []
+        self.lines = np.empty(0, dtype=LINE_DTYPE)
+        # line_gaps of the frozen table
+        self.gaps = None
+
+    def append(self, box_style, style_id, word_count):
+        self.rows.append((*box_style, style_id, word_count, self.page_idx))
+
+    def freeze(self):
+        self.lines = np.array(self.rows, dtype=LINE_DTYPE)
+        self.rows = None
+        self.gaps = self.line_gaps()
+        return self
+
+    def map_style_ids(self, style_ids):
+        """
+        Replaces the style ids of the lines and gaps, style id i becomes style_ids[i]
+        """
+        style_ids = np.array(style_ids, dtype=np.int64)
+        if len(self.lines):
+            self.lines["style_id"] = style_ids[self.lines["style_id"]]
+        self.gaps = tuple(
+            (style_ids[gap_style_ids] if len(gap_style_ids) else gap_style_ids, gaps)
+            for gap_style_ids, gaps in self.gaps
+        )
+
+    def __len__(self):
+        return len(self.lines)
+
+    def __getitem__(self, line_idx):
+        if not -len(self.lines) <= line_idx < len(self.lines):
+            raise IndexError(line_idx)
+        return LineView(self, line_idx % len(self.lines))
+
+    def text_lines(self):
+        """
+        :return: Lines that have text
+        """
+        return self.lines[self.lines["word_count"] >= 0]
+
+    def line_gaps(self):
+        """
+        Gaps between consecutive lines of the page with the same style, rounded to
+        0.1 pixel. Spaces are between the tops of lines with different tops, word
+        spaces are between the right of a line and the left of the next one on the
+        same top. Only positive gaps are kept.
+        :return: (style ids, spaces), (style ids, word spaces) in page order
+        """
+        lines = self.lines
+        same_style = lines["style_id"][1:] == lines["style_id"][:-1]
+        same_top = lines["top"][1:] == lines["top"][:-1]
+        space_diffs = lines["top"][1:] - lines["top"][:-1]
+        word_space_diffs = lines["left"][1:] - lines["right"][:-1]
+        style_ids = lines["style_id"][1:]
+        return (
+            self.positive_rounded_gaps(style_ids, space_diffs, same_style & ~same_top),
+            self.positive_rounded_gaps(
+                style_ids, word_space_diffs, same_style & same_top
+            ),
+        )
+
+    @staticmethod
+    def positive_rounded_gaps(style_ids, diffs, mask):
+        # gaps that round to 0 are dropped after rounding, python's round is used as
+        # np.round does not round the decimal value of a float correctly
+        mask = mask & (diffs > 0)
+        gaps = np.array(
+            [round(diff, 1) for diff in diffs[mask].tolist()], dtype=np.float64
+        )
+        positive = gaps > 0
+        return style_ids[mask][positive], gaps[positive]
+
+
+def group_by_style(style_ids, values):
+    """
+    Groups the values by style id, keeping the order of the values within a group.
+    :return: Dict of style id -> list of values, in the order the styles first occur
+    """
+    if len(style_ids) == 0:
+        return {}
+    order = np.argsort(style_ids, kind="stable")
+    sorted_ids = style_ids[order]
+    group_starts = np.flatnonzero(np.r_[True, sorted_ids[1:] != sorted_ids[:-1]])
+    group_ends = np.r_[group_starts[1:], len(sorted_ids)]
+    sorted_values = values[order]
+    groups = [
+        (order[start], sorted_ids[start].item(), sorted_values[start:end].tolist())
+        for start, end in zip(group_starts, group_ends)
+    ]
+    groups.sort(key=lambda group: group[0])
+    return {style_id: group_values for _, style_id, group_values in groups}
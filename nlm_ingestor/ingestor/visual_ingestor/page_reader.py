@@ -0,0 +1,81 @@
+import re
+
+from bs4 import BeautifulSoup
+from lxml import etree
+
+from nlm_ingestor.ingestor_utils import stage_timer
+from nlm_ingestor.ingestor_utils.ing_named_tuples import PageHtml
+
+# control characters are not allowed in XML, html.parser kept them as text
+invalid_xml_char_pattern = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+
+def is_page_div(element):
+    return (
+        etree.QName(element).localname == "div"
+        and "page" in (element.get("class") or "").split()
+    )
+
+
+class TikaPageReader:
+    """
+    Reads the page divs of the XHTML returned by tika one at a time.
+    The document is fed incrementally to an lxml pull parser, each finished page is
+    handed out as a BeautifulSoup tag of its own and the lxml element is freed right
+    after, so memory grows with the largest page instead of the whole document.
+    The meta tags of the head are collected in meta_tags (as attribute dicts) while
+    the pages are read.
+    """
+
+    def __init__(self, content, as_html=False):
+        """
+        :param content: XHTML string or bytes returned by tika
+        :param as_html: Hand out the pages as PageHtml, to be parsed into tags by
+        whoever processes them
+        """
+        self.content = content
+        self.as_html = as_html
+        self.meta_tags = []
+
+    def __iter__(self):
+        parser = etree.XMLPullParser(events=("end",), recover=True, huge_tree=True)
+        for chunk in self.iter_chunks():
+            parser.feed(chunk)
+            yield from self.read_pages(parser)
+        parser.close()
+        yield from self.read_pages(parser)
+
+    def iter_chunks(self, chunk_size=1 << 20):
+        """
+        Feeds the content to the parser in chunks, so that no encoded copy of the
+        whole document is made.
+        """
+        content = self.content
+        for start in range(0, len(content), chunk_size):
+            chunk = content[start : start + chunk_size]
+            if isinstance(chunk, str):
+                chunk = invalid_xml_char_pattern.sub(" ", chunk).encode("utf-8")
+            yield chunk
+
+    def read_pages(self, parser):
+        for _, element in parser.read_events():
+            if not isinstance(element.tag, str):
+                continue
+            if etree.QName(element).localname == "meta":
+                self.meta_tags.append(dict(element.attrib))
+            elif is_page_div(element):
+                with stage_timer.stage("soup_parsing"):
+                    page_html = etree.tostring(
+                        element, encoding="unicode", with_tail=False
+                    )
+                    if self.as_html:
+                        page = PageHtml(dict(element.attrib), page_html)
+                    else:
+                        page = BeautifulSoup(page_html, "html.parser").div
+                # drop the parsed page and everything before it
+                element.clear(keep_tail=False)
+                parent = element.getparent()
+                if parent is not None:
+                    while element.getprevious() is not None:
+                        del parent[0]
+                yield page
@@ -1,10 +1,66 @@
+import threading
+
 from nlm_ingestor.ingestor_utils.ing_named_tuples import BoxStyle, LineStyle
+from nlm_ingestor.ingestor_utils.lru_cache import LRUCache
 
 font_weights = {"normal": 400, "bold": 600, "bolder": 900, "lighter": 200}
 font_families = {"bold": 600, "light": 200}
 font_scale = 1.2
 
 
+# interned word / line styles, tika repeats the same few fonts on every line
+STYLE_CACHE_SIZE = 10000
+# word styles by (word font, line font family)
+word_style_cache = LRUCache(STYLE_CACHE_SIZE)
+# line styles by themselves
+line_style_cache = LRUCache(STYLE_CACHE_SIZE)
+style_cache_lock = threading.Lock()
+
+
+def intern_style(cache, key, style):
+    """
+    :param cache: word_style_cache or line_style_cache
+    :return: The style cached under key, caching style if there is none
+    """
+    with style_cache_lock:
+        if key in cache:
+            return cache[key]
+        cache[key] = style
+    return style
+
+
+def get_word_line_style(word_font, font_family):
+    """
+    :param word_font: One entry of the tika word-fonts list,
+    font family, font weight, font style, font size, line height and space width
+    :param font_family: Font family of the line
+    :return: LineStyle of the word, shared by all words with the same font
+    """
+    key = (word_font, font_family)
+    with style_cache_lock:
+        word_line_style = word_style_cache[key] if key in word_style_cache else None
+    if word_line_style is None:
+        wf = word_font
+        if "," in font_family and font_family in wf:
+            new_font_family = font_family.replace(",", "-")
+            wf = wf.replace(font_family, new_font_family)
+        wf_parts = wf.split(",")
+        word_line_style = intern_style(
+            word_style_cache,
+            key,
+            LineStyle(
+                wf_parts[0],
+                wf_parts[2],
+                round(font_scale * float(wf_parts[3]), 1),
+                get_numeric_font_weight(wf_parts[0], wf_parts[1]),
+                "none",
+                round(float(wf_parts[5]), 2),
+                "left",
+            ),
+        )
+    return word_line_style
+
+
 def parse_tika_style(style_str: str, text_str: str, page_width: float) -> dict:
     """
     Takes tika format style and simplifies it for sorting and grouping
@@ -15,19 +71,24 @@ def parse_tika_style(style_str: str, text_str: str, page_width: float) -> dict:
     BoxStyle(top=121.12, left=384.37, width=0.0, height=4.14
     line properties
     LineStyle(line_height=4.14, font_family='RobotoRegular', font_style='normal', font_size=4.14, font_weight=400)
+    Only the first and last word positions are parsed (all of them when tika puts
+    the line end before its start) and LineStyles are interned in word_style_cache and
+    line_style_cache.
     """
 
     input_style = get_style_kv(style_str)
-    word_start_pos = input_style["word-start-positions"][2:-2].split("), (")
-    word_end_pos = input_style["word-end-positions"][2:-2].split("), (")
+    word_start_positions = input_style["word-start-positions"][2:-2]
+    word_end_positions = input_style["word-end-positions"][2:-2]
     word_fonts = input_style["word-fonts"][2:-2].split("), (")
-    left = round(float(word_start_pos[0].split(",")[0]), 2)
-    right = round(float(word_end_pos[-1].split(",")[0]), 2)
+    left = round(float(word_start_positions.split("), (", 1)[0].split(",", 1)[0]), 2)
+    right = round(float(word_end_positions.rsplit("), (", 1)[-1].split(",", 1)[0]), 2)
     # height = parse_px(input_style['height'])
     font_size_height = parse_px(input_style["font-size"])
     if right < left:
         # We have some issues here with Tika
         # Are all the word end positions having the same top? aka, same line are we dealing with?
+        word_start_pos = word_start_positions.split("), (")
+        word_end_pos = word_end_positions.split("), (")
         same_top = True
         for idx, _ in enumerate(word_end_pos[:-1]):
             if (
@@ -61,27 +122,8 @@ def parse_tika_style(style_str: str, text_str: str, page_width: float) -> dict:
     font_size = round(font_scale * font_size_height, 1)
     text_transform = "none"  # "uppercase" if text_str.isupper() else "none"
     text_align = "left"  # "center" if is_center_aligned else "left"
-    font_space_width = 1.5
-    word_line_styles = []
-    for wf_idx, wf in enumerate(word_fonts):
-        if "," in font_family and font_family in wf:
-            new_font_family = font_family.replace(",", "-")
-            wf = wf.replace(font_family, new_font_family)
-        wf_parts = wf.split(",")
-        wf_font_space_width = round(float(wf_parts[5]), 2)
-        word_line_styles.append(
-            LineStyle(
-                wf_parts[0],
-                wf_parts[2],
-                round(font_scale * float(wf_parts[3]), 1),
-                get_numeric_font_weight(wf_parts[0], wf_parts[1]),
-                text_transform,
-                wf_font_space_width,
-                text_align,
-            )
-        )
-        if wf_idx == 0:
-            font_space_width = wf_font_space_width
+    word_line_styles = [get_word_line_style(wf, font_family) for wf in word_fonts]
+    font_space_width = word_line_styles[0].font_space_width
 
     line_style = LineStyle(
         font_family,
@@ -92,19 +134,17 @@ def parse_tika_style(style_str: str, text_str: str, page_width: float) -> dict:
         font_space_width,
         text_align,
     )
-    # print(word_start_pos[1])
-    # for word_font in word_fonts:
-    #     print(word_font)
+    line_style = intern_style(line_style_cache, line_style, line_style)
     return box_style, line_style, word_line_styles
 
 
 def get_style_kv(style_str):
-    parts = style_str.split(";")
     input_style = {}
-    for part in parts:
-        kv = part.split(":")
-        if len(kv) == 2:
-            input_style[kv[0].strip()] = kv[1].strip()
+    for part in style_str.split(";"):
+        key, sep, value = part.partition(":")
+        # parts with more than one colon are skipped
+        if sep and ":" not in value:
+            input_style[key.strip()] = value.strip()
     return input_style
 
 
@@ -0,0 +1,225 @@
+import bisect
+import math
+
+
+def grid_cell(*coordinates):
+    """
+    :return: Cell of the 1 pixel grid the coordinates are in or None if one of them is
+    not finite (it can't be within 1 pixel of anything)
+    """
+    if not all(math.isfinite(coordinate) for coordinate in coordinates):
+        return None
+    return tuple(math.floor(coordinate) for coordinate in coordinates)
+
+
+def neighbour_cells(cell):
+    """
+    :return: The cells of the 1 pixel grid that can hold coordinates that are less
+    than 1 pixel away from the ones in cell
+    """
+    if cell is None:
+        return []
+    first, second = cell
+    return [
+        (first + first_offset, second + second_offset)
+        for first_offset in (-1, 0, 1)
+        for second_offset in (-1, 0, 1)
+    ]
+
+
+class SvgLineMerger:
+    """
+    Collects the horizontal and vertical svg lines of a page, dropping duplicates
+    (all coordinates < 1 pixel apart) and merging lines that continue each other
+    (same y or x and the end of one < 1 pixel from the start of the other).
+    A new line is compared with the first matching line that was kept, as it would
+    be by going over all the kept lines in order. Instead of going over them, the
+    kept lines are indexed in a grid of 1 pixel cells on the coordinates each of the
+    checks compares, so only the lines in the neighbouring cells are compared.
+    A merged line is indexed again with its new coordinates, stale entries are
+    filtered out by comparing with the current coordinates of the line.
+    """
+
+    def __init__(self):
+        self.lines = []
+        # (x1, y1) cell -> positions of the lines
+        self.start_index = {}
+        # (y1, x1) and (y1, x2) cells -> positions of the horizontal lines
+        self.horizontal_start_index = {}
+        self.horizontal_end_index = {}
+        # (x1, y1) and (x1, y2) cells -> positions of the vertical lines
+        self.vertical_start_index = {}
+        self.vertical_end_index = {}
+
+    @staticmethod
+    def add_to_index(index, cell, position):
+        if cell is not None:
+            index.setdefault(cell, []).append(position)
+
+    @staticmethod
+    def positions_near(index, cell):
+        positions = []
+        for neighbour_cell in neighbour_cells(cell):
+            positions.extend(index.get(neighbour_cell, ()))
+        return positions
+
+    def index_line(self, position):
+        line = self.lines[position]
+        x1, y1, x2, y2 = line["x1"], line["y1"], line["x2"], line["y2"]
+        self.add_to_index(self.start_index, grid_cell(x1, y1), position)
+        if abs(y1 - y2) < 1.0:
+            self.add_to_index(self.horizontal_start_index, grid_cell(y1, x1), position)
+            self.add_to_index(self.horizontal_end_index, grid_cell(y1, x2), position)
+        if abs(x1 - x2) < 1.0:
+            self.add_to_index(self.vertical_start_index, grid_cell(x1, y1), position)
+            self.add_to_index(self.vertical_end_index, grid_cell(x1, y2), position)
+
+    def candidate_positions(self, x1, y1, x2, y2):
+        """
+        :return: Sorted positions of the kept lines that may match the new line
+        """
+        positions = self.positions_near(self.start_index, grid_cell(x1, y1))
+        if abs(y1 - y2) < 1.0:
+            positions += self.positions_near(
+                self.horizontal_start_index, grid_cell(y1, x2)
+            )
+            positions += self.positions_near(
+                self.horizontal_end_index, grid_cell(y1, x1)
+            )
+        if abs(x1 - x2) < 1.0:
+            positions += self.positions_near(
+                self.vertical_start_index, grid_cell(x1, y2)
+            )
+            positions += self.positions_near(self.vertical_end_index, grid_cell(x1, y1))
+        return sorted(set(positions))
+
+    def add(self, x1, y1, x2, y2, style):
+        """
+        Adds a line unless it is a duplicate of a kept line or continues one, in which
+        case the kept line is extended.
+        """
+        for position in self.candidate_positions(x1, y1, x2, y2):
+            line = self.lines[position]
+            if (
+                abs(x1 - line["x1"]) < 1.0
+                and abs(y1 - line["y1"]) < 1.0
+                and abs(x2 - line["x2"]) < 1.0
+                and abs(y2 - line["y2"]) < 1.0
+            ):
+                return
+            elif (
+                (abs(x2 - line["x1"]) < 1.0 or abs(x1 - line["x2"]) < 1.0)
+                and abs(y1 - y2) < 1.0
+                and abs(line["y1"] - line["y2"]) < 1.0
+                and abs(y1 - line["y1"]) < 1.0
+            ):
+                # Have the same top, and the difference between the start and end of the lines are < 1.0 pixel
+                # Merge them
+                line["x1"] = min(x1, line["x1"])
+                line["x2"] = max(x2, line["x2"])
+                self.index_line(position)
+                return
+            elif (
+                (abs(y2 - line["y1"]) < 1.0 or abs(y1 - line["y2"]) < 1.0)
+                and abs(x1 - x2) < 1.0
+                and abs(line["x1"] - line["x2"]) < 1.0
+                and abs(x1 - line["x1"]) < 1.0
+            ):
+                # Have the same x, and the difference between the start and end of the lines are < 1.0 pixel
+                # Merge the vertical lines
+                line["y1"] = min(y1, line["y1"])
+                line["y2"] = max(y2, line["y2"])
+                self.index_line(position)
+                return
+        self.lines.append(
+            {
+                "x1": x1,
+                "y1": y1,
+                "x2": x2,
+                "y2": y2,
+                "style": style,
+            }
+        )
+        self.index_line(len(self.lines) - 1)
+
+
+class SvgRulingIndex:
+    """
+    The svg lines of a page sorted by their y1, so that the lines between two
+    blocks are found by bisecting on the gap between them instead of going over
+    every line of the page. Lines keep their position on the page, checks that stop
+    at the first matching line take the first one in page order.
+    """
+
+    def __init__(self, lines_tag_list):
+        """
+        :param lines_tag_list: svg line tags (or dicts) with x1, y1, x2 and y2
+        """
+        self.num_lines = len(lines_tag_list)
+        rulings = []
+        for position, line in enumerate(lines_tag_list):
+            line_y1 = float(line["y1"])
+            # a line without a y can't be between anything
+            if not math.isnan(line_y1):
+                rulings.append(
+                    (line_y1, position, float(line["x1"]), float(line["x2"]))
+                )
+        rulings.sort(key=lambda ruling: ruling[:2])
+        self.ys = [ruling[0] for ruling in rulings]
+        self.rulings = rulings
+
+    def __len__(self):
+        return self.num_lines
+
+    def lines_between(self, top, bottom):
+        """
+        :return: (y1, position, x1, x2) of the lines with top <= y1 <= bottom in page order
+        """
+        start = bisect.bisect_left(self.ys, top)
+        end = bisect.bisect_right(self.ys, bottom)
+        return sorted(self.rulings[start:end], key=lambda ruling: ruling[1])
+
+
+class SvgRectIndex:
+    """
+    The svg rects of a page sorted by their top, so that the rects that can hold a
+    box are found by bisecting on the top of the box.
+    """
+
+    def __init__(self, rect_tag_list):
+        """
+        :param rect_tag_list: svg rect attributes with x, y, height and width
+        """
+        self.num_rects = len(rect_tag_list)
+        rects = []
+        for rect in rect_tag_list:
+            rect_left = float(rect["x"])
+            rect_top = float(rect["y"])
+            rect_bottom = rect_top + float(rect["height"])
+            rect_right = rect_left + float(rect["width"])
+            if not math.isnan(rect_top):
+                rects.append((rect_top, rect_left, rect_bottom, rect_right))
+        rects.sort(key=lambda rect: rect[0])
+        self.tops = [rect[0] for rect in rects]
+        self.rects = rects
+
+    def __len__(self):
+        return self.num_rects
+
+    def contains_box(self, box_style):
+        """
+        :return: True if a rect holds the box (top, left, right, width, height)
+        """
+        box_top = box_style[0]
+        box_bottom = box_style[0] + box_style[4]
+        for rect_top, rect_left, rect_bottom, rect_right in self.rects[
+            : bisect.bisect_right(self.tops, box_top)
+        ]:
+            if (
+                box_top <= rect_bottom
+                and rect_left <= box_style[1] <= rect_right
+                and box_bottom <= rect_bottom
+                and box_style[2] <= rect_right
+            ):
+                return True
+        return False
@@ -860,7 +860,7 @@ class TableParser:
                             all_vls_in_same_span = last_vl_span == col_header_idx
                             last_vl_span = col_header_idx
         if all_vls_in_same_span:
-            new_vl = self.doc.merge_vls(tr_vls)
+            new_vl = self.doc.merge_vls(tr_vls, self.doc.line_cache)
             tr_block["visual_lines"] = [new_vl]
             if TABLE_COL_DEBUG:
                 print(f"\tMerged TR Block VLs {new_vl} while aligning.")
@@ -991,14 +991,20 @@ class TableParser:
                 # If the current VL is a short (in height) text when compared to the previous VL
                 are_joined = True
             if are_joined:
-                new_vl = self.doc.merge_line_info(prev_vl, curr_vl)
+                new_vl = self.doc.merge_line_info(
+                    prev_vl, curr_vl, line_cache=self.doc.line_cache
+                )
                 """
                 if changed:
                     # Do we need to check for multi-line column data (spanning more than 2 lines)
                     # TODO:
-                    new_vl = self.doc.merge_line_info(prev_vl, curr_vl)
+                    new_vl = self.doc.merge_line_info(
+                        prev_vl, curr_vl, line_cache=self.doc.line_cache
+                    )
                 else:
-                    new_vl = self.doc.merge_line_info(prev_vl, curr_vl)
+                    new_vl = self.doc.merge_line_info(
+                        prev_vl, curr_vl, line_cache=self.doc.line_cache
+                    )
                 """
                 prev_vl = new_vl
                 vl_buf.append(prev_vl)
@@ -1057,7 +1063,9 @@ class TableParser:
                     ):
                         are_aligned = False
                     if are_aligned:
-                        new_vl = self.doc.merge_line_info(prev_vl, curr_vl)
+                        new_vl = self.doc.merge_line_info(
+                            prev_vl, curr_vl, line_cache=self.doc.line_cache
+                        )
                         block["visual_lines"][0] = new_vl
                         block["block_text"] = (
                             prev_vl["text"] + " " + block["block_text"]
@@ -1101,7 +1109,7 @@ class TableParser:
                         for vl in curr_vls:
                             vl_buf.append(vl)
                         # new_vl = self.doc.merge_line_info(prev_vl, curr_vl)
-                        new_vl = self.doc.merge_vls(vl_buf)
+                        new_vl = self.doc.merge_vls(vl_buf, self.doc.line_cache)
                         # change second column of previous block
                         prev_block["visual_lines"][min_left_idx + 1] = new_vl
                         self.has_merged_cells = True
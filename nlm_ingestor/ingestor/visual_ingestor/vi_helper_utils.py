@@ -138,5 +138,5 @@ def get_avg_space_bw_multi_line_vls(visual_lines):
             )
         prev_vl = vl
     if len(spaces):
-        avg_space = np.mean(spaces)
+        avg_space = float(np.mean(spaces))
     return avg_space, spaces
@@ -1,11 +1,14 @@
 # parse style
 import copy
+import itertools
+import math
 import operator
 import pprint
 import re
 import string
 import sys
-from collections import OrderedDict, namedtuple
+from collections import OrderedDict, deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
 from itertools import groupby
 from timeit import default_timer
 from typing import Any, Dict, List
@@ -13,6 +16,7 @@ from typing import Any, Dict, List
 import numpy as np
 from bs4 import BeautifulSoup
 
+import nlm_ingestor.ingestion_daemon.config as cfg
 from nlm_ingestor.ingestor import line_parser
 from nlm_ingestor.ingestor.visual_ingestor import (
     block_renderer,
@@ -22,13 +26,27 @@ from nlm_ingestor.ingestor.visual_ingestor import (
     table_parser,
 )
 from nlm_ingestor.ingestor.visual_ingestor import vi_helper_utils as vhu
+from nlm_ingestor.ingestor.visual_ingestor.bbox_index import BBoxIndex
+from nlm_ingestor.ingestor.visual_ingestor.line_table import (
+    LINE_DTYPE,
+    LineTable,
+    group_by_style,
+)
+from nlm_ingestor.ingestor.visual_ingestor.svg_lines import (
+    SvgLineMerger,
+    SvgRectIndex,
+    SvgRulingIndex,
+)
+from nlm_ingestor.ingestor_utils import stage_timer
 from nlm_ingestor.ingestor_utils.ing_named_tuples import (
     BoxStyle,
     LineStyle,
     LocationKey,
+    PageHtml,
+    PTagRecord,
 )
 from nlm_ingestor.ingestor_utils.parsing_utils import *
-from nlm_ingestor.ingestor_utils.utils import sent_tokenize
+from nlm_ingestor.ingestor_utils.utils import batch_sent_tokenize, cached_sent_tokenize
 
 base_font_size = 3
 header_margin = 0.18  # don't touch this!
@@ -94,9 +112,9 @@ email_pattern = re.compile(
 )
 
 
-def get_block_type(group_is_list, group_is_table_row, group_text):
+def get_block_type(group_is_list, group_is_table_row, group_text, line_cache=None):
     block_type = "para"
-    line_props = line_parser.Line(group_text)
+    line_props = line_parser.get_line(group_text, line_cache)
     if group_is_list:
         block_type = "list_item"
     elif group_is_table_row:
@@ -106,17 +124,93 @@ def get_block_type(group_is_list, group_is_table_row, group_text):
     return block_type, line_props
 
 
+class ParsedPage:
+    """
+    Result of the first pass over a page (Doc.parse_page), merged into the document
+    by Doc.parse in page order.
+    """
+
+    def __init__(self, page_idx, page_style_kv, page_width, page_height):
+        self.page_idx = page_idx
+        self.page_style_kv = page_style_kv
+        self.page_width = page_width
+        self.page_height = page_height
+        # [SvgRulingIndex, SvgRectIndex] of the page
+        self.svg_tags = None
+        self.p_styles = []
+        # LineTable with style ids indexing line_styles
+        self.line_table = None
+        self.line_styles = []
+        self.page_headers = {}
+        self.page_footers = {}
+        self.last_line_counts = {}
+        self.page_stats = None
+        self.page_lines = []
+
+
+def get_page_workers():
+    """
+    :return: Number of processes that run the first pass over the pages of a document
+    """
+    return cfg.get_config_as_int("PDF_PAGE_WORKERS", 1)
+
+
+def page_div(page):
+    """
+    :param page: Page div tag or PageHtml
+    :return: Page div tag
+    """
+    if isinstance(page, PageHtml):
+        with stage_timer.stage("soup_parsing"):
+            return BeautifulSoup(page.html, "html.parser").div
+    return page
+
+
+def page_html(page):
+    """
+    :param page: Page div tag or PageHtml
+    :return: XHTML of the page, to send the page to another process
+    """
+    if isinstance(page, PageHtml):
+        return page.html
+    return str(page)
+
+
+def parse_page_chunk(page_inputs):
+    """
+    Runs Doc.parse_page on a chunk of pages in a pool worker.
+    :param page_inputs: Arguments of Doc.parse_page, with the XHTML of the page
+    :return: List of ParsedPage
+    """
+    return [
+        Doc.parse_page(page_idx, PageHtml({}, html), *page_style)
+        for page_idx, html, *page_style in page_inputs
+    ]
+
+
 class Doc:
     def __init__(
         self, pages, ignore_blocks, render_format: str = "all", audited_bbox=None
     ):
-        self.pages = pages
+        """
+        :param pages: Iterable of the page div tags of the tika XHTML, pages are read
+        only once and are not kept, so a page reader may generate them one at a time
+        """
+        # lines parsed by line_parser for the document
+        self.line_cache = line_parser.LineCache()
+        # text and style of the p tags of every page
+        self.page_lines = []
+        self.num_pages = 0
         self.line_style_classes = dict()
+        # (style without font_space_width, floor of font_space_width) ->
+        # [(position in line_style_classes, style)], see get_class
+        self.line_style_index = dict()
         self.class_line_styles = dict()
         self.class_stats = dict()
         self.render_format = render_format
-        self.html_str = ""
-        self.json_dict = None
+        # rendered when they are first read, see render_json and render_html
+        self._html_str = None
+        self._json_dict = None
         self.blocks = []
         self.header_styles = []
         self.normal_styles = []
@@ -133,19 +227,271 @@ class Doc:
         self.line_style_word_space_stats = {}
         self.line_style_word_stats = {}
         self.visual_line_word_stats = {}
+        # LineTable of every page, the style_id of a line indexes line_style_by_id
+        self.page_line_tables = []
+        self.line_style_ids = {}
+        self.line_style_by_id = []
         self.is_justified = False
         self.page_styles = (
             []
         )  # Style specific to a page. Height, width, space stats etc.
         self.audited_bbox = audited_bbox
         self.audited_table_bbox = {}
+        # page_idx -> BBoxIndex of the audited table bboxes
+        self.audited_table_bbox_index = {}
         self.page_svg_tags = []
         if PERFORMANCE_DEBUG:
             self.wall_time = default_timer()
         self.parse(pages)
 
+    def compute_line_style_stats(self):
+        """
+        Collects from the line tables of the pages, per line style in the order the
+        styles first occur:
+        line_style_word_stats: word counts of the lines with text
+        line_style_space_stats: spaces between the tops of consecutive lines
+        line_style_word_space_stats: spaces between consecutive lines on the same top
+        """
+        text_lines = np.concatenate(
+            [table.text_lines() for table in self.page_line_tables]
+            or [np.empty(0, dtype=LINE_DTYPE)]
+        )
+        word_counts = group_by_style(text_lines["style_id"], text_lines["word_count"])
+        for style_id, style_word_counts in word_counts.items():
+            self.line_style_word_stats[self.line_style_by_id[style_id]] = (
+                style_word_counts
+            )
+        for gap_idx, stats in enumerate(
+            [self.line_style_space_stats, self.line_style_word_space_stats]
+        ):
+            page_gaps = [table.gaps[gap_idx] for table in self.page_line_tables]
+            style_ids = np.concatenate(
+                [style_ids for style_ids, _ in page_gaps]
+                or [np.empty(0, dtype=np.int64)]
+            )
+            gaps = np.concatenate(
+                [gaps for _, gaps in page_gaps] or [np.empty(0, dtype=np.float64)]
+            )
+            for style_id, style_gaps in group_by_style(style_ids, gaps).items():
+                stats[self.line_style_by_id[style_id]] = style_gaps
+
+    def parse_pages(self, pages):
+        """
+        Runs the first pass over the pages, in a pool of PDF_PAGE_WORKERS processes
+        if it is more than 1 and there is more than a chunk of PDF_PAGE_CHUNK_SIZE
+        pages. The page styles are read here, as the first page decides the
+        defaults of the document.
+        :param pages: Iterable of page div tags or PageHtml
+        :return: Generator of ParsedPage in page order
+        """
+        page_workers = get_page_workers()
+        chunk_size = max(cfg.get_config_as_int("PDF_PAGE_CHUNK_SIZE", 8), 1)
+        page_inputs = self.read_page_styles(pages)
+        if page_workers <= 1:
+            for page_input in page_inputs:
+                yield Doc.parse_page(*page_input)
+            return
+        first_chunk = list(itertools.islice(page_inputs, chunk_size))
+        if len(first_chunk) < chunk_size:
+            for page_input in first_chunk:
+                yield Doc.parse_page(*page_input)
+            return
+        page_chunks = itertools.chain(
+            [first_chunk],
+            iter(lambda: list(itertools.islice(page_inputs, chunk_size)), []),
+        )
+        with ProcessPoolExecutor(max_workers=page_workers) as executor:
+            # a bounded number of chunks in flight, so pages are not all read at once
+            pending = deque()
+            for page_chunk in page_chunks:
+                pending.append(
+                    executor.submit(
+                        parse_page_chunk,
+                        [
+                            (page_idx, page_html(page), *page_style)
+                            for page_idx, page, *page_style in page_chunk
+                        ],
+                    )
+                )
+                if len(pending) >= 2 * page_workers:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+
+    def read_page_styles(self, pages):
+        """
+        Reads the style of the pages, the first page gives the default style and the
+        first page with a height gives the footer cutoff of all pages.
+        :return: Generator of (page_idx, page, page_style_kv, page_width, page_height,
+        footer_cutoff) of the pages
+        """
+        first_page_style = None
+        for page_idx, page in enumerate(pages):
+            if first_page_style is None:
+                first_page_style = page.attrs["style"]
+            page_style = page.attrs.get("style", None) or first_page_style
+            page_style_kv = style_utils.get_style_kv(page_style)
+            page_width = style_utils.parse_px(page_style_kv["width"])
+            self.page_width = self.page_width or page_width
+            page_height = style_utils.parse_px(page_style_kv["height"])
+            self.page_height = self.page_height or page_height
+            footer_cutoff = self.page_height - footer_margin * self.page_height
+            yield page_idx, page, page_style_kv, page_width, page_height, footer_cutoff
+
+    @staticmethod
+    def parse_page(
+        page_idx, page, page_style_kv, page_width, page_height, footer_cutoff
+    ):
+        """
+        First pass over a page: removes empty lines, parses the styles of the lines,
+        collects the header / footer candidates and the line stats of the page.
+        Depends only on the page, so pages can be parsed in any order or process.
+        :param page: Page div tag or PageHtml
+        :return: ParsedPage
+        """
+        page = page_div(page)
+        soup = BeautifulSoup()
+        parsed_page = ParsedPage(page_idx, page_style_kv, page_width, page_height)
+        page_headers = parsed_page.page_headers
+        page_footers = parsed_page.page_footers
+        last_line_counts = parsed_page.last_line_counts
+        all_p = page.find_all("p")
+        svg_children = page.find("svg") or []
+        lines_tag_list, rect_tag_list = Doc.remove_duplicate_svg_tags(
+            soup, svg_children
+        )
+        parsed_page.svg_tags = [
+            SvgRulingIndex(lines_tag_list),
+            SvgRectIndex(rect_tag_list),
+        ]
+        header_cutoff = header_margin * page_height
+        # print("page_dims: ", page_width, page_height)
+        # print("margins: ", header_margin*page_height, footer_margin*page_height)
+        p_styles = parsed_page.p_styles
+        # local style ids of the line table, in the order the styles occur
+        line_style_ids = {}
+        page_line_table = LineTable(page_idx)
+        prev_p_tag = None
+        for line_idx, orig_p in enumerate(all_p):
+            # Reformat p if the text contains items to be replaced.
+            new_p = None
+            changed = False
+            if filter_out_pattern.search(orig_p.text) is not None:
+                new_p, changed = style_utils.format_p_tag(
+                    orig_p, filter_out_pattern, filter_ls_pattern, soup
+                )
+            if orig_p.text.strip() == "":
+                orig_p.decompose()
+                line_idx += 1
+                continue
+            p_list = [orig_p]
+            if new_p:
+                if prev_p_tag:
+                    prev_p_tag.insert_after(new_p)
+                else:
+                    page.insert(0, new_p)
+                p_list = [new_p, orig_p]
+            for p in p_list:
+                if line_idx > len(all_p) - 3:
+                    text_only = text_only_pattern.sub("", p.text).strip()
+                    if not (text_only == "" and year_pattern.search(p.text) is None):
+                        # Possible year?
+                        if text_only not in last_line_counts:
+                            last_line_counts[text_only] = 1
+                        else:
+                            last_line_counts[text_only] = (
+                                last_line_counts[text_only] + 1
+                            )
+                with stage_timer.stage("style_parsing"):
+                    box_style, line_style, word_line_styles = (
+                        style_utils.parse_tika_style(p["style"], p.text, page_width)
+                    )
+                is_page_header = box_style[0] < header_cutoff  # Check box_style.top
+                is_page_footer = box_style[0] > footer_cutoff  # Check box_style.top
+
+                loc_key = "N/A"
+                if is_page_header or is_page_footer:
+                    loc_key = Doc.get_location_key(box_style, p.text)
+                    if is_page_header:
+                        if loc_key in page_headers:
+                            page_headers[loc_key].append(page_idx)
+                        else:
+                            page_headers[loc_key] = [page_idx]
+                    else:
+                        if loc_key in page_footers:
+                            page_footers[loc_key].append(page_idx)
+                        else:
+                            page_footers[loc_key] = [page_idx]
+
+                p_styles.append(
+                    (
+                        box_style,
+                        line_style,
+                        word_line_styles,
+                        loc_key,
+                        is_page_header,
+                        is_page_footer,
+                        changed,
+                    ),
+                )
+                if line_style not in line_style_ids:
+                    line_style_ids[line_style] = len(line_style_ids)
+                page_line_table.append(
+                    box_style,
+                    line_style_ids[line_style],
+                    len(p.text.split()) if len(p.text) > 0 else -1,
+                )
+                prev_p_tag = p
+                changed = False  # Reset the change here. Change is meant for only the first p_tag
+        parsed_page.line_styles = list(line_style_ids)
+        parsed_page.line_table = page_line_table.freeze()
+        # Calculate the page stats.
+        # Max number of lines and most frequent space gaps between lines etc
+        page_line_stats = {}
+        (space_style_ids, spaces), _ = page_line_table.gaps
+        page_spaces = group_by_style(space_style_ids, spaces)
+        for style_id, style_spaces in page_spaces.items():
+            space_counts = {}
+            for space in style_spaces:
+                space_counts[space] = space_counts.get(space, 0) + 1
+            page_line_stats[style_id] = {
+                "lines": len(style_spaces),
+                "space_counts": space_counts,
+            }
+        max_lines = 0
+        most_freq_spaces = {}
+        for style_id in page_line_stats:
+            max_lines = max(max_lines, page_line_stats[style_id]["lines"])
+            max_count = 0
+            ls_most_freq_space = -1
+            for space, space_count in page_line_stats[style_id]["space_counts"].items():
+                if space_count > max_count:
+                    max_count = space_count
+                    ls_most_freq_space = space
+            most_freq_spaces[ls_most_freq_space] = (
+                most_freq_spaces.get(ls_most_freq_space, 0) + max_count
+            )
+        most_freq_space = 0
+        if most_freq_spaces:
+            most_freq_space = max(most_freq_spaces.items(), key=operator.itemgetter(1))[
+                0
+            ]
+        page_stats = {"lines": max_lines, "most_frequent_space": most_freq_space}
+        parsed_page.page_stats = page_stats
+        # the rest of the parse only needs the lines, the page tree can be freed
+        page_lines = []
+        for line_idx, p in enumerate(page.find_all("p")):
+            # the style is only needed to split lines with words of mixed styles
+            has_mixed_words = (
+                line_idx < len(p_styles) and len(set(p_styles[line_idx][2])) > 1
+            )
+            page_lines.append(
+                PTagRecord(p.text, p.get("style") if has_mixed_words else None)
+            )
+        parsed_page.page_lines = page_lines
+        return parsed_page
+
     def parse(self, pages):
-        pages = pages
         group_buf = []
         grouped_body_str = "<body>"
         class_name = "none"
@@ -162,186 +508,60 @@ class Doc:
         page_idx = 0
         blocks_by_page = []
         page_blocks = []
-        vl_word_counts = []
-        soup = BeautifulSoup()
         if self.audited_bbox:
-            # Group by page_idx for later usage.
+            # Group by page_idx for later usage, groupby needs them sorted by page.
             table_query = {"block_type": "table"}
+            audited_bbox_by_page = {}
             for page_id, bboxes in groupby(
-                audited_bbox, key=lambda bbox: bbox.page_idx
+                sorted(self.audited_bbox, key=lambda bbox: bbox.page_idx),
+                key=lambda bbox: bbox.page_idx,
             ):
                 list_of_bbox = list(bboxes)
-                self.audited_bbox[page_id] = list_of_bbox
+                audited_bbox_by_page[page_id] = list_of_bbox
                 self.audited_table_bbox[page_id] = list(
                     self.filter_list_of_bbox(list_of_bbox, **table_query)
                 )
+                self.audited_table_bbox_index[page_id] = BBoxIndex(
+                    self.audited_table_bbox[page_id]
+                )
+            self.audited_bbox = audited_bbox_by_page
         if BLOCK_DEBUG:
             print("Audited Table Boxes: ", self.audited_table_bbox)
-        for page_idx, page in enumerate(pages):
-            all_p = page.find_all("p")
-            svg_children = page.find("svg") or []
-            lines_tag_list, rect_tag_list = Doc.remove_duplicate_svg_tags(
-                soup, svg_children
-            )
-
-            self.page_svg_tags.append([lines_tag_list, rect_tag_list])
-            # page_style = pages[0].attrs["style"]
-            page_style = (
-                pages[page_idx].attrs.get("style", None) or pages[0].attrs["style"]
-            )
-            page_style_kv = style_utils.get_style_kv(page_style)
-            page_width = style_utils.parse_px(page_style_kv["width"])
-            self.page_width = self.page_width or page_width
-            page_height = style_utils.parse_px(page_style_kv["height"])
-            self.page_height = self.page_height or page_height
-            header_cutoff = header_margin * page_height
-            footer_cutoff = self.page_height - footer_margin * self.page_height
-            # print("page_dims: ", page_width, page_height)
-            # print("margins: ", header_margin*page_height, footer_margin*page_height)
-            p_styles = []
-            prev_box_style = None
-            prev_line_style = None
-            page_line_stats = {}
-            prev_p_tag = None
-            for line_idx, orig_p in enumerate(all_p):
-                # Reformat p if the text contains items to be replaced.
-                new_p = None
-                changed = False
-                if filter_out_pattern.search(orig_p.text) is not None:
-                    new_p, changed = style_utils.format_p_tag(
-                        orig_p, filter_out_pattern, filter_ls_pattern, soup
-                    )
-                if orig_p.text.strip() == "":
-                    orig_p.decompose()
-                    line_idx += 1
-                    continue
-                p_list = [orig_p]
-                if new_p:
-                    if prev_p_tag:
-                        prev_p_tag.insert_after(new_p)
-                    else:
-                        page.insert(0, new_p)
-                    p_list = [new_p, orig_p]
-                for p in p_list:
-                    if line_idx > len(all_p) - 3:
-                        text_only = text_only_pattern.sub("", p.text).strip()
-                        if not (
-                            text_only == "" and year_pattern.search(p.text) is None
-                        ):
-                            # Possible year?
-                            if text_only not in last_line_counts:
-                                last_line_counts[text_only] = 1
-                            else:
-                                last_line_counts[text_only] = (
-                                    last_line_counts[text_only] + 1
-                                )
-                    box_style, line_style, word_line_styles = (
-                        style_utils.parse_tika_style(p["style"], p.text, page_width)
-                    )
-                    is_page_header = box_style[0] < header_cutoff  # Check box_style.top
-                    is_page_footer = box_style[0] > footer_cutoff  # Check box_style.top
-
-                    loc_key = "N/A"
-                    if is_page_header or is_page_footer:
-                        loc_key = Doc.get_location_key(box_style, p.text)
-                        if is_page_header:
-                            if loc_key in page_headers:
-                                page_headers[loc_key].append(page_idx)
-                            else:
-                                page_headers[loc_key] = [page_idx]
-                        else:
-                            if loc_key in page_footers:
-                                page_footers[loc_key].append(page_idx)
-                            else:
-                                page_footers[loc_key] = [page_idx]
-
-                    p_styles.append(
-                        (
-                            box_style,
-                            line_style,
-                            word_line_styles,
-                            loc_key,
-                            is_page_header,
-                            is_page_footer,
-                            changed,
-                        ),
-                    )
-                    if len(p.text) > 0:
-                        word_count = len(p.text.split())
-                        vl_word_counts.append(word_count)
-                        if line_style not in self.line_style_word_stats:
-                            self.line_style_word_stats[line_style] = []
-                        self.line_style_word_stats[line_style].append(word_count)
-
-                    if prev_line_style == line_style:
-                        same_top = prev_box_style[0] == box_style[0]
-                        if not same_top:
-                            space = round(box_style[0] - prev_box_style[0], 1)
-                            if space > 0:
-                                if line_style not in self.line_style_space_stats:
-                                    self.line_style_space_stats[line_style] = []
-                                self.line_style_space_stats[line_style].append(space)
-                                # Add to page_line_stats.
-                                if line_style not in page_line_stats:
-                                    page_line_stats[line_style] = {
-                                        "lines": 0,
-                                        "space_counts": {},
-                                    }
-                                page_line_stats[line_style]["lines"] += 1
-                                if (
-                                    space
-                                    not in page_line_stats[line_style]["space_counts"]
-                                ):
-                                    page_line_stats[line_style]["space_counts"][
-                                        space
-                                    ] = 0
-                                page_line_stats[line_style]["space_counts"][space] += 1
-                        else:
-                            word_space = round(box_style[1] - prev_box_style[2], 1)
-                            if word_space > 0:
-                                if line_style not in self.line_style_word_space_stats:
-                                    self.line_style_word_space_stats[line_style] = []
-                                self.line_style_word_space_stats[line_style].append(
-                                    word_space
-                                )
-
-                    prev_box_style = box_style
-                    prev_line_style = line_style
-                    prev_p_tag = p
-                    changed = False  # Reset the change here. Change is meant for only the first p_tag
-            page_p_styles.append(p_styles)
-            # Calculate the page stats.
-            # Max number of lines and most frequent space gaps between lines etc
-            max_lines = 0
-            most_freq_spaces = {}
-            for line_style in page_line_stats:
-                max_lines = max(max_lines, page_line_stats[line_style]["lines"])
-                max_count = 0
-                ls_most_freq_space = -1
-                for space, space_count in page_line_stats[line_style][
-                    "space_counts"
-                ].items():
-                    if space_count > max_count:
-                        max_count = space_count
-                        ls_most_freq_space = space
-                most_freq_spaces[ls_most_freq_space] = (
-                    most_freq_spaces.get(ls_most_freq_space, 0) + max_count
-                )
-            most_freq_space = 0
-            if most_freq_spaces:
-                most_freq_space = max(
-                    most_freq_spaces.items(), key=operator.itemgetter(1)
-                )[0]
-            page_stats = {"lines": max_lines, "most_frequent_space": most_freq_space}
+        for parsed_page in self.parse_pages(pages):
+            self.page_svg_tags.append(parsed_page.svg_tags)
+            # merged in page order, the keys are added in the order they occur
+            for loc_key, page_ids in parsed_page.page_headers.items():
+                page_headers.setdefault(loc_key, []).extend(page_ids)
+            for loc_key, page_ids in parsed_page.page_footers.items():
+                page_footers.setdefault(loc_key, []).extend(page_ids)
+            for text_only, count in parsed_page.last_line_counts.items():
+                last_line_counts[text_only] = last_line_counts.get(text_only, 0) + count
+            page_p_styles.append(parsed_page.p_styles)
+            style_ids = []
+            for line_style in parsed_page.line_styles:
+                if line_style not in self.line_style_ids:
+                    self.line_style_ids[line_style] = len(self.line_style_by_id)
+                    self.line_style_by_id.append(line_style)
+                style_ids.append(self.line_style_ids[line_style])
+            parsed_page.line_table.map_style_ids(style_ids)
+            self.page_line_tables.append(parsed_page.line_table)
             self.page_styles.append(
-                (page_style_kv, page_width, page_height, page_stats)
+                (
+                    parsed_page.page_style_kv,
+                    parsed_page.page_width,
+                    parsed_page.page_height,
+                    parsed_page.page_stats,
+                )
             )
+            self.page_lines.append(parsed_page.page_lines)
+        self.num_pages = len(self.page_lines)
         if PERFORMANCE_DEBUG:
             new_wall_time = default_timer()
             print(
                 f"Checkpoint 1 Finished. Wall time: {((new_wall_time - self.wall_time) * 1000):.2f}ms"
             )
             self.wall_time = new_wall_time
+        self.compute_line_style_stats()
         for line_style in self.line_style_space_stats:
             spaces = self.line_style_space_stats[line_style]
             space_counts = {}
@@ -356,9 +576,9 @@ class Doc:
                     max_count = space_count
                     most_frequent_space = space
             self.line_style_space_stats[line_style] = {
-                "avg": np.mean(spaces) / line_style[2],
-                "median": np.median(spaces) / line_style[2],
-                "std": np.std(spaces),
+                "avg": float(np.mean(spaces) / line_style[2]),
+                "median": float(np.median(spaces) / line_style[2]),
+                "std": float(np.std(spaces)),
                 "count": len(spaces),
                 "most_frequent_space": most_frequent_space,
                 "space_counts": space_counts,
@@ -367,33 +587,40 @@ class Doc:
             line_style_vl_word_spaces = self.line_style_word_space_stats[line_style]
 
             self.line_style_word_space_stats[line_style] = {
-                "avg": np.mean(line_style_vl_word_spaces),
-                "median": np.median(line_style_vl_word_spaces),
+                "avg": float(np.mean(line_style_vl_word_spaces)),
+                "median": float(np.median(line_style_vl_word_spaces)),
                 "count": len(line_style_vl_word_spaces),
-                "std": np.std(line_style_vl_word_spaces),
+                "std": float(np.std(line_style_vl_word_spaces)),
             }
         for line_style in self.line_style_word_stats:
             line_style_vl_word_counts = self.line_style_word_stats[line_style]
             # print(line_style_vl_word_counts)
-            line_style_vl_word_stats_median = np.median(line_style_vl_word_counts)
+            # plain python numbers, so the stats need no conversion when serialized
+            line_style_vl_word_stats_median = float(
+                np.median(line_style_vl_word_counts)
+            )
             self.line_style_word_stats[line_style] = {
-                "avg": np.mean(line_style_vl_word_counts),
+                "avg": float(np.mean(line_style_vl_word_counts)),
                 "median": line_style_vl_word_stats_median,
-                "std": np.std(line_style_vl_word_counts),
+                "std": float(np.std(line_style_vl_word_counts)),
                 "is_justified": line_style_vl_word_stats_median < 2,
-                "count": np.sum(line_style_vl_word_counts),
+                "count": np.sum(line_style_vl_word_counts).item(),
             }
+        vl_word_counts = np.concatenate(
+            [table.text_lines()["word_count"] for table in self.page_line_tables]
+            or [np.empty(0, dtype=np.int64)]
+        ).tolist()
         self.visual_line_word_stats = {
-            "avg": np.mean(vl_word_counts),
-            "median": np.median(vl_word_counts),
-            "std": np.std(vl_word_counts),
-            "count": np.sum(vl_word_counts),
+            "avg": float(np.mean(vl_word_counts)),
+            "median": float(np.median(vl_word_counts)),
+            "std": float(np.std(vl_word_counts)),
+            "count": np.sum(vl_word_counts).item(),
         }
 
         self.is_justified = self.visual_line_word_stats["avg"] < 1.1
-        page_headers = Doc.find_true_header_footers(page_headers, len(pages))
+        page_headers = Doc.find_true_header_footers(page_headers, self.num_pages)
         page_footers = Doc.find_true_header_footers(
-            page_footers, len(pages), is_footer=True
+            page_footers, self.num_pages, is_footer=True
         )
         if PERFORMANCE_DEBUG:
             new_wall_time = default_timer()
@@ -401,11 +628,9 @@ class Doc:
                 f"Checkpoint 2 Finished. Wall time: {((new_wall_time - self.wall_time) * 1000):.2f}ms"
             )
             self.wall_time = new_wall_time
-        for page_idx, page in enumerate(pages):
+        for page_idx, all_p in enumerate(self.page_lines):
             if not page_p_styles or not page_p_styles[page_idx]:
                 continue
-            # figure out page
-            all_p = page.find_all("p")
             if PROGRESS_DEBUG:
                 print(
                     "processing page: ", page_idx, " Number of p_tags.... ", len(all_p)
@@ -423,7 +648,7 @@ class Doc:
                 p_text = p.text
                 for word, replacement in line_parser.unicode_list_types.items():
                     p_text = p_text.replace(word, replacement)
-                lp_line = line_parser.Line(p_text)
+                lp_line = self.line_cache.get_line(p_text)
                 (
                     box_style,
                     line_style,
@@ -512,7 +737,7 @@ class Doc:
                     "text": p_text,
                     "page_idx": page_idx,
                     "lp_line": lp_line,
-                    "line_parser": lp_line.to_json(),
+                    "line_parser": self.line_cache.get_line_json(p_text),
                     "should_ignore": should_ignore,
                     "changed": changed,
                     "ptag_idx": line_idx,
@@ -534,15 +759,16 @@ class Doc:
                 line_info["class"] = class_name
                 page_visual_lines.append(line_info)
                 line_idx = line_idx + 1
-            (
-                page_blocks,
-                group_buf,
-                block_idx,
-                group_is_list,
-                vl_from_prev_page_discarded,
-            ) = self.visual_lines_to_blocks(
-                page_visual_lines, group_buf, block_idx, group_is_list
-            )
+            with stage_timer.stage("visual_lines_to_blocks"):
+                (
+                    page_blocks,
+                    group_buf,
+                    block_idx,
+                    group_is_list,
+                    vl_from_prev_page_discarded,
+                ) = self.visual_lines_to_blocks(
+                    page_visual_lines, group_buf, block_idx, group_is_list
+                )
             # a page has ended
             order_offset = 0
             if has_lines_from_previous_page:
@@ -554,8 +780,11 @@ class Doc:
                     and page_blocks[0]["page_idx"] == page_blocks[1]["page_idx"]
                 ):
                     order_offset = 2
-            oo_fixer = order_fixer.OrderFixer(self, page_blocks, offset=order_offset)
-            page_blocks, is_reordered = oo_fixer.reorder()
+            with stage_timer.stage("order_fixer"):
+                oo_fixer = order_fixer.OrderFixer(
+                    self, page_blocks, offset=order_offset
+                )
+                page_blocks, is_reordered = oo_fixer.reorder()
             for i in range(2):
                 if len(page_blocks) > 0 and Doc.has_page_number(
                     page_blocks[-1]["block_text"], last_line_counts
@@ -615,6 +844,7 @@ class Doc:
                 group_is_list,
                 group_is_table_row,
                 group_text,
+                self.line_cache,
             )
             if block_type == "para" and group_buf[0]["text"].lower().startswith(
                 "section"
@@ -658,8 +888,9 @@ class Doc:
                 block["box_style"] = Doc.calc_block_span(block)
                 blocks.append(block)
                 page_blocks.append(block)
-            oo_fixer = order_fixer.OrderFixer(self, page_blocks, offset=0)
-            page_blocks, is_reordered = oo_fixer.reorder()
+            with stage_timer.stage("order_fixer"):
+                oo_fixer = order_fixer.OrderFixer(self, page_blocks, offset=0)
+                page_blocks, is_reordered = oo_fixer.reorder()
             blocks_by_page.append(page_blocks)
 
         if PERFORMANCE_DEBUG:
@@ -671,7 +902,8 @@ class Doc:
         self.blocks = blocks
         self.blocks_by_page = blocks_by_page
         self.save_file_stats()
-        self.organize_and_indent_blocks()
+        with stage_timer.stage("organize_and_indent_blocks"):
+            self.organize_and_indent_blocks()
         if PERFORMANCE_DEBUG:
             new_wall_time = default_timer()
             print(
@@ -679,13 +911,42 @@ class Doc:
             )
             self.wall_time = new_wall_time
         self.label_table_of_content()
-        if self.render_format == "json":
-            self.json_dict = block_renderer.BlockRenderer(self).render_json()
-        elif self.render_format == "html":
-            self.html_str = block_renderer.BlockRenderer(self).render_html()
-        else:
-            self.json_dict = block_renderer.BlockRenderer(self).render_json()
-            self.html_str = block_renderer.BlockRenderer(self).render_html()
+
+    @property
+    def json_dict(self):
+        return self.render_json()
+
+    @property
+    def html_str(self):
+        return self.render_html()
+
+    def render_json(self):
+        """
+        Renders the blocks as json the first time it is called
+        :return: Json of the blocks, None for the html render format
+        """
+        if self._json_dict is None and self.render_format != "html":
+            with stage_timer.stage("render_json"):
+                self._json_dict = block_renderer.BlockRenderer(self).render_json()
+        return self._json_dict
+
+    def render_html(self):
+        """
+        Renders the blocks as html the first time it is called
+        :return: Html of the blocks, empty for the json render format
+        """
+        if self._html_str is None and self.render_format != "json":
+            with stage_timer.stage("render_html"):
+                self._html_str = block_renderer.BlockRenderer(self).render_html()
+        return self._html_str or ""
+
+    def render(self):
+        """
+        Renders the formats of the render format that are not rendered yet, before
+        the blocks are changed
+        """
+        self.render_json()
+        self.render_html()
 
     def visual_lines_to_blocks(
         self, visual_lines, group_buf=[], block_idx=0, group_is_list=False
@@ -711,9 +972,11 @@ class Doc:
             line_info = visual_lines[line_idx]
             should_ignore = "should_ignore" in line_info and line_info["should_ignore"]
             if "lp_line" not in line_info:
-                lp_line = line_parser.Line(line_info["text"])
+                lp_line = self.line_cache.get_line(line_info["text"])
                 line_info["lp_line"] = lp_line
-                line_info["line_parser"] = lp_line.to_json()
+                line_info["line_parser"] = self.line_cache.get_line_json(
+                    line_info["text"]
+                )
 
             # is_multi_class_line = len(word_class) > 1
             (
@@ -789,7 +1052,9 @@ class Doc:
                         )
                         if table_parser.TABLE_DEBUG:
                             print("removing fake table row: ", group_text)
-                        block_type, _ = get_block_type(False, False, group_text)
+                        block_type, _ = get_block_type(
+                            False, False, group_text, self.line_cache
+                        )
                         group_is_table_row = False
                         group_is_fake_row = True
                         line_idx = line_idx + 1
@@ -837,6 +1102,7 @@ class Doc:
                         group_is_list,
                         group_is_table_row,
                         group_text,
+                        self.line_cache,
                     )
                 if block_type == "header":
                     cell_count = self.count_possible_cells(group_buf)
@@ -972,7 +1238,9 @@ class Doc:
                             ) or start_a_new_para():
                                 # 1.2 multiplier is just a magic number.
                                 # Divide them to multiple blocks.
-                                block_type, _ = get_block_type(False, False, buf_text)
+                                block_type, _ = get_block_type(
+                                    False, False, buf_text, self.line_cache
+                                )
                                 block_types.append(block_type)
                                 buf_texts.append(buf_text)
                                 result_list.append([vl])
@@ -1004,7 +1272,9 @@ class Doc:
                                 result_list, buf_texts, block_types
                             )
                         )
-                    block_type, _ = get_block_type(False, False, buf_text)
+                    block_type, _ = get_block_type(
+                        False, False, buf_text, self.line_cache
+                    )
                     buf_texts.append(buf_text)
                     block_types.append(block_type)
                     final_group_bufs = result_list
@@ -1131,7 +1401,9 @@ class Doc:
                     and page_blocks[-1]["box_style"][0] > line_info["box_style"][0]
                 ):
                     # Create a block anyways here
-                    block_type, _ = get_block_type(False, False, line_info["text"])
+                    block_type, _ = get_block_type(
+                        False, False, line_info["text"], self.line_cache
+                    )
                     block = {
                         "block_idx": block_idx,
                         "page_idx": group_page_idx,
@@ -2010,7 +2282,7 @@ class Doc:
                                 + vl["text"]
                             )
                         if buf_text:
-                            lp_json = line_parser.Line(buf_text).to_json()
+                            lp_json = self.line_cache.get_line_json(buf_text)
                             if (
                                 lp_json["numbered_line"]
                                 and not prev_line_ends_with_line_delim
@@ -2319,14 +2591,14 @@ class Doc:
                         break
         header_block_line_styles.extend(new_header_line_styles)
 
-        avg_font_size = np.mean(font_sizes)
+        avg_font_size = float(np.mean(font_sizes))
         mode_font_size = (
             max(set(all_font_sizes), key=all_font_sizes.count)
             if len(all_font_sizes) > 0
             else 0
         )
-        median_font_size = np.median(font_sizes)
-        font_size_sd = np.std(font_sizes)
+        median_font_size = float(np.median(font_sizes))
+        font_size_sd = float(np.std(font_sizes))
         self.header_styles = []
         self.normal_styles = []
         self.footnote_styles = []
@@ -2396,7 +2668,7 @@ class Doc:
             "word_classes": word_classes[0:split_point],
             "space": line_info["space"],
             "page_idx": line_info["page_idx"],
-            "line_parser": line_parser.Line(header_text).to_json(),
+            "line_parser": self.line_cache.get_line_json(header_text),
         }
         normal_line_info = {
             "box_style": line_info["box_style"],
@@ -2406,34 +2678,60 @@ class Doc:
             "space": line_info["space"],
             "text": normal_text,
             "page_idx": line_info["page_idx"],
-            "line_parser": line_parser.Line(normal_text).to_json(),
+            "line_parser": self.line_cache.get_line_json(normal_text),
         }
         return header_line_info, normal_line_info
 
-    def get_class(self, line_style):
+    @staticmethod
+    def is_matchable_style(line_style):
+        # NaN sizes never compare equal, so such styles match nothing, not even themselves
+        return line_style[2] == line_style[2] and math.isfinite(line_style[5])
 
-        def cmp_with_keys():
-            for key in self.line_style_classes:
-                if (
-                    line_style[0] == key[0]
-                    and line_style[1] == key[1]
-                    and line_style[2] == key[2]
-                    and line_style[3] == key[3]
-                    and line_style[4] == key[4]
-                    and abs(line_style[5] - key[5]) < 1.0
-                    and line_style[6] == key[6]
-                ):
-                    return True, key
-            return False, None
+    def find_matching_style(self, line_style):
+        """
+        :return: The first style in line_style_classes with the same fields as
+        line_style, except for a font_space_width less than 1.0 apart, or None
+        """
+        if not Doc.is_matchable_style(line_style):
+            return None
+        style_key = line_style[:5] + line_style[6:]
+        space_width = line_style[5]
+        space_bucket = math.floor(space_width)
+        match = None
+        # widths less than 1.0 apart are at most one bucket apart
+        for bucket in (space_bucket - 1, space_bucket, space_bucket + 1):
+            for position, key in self.line_style_index.get((style_key, bucket), ()):
+                if abs(space_width - key[5]) < 1.0:
+                    if match is None or position < match[0]:
+                        match = (position, key)
+                    break
+        return match[1] if match else None
 
-        style_present, match_line_style = cmp_with_keys()
-        if style_present:
+    def get_class(self, line_style):
+        """
+        Assigns line_style the class of the first known style that matches it (see
+        find_matching_style) or a new class. Every style is remembered in
+        line_style_classes, including the ones that got the class of another style.
+        """
+        if Doc.is_matchable_style(line_style):
+            # a known style matches itself or an earlier style with the same class
+            class_name = self.line_style_classes.get(line_style)
+            if class_name is not None:
+                return class_name
+        match_line_style = self.find_matching_style(line_style)
+        if match_line_style is not None:
             class_name = self.line_style_classes[match_line_style]
-            self.line_style_classes[line_style] = class_name
         else:
             class_name = f"cls_{len(self.line_style_classes.keys())}"
-            self.line_style_classes[line_style] = class_name
             self.class_line_styles[class_name] = line_style
+        if line_style not in self.line_style_classes and Doc.is_matchable_style(
+            line_style
+        ):
+            index_key = (line_style[:5] + line_style[6:], math.floor(line_style[5]))
+            self.line_style_index.setdefault(index_key, []).append(
+                (len(self.line_style_classes), line_style)
+            )
+        self.line_style_classes[line_style] = class_name
         return class_name
 
     def make_header_class(self, line_style):
@@ -2648,7 +2946,9 @@ class Doc:
                     should_merge = True
             if should_merge:
                 # print("merging: ", prev_vl["text"][0:80], "->", vl["text"][0:80], gap, normal_gap, is_justified, avg_merge_gap)
-                prev_vl = Doc.merge_line_info(prev_vl, vl, remove_space=True)
+                prev_vl = Doc.merge_line_info(
+                    prev_vl, vl, remove_space=True, line_cache=self.line_cache
+                )
                 prev_vl_merged = True
             else:
                 good_vl.append(prev_vl)
@@ -2699,8 +2999,10 @@ class Doc:
                     prev_vl = vl
                 block["block_text"] = block_text
                 if block["block_type"] == "list_item":
-                    block["list_type"] = Doc.get_list_item_subtype(block)
-                block["block_sents"] = sent_tokenize(block["block_text"])
+                    block["list_type"] = Doc.get_list_item_subtype(
+                        block, self.line_cache
+                    )
+                block["block_sents"] = cached_sent_tokenize(block["block_text"])
 
     def label_table_of_content(self):
         collected_row = []
@@ -2764,6 +3066,9 @@ class Doc:
         table_row_with_max_cols = None
         svg_page_tags = None
         included_prev_2_prev_blk = False
+        # tokenize the block texts in one batch, the blocks that are not merged
+        # below find their sentences in the cache
+        batch_sent_tokenize(block["block_text"] for block in self.blocks)
 
         while idx < len(self.blocks):
             block = self.blocks[idx]
@@ -2903,7 +3208,7 @@ class Doc:
                             len(new_block["visual_lines"]),
                         )
 
-            block_sents = sent_tokenize(block["block_text"])
+            block_sents = cached_sent_tokenize(block["block_text"])
             class_name = block["block_class"]
 
             line_style = block["visual_lines"][-1][
@@ -3129,7 +3434,7 @@ class Doc:
                     )
                     space_bw_trow_list.append(temp_diff_in_space)
                     temp_trow_block = tblock
-                space_bw_table_rows = np.mean(space_bw_trow_list)
+                space_bw_table_rows = float(np.mean(space_bw_trow_list))
 
             check_again = True
             no_more_non_table_rows = (
@@ -3330,7 +3635,7 @@ class Doc:
                         median_gap_bw_rows = 0.5
                         max_gap_bw_rows = 0.5
                         if len(gap_bw_rows) > 0:
-                            median_gap_bw_rows = np.median(gap_bw_rows)
+                            median_gap_bw_rows = float(np.median(gap_bw_rows))
                             max_gap_bw_rows = max(gap_bw_rows)
                         # print(block['box_style'][0], prev_blk_bottom, gap_bw_rows, median_gap_bw_rows)
                         space_bw_curr_and_prev = abs(
@@ -3394,7 +3699,7 @@ class Doc:
                     # then reset the non_table_row_count
                     prev_block_style = organized_blocks[-1]["box_style"]
                     prev_blk_bottom = prev_block_style[0] + prev_block_style[4]
-                    median_gap_bw_rows = np.median(gap_bw_rows)
+                    median_gap_bw_rows = float(np.median(gap_bw_rows))
                     space_bw_curr_and_prev = abs(
                         block["box_style"][0] - prev_blk_bottom
                     )
@@ -3876,7 +4181,7 @@ class Doc:
                 prev_table_row = block
             prev_too_much_space = too_much_space
             if block["block_type"] == "list_item":
-                block["list_type"] = Doc.get_list_item_subtype(block)
+                block["list_type"] = Doc.get_list_item_subtype(block, self.line_cache)
             if (
                 self.detect_block_center_aligned(block, enable_width_check=False)
                 and parenthesized_hdr_pattern.search(block["block_text"]) is not None
@@ -3936,7 +4241,9 @@ class Doc:
                     new_block["block_type"],
                 )
             if new_block["block_type"] == "list_item":
-                new_block["list_type"] = Doc.get_list_item_subtype(new_block)
+                new_block["list_type"] = Doc.get_list_item_subtype(
+                    new_block, self.line_cache
+                )
             organized_blocks.pop()  # replace previous single block with combo
             organized_blocks.append(new_block)
 
@@ -3950,11 +4257,13 @@ class Doc:
         para_to_header_blocks_font_decider = []
         while i < len(organized_blocks):
             a_block = organized_blocks[i]
-            line_props = line_parser.Line(a_block["block_text"])
+            line_props = self.line_cache.get_line(a_block["block_text"])
             if a_block["block_type"] == "header" and line_props.numbered_line:
                 first_sent = line_props.line_without_number.split(".")[0]
-                if line_parser.Line(first_sent).is_header:
-                    a_block["list_type"] = Doc.get_list_item_subtype(a_block)
+                if self.line_cache.get_line(first_sent).is_header:
+                    a_block["list_type"] = Doc.get_list_item_subtype(
+                        a_block, self.line_cache
+                    )
             if a_block["block_type"] in [
                 "para",
                 "list_item",
@@ -4053,7 +4362,7 @@ class Doc:
                     first_sent = line_w_o_num.split(".")[0].strip()
                     first_sent = first_sent.replace("__dot__", ".")
 
-                    lp_first_sent = line_parser.Line(first_sent)
+                    lp_first_sent = self.line_cache.get_line(first_sent)
                     different_fonts = False
                     if (
                         lp_first_sent.is_header
@@ -4091,7 +4400,9 @@ class Doc:
                         not lp_first_sent.is_reference_author_name or different_fonts
                     ):
                         a_block["block_type"] = "header"
-                        a_block["list_type"] = Doc.get_list_item_subtype(a_block)
+                        a_block["list_type"] = Doc.get_list_item_subtype(
+                            a_block, self.line_cache
+                        )
                         para_sentence = line_props.line_without_number[
                             len(first_sent) + 1 :
                         ].strip()
@@ -4117,7 +4428,9 @@ class Doc:
                                 break
                         if consider_as_header:
                             a_block["block_type"] = "header"
-                            a_block["list_type"] = Doc.get_list_item_subtype(a_block)
+                            a_block["list_type"] = Doc.get_list_item_subtype(
+                                a_block, self.line_cache
+                            )
                             para_sentence = line_props.line_without_number[
                                 len(first_sent) + 1 :
                             ].strip()
@@ -4148,10 +4461,12 @@ class Doc:
                         para_sentence = start_punct_pattern.sub(
                             "", para_sentence
                         ).strip()
-                        lp_first_sent = line_parser.Line(first_sent)
+                        lp_first_sent = self.line_cache.get_line(first_sent)
 
                         a_block["block_type"] = "list_item"
-                        a_block["list_type"] = Doc.get_list_item_subtype(a_block)
+                        a_block["list_type"] = Doc.get_list_item_subtype(
+                            a_block, self.line_cache
+                        )
                         if (
                             lp_first_sent.is_header
                             and len(a_block["visual_lines"]) > 1
@@ -4302,7 +4617,7 @@ class Doc:
                     )
                     para_block["block_text"] = para_sentence
                     if not para_block["block_sents"]:
-                        para_block["block_sents"] = sent_tokenize(para_sentence)
+                        para_block["block_sents"] = cached_sent_tokenize(para_sentence)
                     para_block.pop("list_type", None)
                     j = idx + 1
                     while j < len(organized_blocks):
@@ -4319,11 +4634,11 @@ class Doc:
                         print(f"Error at line 4317: {e}")
                         organized_blocks[len(organized_blocks) - 1] = header_block
                     if len(para_block["visual_lines"]):
-                        para_props = line_parser.Line(para_block["block_text"])
+                        para_props = self.line_cache.get_line(para_block["block_text"])
                         if para_props.numbered_line:
                             para_block["block_type"] = "list_item"
                             para_block["list_type"] = Doc.get_list_item_subtype(
-                                para_block
+                                para_block, self.line_cache
                             )
                         organized_blocks.insert(idx + 1, para_block)
                     i += 1
@@ -4372,7 +4687,7 @@ class Doc:
             # one row table
             tr_block = organized_blocks[table_start_idx]
             tr_block["block_type"] = get_block_type(
-                False, False, tr_block["block_text"]
+                False, False, tr_block["block_text"], self.line_cache
             )[0]
             # for parsing special lists
             tr_block["one_row_table"] = True
@@ -4385,7 +4700,7 @@ class Doc:
             for line_idx, line in enumerate(block["visual_lines"]):
                 # print(line["text"])
                 if not "line_parser" in line or not line["line_parser"]["noun_chunks"]:
-                    line["line_parser"] = line_parser.Line(line["text"]).to_json()
+                    line["line_parser"] = self.line_cache.get_line_json(line["text"])
                 if not line["line_parser"]["noun_chunks"]:
                     return False
                 noun_chunk = non_alphanumeric_pattern.sub(
@@ -4451,7 +4766,7 @@ class Doc:
         while i < len(blocks):
             block = blocks[i]
             if block["block_type"] == "list_item" and not block.get("list_type", None):
-                block["list_type"] = Doc.get_list_item_subtype(block)
+                block["list_type"] = Doc.get_list_item_subtype(block, self.line_cache)
             if (
                 block["block_type"] == "table_row" or "one_row_table" in block
             ) and not is_table:
@@ -4604,8 +4919,9 @@ class Doc:
         # reset bounds using newly added block
         # (left, top, w, h) = self.calculate_block_bounds(possible_table_blocks)
 
-        tp = table_parser.TableParser(self, possible_table_blocks)
-        real_blocks = tp.parse_table()
+        with stage_timer.stage("table_parsing"):
+            tp = table_parser.TableParser(self, possible_table_blocks)
+            real_blocks = tp.parse_table()
         diff = len(possible_table_blocks) - len(real_blocks)
         if diff > 0:
             if table_parser.TABLE_DEBUG:
@@ -4719,8 +5035,8 @@ class Doc:
                         del child_block["visual_lines"]
 
     @staticmethod
-    def get_list_item_subtype(block):
-        lp = line_parser.Line(block["block_text"])
+    def get_list_item_subtype(block, line_cache=None):
+        lp = line_parser.get_line(block["block_text"], line_cache)
         item_subtype = "bullet"
         if lp.roman_numbered_line:
             item_subtype = "roman"
@@ -4735,7 +5051,7 @@ class Doc:
         return item_subtype
 
     @staticmethod
-    def merge_line_info(first, second, remove_space=False):
+    def merge_line_info(first, second, remove_space=False, line_cache=None):
         height = max(first["box_style"][4], second["box_style"][4])
         if first["box_style"][0] != second["box_style"][0]:
             if first["box_style"][0] < second["box_style"][0]:
@@ -4759,7 +5075,7 @@ class Doc:
             + Doc.check_add_space_btw_texts(first["text"], second["text"])
             + second["text"]
         )
-        lp_line = line_parser.Line(combined_text)
+        lp_line = line_parser.get_line(combined_text, line_cache)
         combined_block = {
             "box_style": box_style,
             # Below one needs to be majority. (len words)
@@ -4792,29 +5108,45 @@ class Doc:
         num_pages,
         is_footer=False,
     ):
-
-        def get_hf_keys_with_same_text(
-            hf: dict, hf_key: namedtuple, check_page_pattern, page_pat_val
-        ):
-            m_keys = []
-            m_pages = []
-            for key in hf.keys():
-                if not check_page_pattern:
-                    if page_num_pattern.search(key[2]) is not None:
-                        page_pat_val.append(key[2])
-                if (
-                    abs(key[0] - hf_key[0]) < 20
-                    and abs(key[1] - hf_key[1]) < 20
-                    and (key[2] == hf_key[2] or key[2] in page_pat_val)
-                ):
-                    m_keys.append(key)
-                    m_pages.append(hf[key])
-            m_pages = [item for sublist in m_pages for item in sublist]
+        hf_distance = 20
+        # keys are looked up in a grid of hf_distance sized cells, by their text or,
+        # as page numbers differ from page to page, by the page number pattern
+        page_num_texts = {
+            text
+            for text in {key[2] for key in hf}
+            if page_num_pattern.search(text) is not None
+        }
+        text_grid = {}
+        page_num_grid = {}
+        for position, key in enumerate(hf):
+            cell = (key[0] // hf_distance, key[1] // hf_distance)
+            text_grid.setdefault((key[2],) + cell, []).append((position, key))
+            if key[2] in page_num_texts:
+                page_num_grid.setdefault(cell, []).append((position, key))
+
+        def get_hf_keys_with_same_text(hf: dict, hf_key: namedtuple):
+            """
+            :return: Keys less than hf_distance away from hf_key with the same text or
+            a page number, in the order of hf, and the sorted pages they are on
+            """
+            near_keys = {}
+            top_cell = hf_key[0] // hf_distance
+            left_cell = hf_key[1] // hf_distance
+            for top in (top_cell - 1, top_cell, top_cell + 1):
+                for left in (left_cell - 1, left_cell, left_cell + 1):
+                    for position, key in text_grid.get(
+                        (hf_key[2], top, left), []
+                    ) + page_num_grid.get((top, left), []):
+                        if (
+                            abs(key[0] - hf_key[0]) < hf_distance
+                            and abs(key[1] - hf_key[1]) < hf_distance
+                        ):
+                            near_keys[position] = key
+            m_keys = [near_keys[position] for position in sorted(near_keys)]
+            m_pages = [page for key in m_keys for page in hf[key]]
             return (
                 m_keys,
                 sorted(list(dict.fromkeys(m_pages))) if len(m_pages) > 1 else m_pages,
-                True,
-                page_pat_val,
             )
 
         def is_footer_key_below_page_num_footer(f_key, refined_footers, footers):
@@ -4833,24 +5165,15 @@ class Doc:
             return False
 
         result = {}
-        page_pattern_list = []
-        check_page_pattern = False
+        # first key added to result for every text
+        result_keys_by_text = {}
         for hf_key in hf.keys():
             if hf_key in result:
                 continue
-            key_with_text_added = False
-            m_key = None
-            for already_added_key in result.keys():
-                if already_added_key.text == hf_key.text:
-                    key_with_text_added = True
-                    m_key = already_added_key
-                    break
+            m_key = result_keys_by_text.get(hf_key.text)
+            key_with_text_added = m_key is not None
             if not key_with_text_added:
-                matched_keys, list_of_pages, check_page_pattern, page_pattern_list = (
-                    get_hf_keys_with_same_text(
-                        hf, hf_key, check_page_pattern, page_pattern_list
-                    )
-                )
+                matched_keys, list_of_pages = get_hf_keys_with_same_text(hf, hf_key)
             else:
                 matched_keys = [hf_key]
                 list_of_pages = result[m_key]
@@ -4883,6 +5206,7 @@ class Doc:
                     if HF_DEBUG:
                         print("will skip header/footer: ", matched_keys, list_of_pages)
                     for key in matched_keys:
+                        result_keys_by_text.setdefault(key.text, key)
                         if hf_key.text != "" or is_footer:
                             result[key] = list_of_pages
                         else:
@@ -4970,7 +5294,7 @@ class Doc:
         return do_overlap
 
     @staticmethod
-    def merge_vls(vl_merge_buf):
+    def merge_vls(vl_merge_buf, line_cache=None):
         word_classes = []
         vl_top = sys.maxsize
         vl_height = 0
@@ -4992,7 +5316,7 @@ class Doc:
         vl_text = " ".join(vl_texts)
         if MERGE_DEBUG:
             print(f"\tmerged {len(vl_merge_buf)} vls into: ", vl_text)
-        lp_line = line_parser.Line(vl_text)
+        lp_line = line_parser.get_line(vl_text, line_cache)
         merged_vl = {
             "text": vl_text,
             "line_style": vl_merge_buf[0]["line_style"],
@@ -5021,7 +5345,7 @@ class Doc:
             "block_class": vls[0]["word_classes"][0],
         }
         block["box_style"] = self.calc_block_span(block)
-        block_sents = sent_tokenize(block["block_text"])
+        block_sents = cached_sent_tokenize(block["block_text"])
         block["block_sents"] = block_sents
         return block
 
@@ -5081,7 +5405,7 @@ class Doc:
                     if MERGE_DEBUG:
                         print("\tadding to buffer: ", vl["text"])
                 elif len(vl_merge_buf) > 0:
-                    merged_vl = self.merge_vls(vl_merge_buf)
+                    merged_vl = self.merge_vls(vl_merge_buf, self.line_cache)
                     vls.append(merged_vl)
                     vl_merge_buf = [vl]
                 else:
@@ -5090,7 +5414,7 @@ class Doc:
                     vls.append(vl)
                 prev_vl = vl
             if len(vl_merge_buf) > 0:
-                merged_vl = self.merge_vls(vl_merge_buf)
+                merged_vl = self.merge_vls(vl_merge_buf, self.line_cache)
                 vls.append(merged_vl)
 
             block_box = block["box_style"]
@@ -5107,7 +5431,7 @@ class Doc:
 
         box_style = BoxStyle(min_top, left, left + width, width, max_height)
 
-        lp_line = line_parser.Line(blocks[0]["block_text"])
+        lp_line = self.line_cache.get_line(blocks[0]["block_text"])
         block_type = (
             "list_item"
             if (lp_line.is_list_item or lp_line.numbered_line)
@@ -5145,7 +5469,7 @@ class Doc:
             # 'line_props': line_props,
             "visual_lines": vls,
             "block_class": (blocks[1] if len(blocks) > 1 else blocks[0])["block_class"],
-            "block_sents": sent_tokenize(merged_text),
+            "block_sents": cached_sent_tokenize(merged_text),
         }
         if lp_line.is_list_item:
             merged_block["list_type"] = lp_line.list_type
@@ -5181,7 +5505,9 @@ class Doc:
         if not block_is_list:
             block_is_list = self.is_list_item(vls[0])
 
-        block_type = get_block_type(block_is_list, block_is_table_row, block_text)[0]
+        block_type = get_block_type(
+            block_is_list, block_is_table_row, block_text, self.line_cache
+        )[0]
         return block_type
 
     def get_gaps_from_vls(self, curr_vl, prev_vl):
@@ -5240,8 +5566,14 @@ class Doc:
         :param block: block whose bounds need to be decided
         :return: True if block falls within the bounds else False
         """
-        for table_bbox in self.audited_table_bbox.get(block["page_idx"], []):
-            if self.check_block_within_bound(block["box_style"], table_bbox.bbox):
+        table_bbox_index = self.audited_table_bbox_index.get(block["page_idx"])
+        if not table_bbox_index:
+            return False
+        box_style = block["box_style"]
+        for table_bbox in table_bbox_index.overlapping(
+            box_style[0] - box_style[4], box_style[0] + box_style[4]
+        ):
+            if self.check_block_within_bound(box_style, table_bbox.bbox):
                 return True
         return False
 
@@ -5254,12 +5586,11 @@ class Doc:
         :param kwargs: Key-value pairs to filter
         :return: Generator object with List of dictionaries matching the query params
         """
-        list_of_bbox, kwargs = list(list_of_bbox), dict(kwargs)
+        query = list(kwargs.items())
         # Each data item is checked against ALL kwargs before matching in the filter
-        matches = filter(
-            lambda bbox: all([bbox[k] == v for k, v in kwargs.items()]), list_of_bbox
-        )
-        yield from list(matches)
+        for bbox in list_of_bbox:
+            if all(bbox[k] == v for k, v in query):
+                yield bbox
 
     def create_new_vl_group_for_sections(self, result_list, buf_texts, block_types):
         """
@@ -5330,9 +5661,7 @@ class Doc:
             if split_idx > -1:
                 ptag_idx = result_list[0][split_idx].get("ptag_idx", -1)
                 if ptag_idx > -1:
-                    all_p = self.pages[result_list[0][split_idx]["page_idx"]].find_all(
-                        "p"
-                    )
+                    all_p = self.page_lines[result_list[0][split_idx]["page_idx"]]
                     p_tag = all_p[ptag_idx]
                     word_classes = result_list[0][split_idx]["word_classes"]
                     diff_idx = 0
@@ -5341,7 +5670,7 @@ class Doc:
                             diff_idx = len(word_classes) - cl_idx - 1
                             break
                     keys = ["word-start-positions", "word-end-positions", "word-fonts"]
-                    input_style = style_utils.get_style_kv(p_tag["style"])
+                    input_style = style_utils.get_style_kv(p_tag.style)
                     for key in keys:
                         input_style[key] = input_style[key][2:-2].split("), (")
                     if prefix_vls:
@@ -5404,7 +5733,7 @@ class Doc:
                             right - left,
                             result_list[0][split_idx]["box_style"][4],
                         )
-                        lp_line = line_parser.Line(text)
+                        lp_line = self.line_cache.get_line(text)
                         line_info = {
                             "box_style": box_style,
                             "line_style": result_list[0][split_idx]["line_style"],
@@ -5505,7 +5834,7 @@ class Doc:
                     prev_vl = vl
                 for vl_group in same_line_vl_group:
                     last_line_text = " ".join([s["text"].strip() for s in vl_group])
-                    line_props = line_parser.Line(last_line_text)
+                    line_props = self.line_cache.get_line(last_line_text)
                     if line_props.is_header and line_props.noun_chunks:
                         noun_chunk_str = " ".join(line_props.noun_chunks)
                         translated_str = last_line_text.translate(
@@ -5593,7 +5922,7 @@ class Doc:
                     "visual_lines": temp_blocks[-1]["visual_lines"]
                     + blk["visual_lines"],
                     "block_class": temp_blocks[-1]["block_class"],
-                    "block_sents": sent_tokenize(merged_text),
+                    "block_sents": cached_sent_tokenize(merged_text),
                 }
                 merged_block["box_style"] = self.calc_block_span(merged_block)
                 temp_blocks[-1] = merged_block
@@ -5676,7 +6005,7 @@ class Doc:
                         "visual_lines": prev_same_class_block["visual_lines"]
                         + blk["visual_lines"],
                         "block_class": blk["block_class"],
-                        "block_sents": sent_tokenize(merged_text),
+                        "block_sents": cached_sent_tokenize(merged_text),
                     }
                     merged_block["box_style"] = self.calc_block_span(merged_block)
                     temp_blocks[prev_temp_idx] = merged_block
@@ -5782,7 +6111,7 @@ class Doc:
                         "visual_lines": prev_same_class_block["visual_lines"]
                         + blk["visual_lines"],
                         "block_class": merged_block_class,
-                        "block_sents": sent_tokenize(merged_text),
+                        "block_sents": cached_sent_tokenize(merged_text),
                     }
                     merged_block["box_style"] = self.calc_block_span(merged_block)
                     temp_blocks[prev_temp_idx] = merged_block
@@ -5827,7 +6156,7 @@ class Doc:
                     "visual_lines": temp_blocks[-1]["visual_lines"]
                     + blk["visual_lines"],
                     "block_class": temp_blocks[-1]["block_class"],
-                    "block_sents": sent_tokenize(merged_text),
+                    "block_sents": cached_sent_tokenize(merged_text),
                 }
                 merged_block["box_style"] = self.calc_block_span(merged_block)
                 temp_blocks[-1] = merged_block
@@ -5862,7 +6191,7 @@ class Doc:
                 translated_str = blk["block_text"].translate(
                     str.maketrans("", "", string.punctuation)
                 )
-                json_rec = line_parser.Line(translated_str).to_json()
+                json_rec = self.line_cache.get_line_json(translated_str)
                 name_decider = False
                 if json_rec["noun_chunks"]:
                     noun_chunk_str = " ".join(json_rec["noun_chunks"])
@@ -5891,7 +6220,7 @@ class Doc:
                         "visual_lines": temp_blocks[-1]["visual_lines"]
                         + blk["visual_lines"],
                         "block_class": temp_blocks[-1]["block_class"],
-                        "block_sents": sent_tokenize(merged_text),
+                        "block_sents": cached_sent_tokenize(merged_text),
                     }
                     merged_block["box_style"] = self.calc_block_span(merged_block)
                     temp_blocks[-1] = merged_block
@@ -5917,7 +6246,7 @@ class Doc:
                             "visual_lines": temp_blocks[-1]["visual_lines"]
                             + b["visual_lines"],
                             "block_class": temp_blocks[-1]["block_class"],
-                            "block_sents": sent_tokenize(merged_text),
+                            "block_sents": cached_sent_tokenize(merged_text),
                         }
                         merged_block["box_style"] = self.calc_block_span(merged_block)
                         temp_blocks[-1] = merged_block
@@ -5960,7 +6289,7 @@ class Doc:
                     "visual_lines": temp_blocks[-1]["visual_lines"]
                     + blk["visual_lines"],
                     "block_class": blk["block_class"],
-                    "block_sents": sent_tokenize(merged_text),
+                    "block_sents": cached_sent_tokenize(merged_text),
                 }
                 merged_block["box_style"] = self.calc_block_span(merged_block)
                 temp_blocks[-1] = merged_block
@@ -5999,7 +6328,7 @@ class Doc:
                 temp_blocks[-1]["visual_lines"] = (
                     temp_blocks[-1]["visual_lines"] + blk["visual_lines"]
                 )
-                temp_blocks[-1]["block_sents"] = sent_tokenize(merged_text)
+                temp_blocks[-1]["block_sents"] = cached_sent_tokenize(merged_text)
                 temp_blocks[-1]["box_style"] = self.calc_block_span(temp_blocks[-1])
             else:
                 temp_blocks.append(blk)
@@ -6060,7 +6389,7 @@ class Doc:
                     "visual_lines": temp_blocks[-1]["visual_lines"]
                     + blk["visual_lines"],
                     "block_class": temp_blocks[-1]["block_class"],
-                    "block_sents": sent_tokenize(merged_text),
+                    "block_sents": cached_sent_tokenize(merged_text),
                 }
                 merged_block["box_style"] = self.calc_block_span(merged_block)
                 temp_blocks[-1] = merged_block
@@ -6143,70 +6472,6 @@ class Doc:
         )
         return has_same_or_bigger_font
 
-    @staticmethod
-    def svg_line_operations(lines_list, x1, y1, x2, y2, style):
-        if lines_list:
-            do_add_to_list = True
-            for line in lines_list:
-                if (
-                    abs(x1 - line["x1"]) < 1.0
-                    and abs(y1 - line["y1"]) < 1.0
-                    and abs(x2 - line["x2"]) < 1.0
-                    and abs(y2 - line["y2"]) < 1.0
-                ):
-                    do_add_to_list = False
-                    break
-                elif (
-                    (abs(x2 - line["x1"]) < 1.0 or abs(x1 - line["x2"]) < 1.0)
-                    and abs(y1 - y2) < 1.0
-                    and abs(line["y1"] - line["y2"]) < 1.0
-                    and abs(y1 - line["y1"]) < 1.0
-                ):
-                    # Have the same top, and the difference between the start and end of the lines are < 1.0 pixel
-                    # Merge them
-                    # if line['x1'] > x2:
-                    line["x1"] = min(x1, line["x1"])
-                    # elif x1 > line['x2']:
-                    line["x2"] = max(x2, line["x2"])
-                    do_add_to_list = False
-                    break
-                elif (
-                    (abs(y2 - line["y1"]) < 1.0 or abs(y1 - line["y2"]) < 1.0)
-                    and abs(x1 - x2) < 1.0
-                    and abs(line["x1"] - line["x2"]) < 1.0
-                    and abs(x1 - line["x1"]) < 1.0
-                ):
-                    # Have the same x, and the difference between the start and end of the lines are < 1.0 pixel
-                    # Merge the vertical lines
-                    # if line['y1'] > y2:
-                    line["y1"] = min(y1, line["y1"])
-                    # elif y1 > line['y2']:
-                    line["y2"] = max(y2, line["y2"])
-                    do_add_to_list = False
-                    break
-
-            if do_add_to_list:
-                lines_list.append(
-                    {
-                        "x1": x1,
-                        "y1": y1,
-                        "x2": x2,
-                        "y2": y2,
-                        "style": style,
-                    }
-                )
-        else:
-            lines_list.append(
-                {
-                    "x1": x1,
-                    "y1": y1,
-                    "x2": x2,
-                    "y2": y2,
-                    "style": style,
-                }
-            )
-        return lines_list
-
     @staticmethod
     def remove_duplicate_svg_tags(
         soup,
@@ -6218,7 +6483,7 @@ class Doc:
         Merge rectangles that are < 1 pixel in height to a line
         Don't add rectangles that span the entire page width / height
         """
-        lines_list = []
+        line_merger = SvgLineMerger()
         rect_tag_list = []
         svg_height = 0
         svg_width = 0
@@ -6244,7 +6509,7 @@ class Doc:
                 # Consider only horizontal or vertical lines.
                 if x1 != x2 and y1 != y2:
                     continue
-                lines_list = Doc.svg_line_operations(lines_list, x1, y1, x2, y2, style)
+                line_merger.add(x1, y1, x2, y2, style)
             elif (
                 svg_child.name == "rect"
                 and svg_child.get("x", None)
@@ -6258,19 +6523,18 @@ class Doc:
                         float(svg_child["height"]) >= 0.8 * svg_height
                         and float(svg_child["width"]) >= 0.8 * svg_width
                     ):
-                        rect_tag_list.append(svg_child)
+                        # copy the attributes, the tag would keep the page tree alive
+                        rect_tag_list.append(dict(svg_child.attrs))
                 else:
                     x1 = float(svg_child["x"])
                     y1 = float(svg_child["y"])
                     x2 = x1 + float(svg_child["width"])
                     y2 = y1 + float(svg_child["height"])
                     style = svg_child.get("style", "")
-                    lines_list = Doc.svg_line_operations(
-                        lines_list, x1, y1, x2, y2, style
-                    )
+                    line_merger.add(x1, y1, x2, y2, style)
 
         lines_tag_list = []
-        for line in lines_list:
+        for line in line_merger.lines:
             new_line = soup.new_tag("line")
             for k, v in line.items():
                 new_line[k] = v
@@ -6282,7 +6546,7 @@ class Doc:
     def check_line_between_box_styles(
         prev_blk_box_style: tuple[float, float, float, float, float],
         curr_blk_box_style: tuple[float, float, float, float, float],
-        lines_tag_list: List[Any],
+        lines_tag_list: Any,
         check_gap: bool = False,
         x_axis_relaxed: bool = False,
     ) -> bool:
@@ -6294,7 +6558,7 @@ class Doc:
         Parameters:
             prev_blk_box_style (Tuple[float, float, float, float, float]): (top, left, right, width, height)
             curr_blk_box_style (Tuple[float, float, float, float, float]): Same as above for the current block.
-            lines_tag_list (List[Any]): List of SVG line tags.
+            lines_tag_list (Any): SvgRulingIndex of the page or list of SVG line tags.
             check_gap (bool): Whether to check gap differences.
             x_axis_relaxed (bool): If True, relax the left/right conditions.
 
@@ -6311,11 +6575,12 @@ class Doc:
             left2 = curr_blk_box_style[1]
             right2 = curr_blk_box_style[2]
 
-            for line in lines_tag_list:
-                line_x1 = float(line['x1'])  # Ensure x1 is a float
-                line_x2 = float(line['x2'])  # Ensure x2 is a float
-                line_y1 = float(line['y1'])  # Ensure y1 is a float
-                # Not doing exact match on top of the next element as sometimes lines are thick
+            if not isinstance(lines_tag_list, SvgRulingIndex):
+                lines_tag_list = SvgRulingIndex(lines_tag_list)
+            # Not doing exact match on top of the next element as sometimes lines are thick
+            for line_y1, _, line_x1, line_x2 in lines_tag_list.lines_between(
+                bottom1, top2 + 2.0
+            ):
                 if bottom1 <= line_y1 <= (top2 + 2.0) and \
                         line_x1 <= left1 <= line_x2 and \
                         line_x1 <= left2 <= line_x2 and \
@@ -6349,19 +6614,6 @@ class Doc:
         ret_val = False
         if len(self.page_svg_tags) > block["page_idx"]:
             [line_svg_tags, rect_svg_tags] = self.page_svg_tags[block["page_idx"]]
-            box_style = block["box_style"]
             # Check within rectangular bounds.
-            for rect in rect_svg_tags:
-                rect_left = float(rect["x"])
-                rect_top = float(rect["y"])
-                rect_bottom = rect_top + float(rect["height"])
-                rect_right = rect_left + float(rect["width"])
-                if (
-                    rect_top <= box_style[0] <= rect_bottom
-                    and rect_left <= box_style[1] <= rect_right
-                    and box_style[0] + box_style[4] <= rect_bottom
-                    and box_style[2] <= rect_right
-                ):
-                    ret_val = True
-                    break
+            ret_val = rect_svg_tags.contains_box(block["box_style"])
         return ret_val
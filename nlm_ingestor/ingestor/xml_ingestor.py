@@ -4,7 +4,7 @@ import xml.etree.ElementTree as ET
 from nlm_ingestor.ingestor import processors
 from nlm_ingestor.ingestor.visual_ingestor import block_renderer
 from nlm_ingestor.ingestor_utils.ing_named_tuples import LineStyle
-from nlm_ingestor.ingestor_utils.utils import sent_tokenize
+from nlm_ingestor.ingestor_utils.utils import batch_sent_tokenize
 
 # from nltk import sent_tokenize
 
@@ -83,7 +83,10 @@ class XMLIngestor:
                     col_blocks = processors.clean_lines(lines, xml=True)
                     header_text = blocks[-1]["block_text"]
                     has_header = False
-                    for block in col_blocks:
+                    col_sents = batch_sent_tokenize(
+                        block["block_text"] for block in col_blocks
+                    )
+                    for block, block_sents in zip(col_blocks, col_sents):
                         # print("\t" * (level + 1), block["block_text"])
                         inline_header = has_header and block["block_type"] == "para"
                         block["header_text"] = (
@@ -93,7 +96,7 @@ class XMLIngestor:
                         block["level"] = level + indent_offset
                         block["block_idx"] = len(blocks)
                         block["page_idx"] = 0
-                        block["block_sents"] = sent_tokenize(block["block_text"])
+                        block["block_sents"] = block_sents
                         block["block_class"] = "nlm-text-body"
                         block["level_chain"] = (
                             [title, header_text] if title else [header_text]
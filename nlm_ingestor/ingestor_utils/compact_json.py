@@ -0,0 +1,243 @@
+"""
+Compact "v2" encoding of the JSON result of the BlockRenderer.
+
+The v1 result is a list of one dict per block, which repeats every key, block class
+and style in each block. v2 stores the same result column-wise:
+
+    {
+        "schema_version": 2,
+        "classes": [class_name, ...],
+        "style_classes": [index in classes of the class of each style, ...],
+        "style_keys": ["font-family", ...],
+        "styles": [[value of each style key], ...],
+        "tags": ["header", "para", ...],
+        "blocks": {
+            "tag": [index in tags, ...],
+            "block_class": [index in classes, ...],
+            "page_idx": [...],
+            "block_idx": [...],
+            "level": [...],
+            "parent": [position of the enclosing header or -1, ...],
+            "bbox": [[x0, y0, x1, y1] or [] or null, ...],
+            "sentences": [[sentence, ...] or null, ...],
+            "table": [index in tables or null, ...],
+            "extra": [dict of the other keys of the block or null, ...],
+        },
+        "tables": [[top, left, name, rows or null], ...],
+    }
+
+Columns with only nulls are left out. Table rows are [row type, block_idx, cell
+values, col spans or null] with the row type an index in row_types. The parent
+column is the level chain of blocks_to_sents as indices: following the parents of a
+block gives the headers it is nested under. expand_result converts v2 back to v1.
+"""
+
+import json
+
+SCHEMA_VERSIONS = (1, 2)
+
+row_types = ["full_row", "table_header", "table_data_row"]
+row_type_index = {row_type: idx for idx, row_type in enumerate(row_types)}
+
+table_keys = ("top", "left", "name", "table_rows")
+block_keys = {
+    "tag",
+    "page_idx",
+    "block_class",
+    "sentences",
+    "bbox",
+    "block_idx",
+    "level",
+} | set(table_keys)
+# columns of the blocks, in their order in the v2 result
+block_columns = (
+    "tag",
+    "block_class",
+    "page_idx",
+    "block_idx",
+    "level",
+    "parent",
+    "bbox",
+    "sentences",
+    "table",
+    "extra",
+)
+
+
+class Interner:
+    """
+    Table of distinct values, that maps each value to its index in the table
+    """
+
+    def __init__(self, values=()):
+        self.values = []
+        self.index = {}
+        for value in values:
+            self.add(value)
+
+    def add(self, value):
+        # e.g. the text ingestor has {} as block class
+        key = json.dumps(value, sort_keys=True) if isinstance(value, dict) else value
+        idx = self.index.get(key)
+        if idx is None:
+            idx = len(self.values)
+            self.index[key] = idx
+            self.values.append(value)
+        return idx
+
+
+def compact_row(row):
+    """
+    :param row: v1 table row
+    :return: [row type, block_idx, cell values, col spans or null]
+    """
+    if row["type"] == "full_row":
+        values = [row["cell_value"]]
+        col_spans = [row["col_span"]]
+    else:
+        values = [cell["cell_value"] for cell in row["cells"]]
+        col_spans = None
+        if row["cells"] and "col_span" in row["cells"][0]:
+            col_spans = [cell["col_span"] for cell in row["cells"]]
+    return [row_type_index[row["type"]], row.get("block_idx"), values, col_spans]
+
+
+def expand_row(row):
+    """
+    :param row: v2 table row
+    :return: v1 table row
+    """
+    row_type, block_idx, values, col_spans = row
+    row_type = row_types[row_type]
+    if row_type == "full_row":
+        v1_row = {"type": row_type, "col_span": col_spans[0], "cell_value": values[0]}
+    else:
+        cells = []
+        for cell_idx, value in enumerate(values):
+            cell = {"cell_value": value}
+            if col_spans is not None:
+                cell = {"col_span": col_spans[cell_idx], "cell_value": value}
+            cells.append(cell)
+        v1_row = {"type": row_type, "cells": cells}
+    if block_idx is not None:
+        v1_row["block_idx"] = block_idx
+    return v1_row
+
+
+def compact_result(render_dict):
+    """
+    :param render_dict: v1 JSON result of BlockRenderer.render_json
+    :return: v2 JSON result with the same content
+    """
+    styles = render_dict.get("styles", [])
+    style_keys = Interner(key for style in styles for key in style["style"])
+    classes = Interner()
+    style_classes = [classes.add(style["class_name"]) for style in styles]
+    tags = Interner()
+    columns = {column: [] for column in block_columns}
+    tables = []
+    headers = []
+    for position, block in enumerate(render_dict.get("blocks", [])):
+        level = block.get("level")
+        # same nesting as the level chain of blocks_to_sents
+        is_header = block["tag"] == "header" and level is not None
+        if is_header:
+            while headers and headers[-1][0] >= level:
+                headers.pop()
+        columns["parent"].append(headers[-1][1] if headers else -1)
+        if is_header:
+            headers.append((level, position))
+
+        columns["tag"].append(tags.add(block["tag"]))
+        columns["block_class"].append(classes.add(block["block_class"]))
+        columns["page_idx"].append(block["page_idx"])
+        columns["block_idx"].append(block.get("block_idx"))
+        columns["level"].append(level)
+        columns["bbox"].append(block.get("bbox"))
+        columns["sentences"].append(block.get("sentences"))
+        if "top" in block:
+            rows = block.get("table_rows")
+            if rows is not None:
+                rows = [compact_row(row) for row in rows]
+            columns["table"].append(len(tables))
+            tables.append([block["top"], block["left"], block["name"], rows])
+        else:
+            columns["table"].append(None)
+        extra = {key: value for key, value in block.items() if key not in block_keys}
+        columns["extra"].append(extra or None)
+
+    return {
+        "schema_version": 2,
+        "classes": classes.values,
+        "style_classes": style_classes,
+        "style_keys": style_keys.values,
+        "styles": [
+            [style["style"].get(key) for key in style_keys.values] for style in styles
+        ],
+        "tags": tags.values,
+        "blocks": {
+            column: values
+            for column, values in columns.items()
+            if any(value is not None for value in values)
+        },
+        "tables": tables,
+    }
+
+
+def expand_result(compact_dict):
+    """
+    :param compact_dict: v2 JSON result of compact_result
+    :return: v1 JSON result with the same content
+    """
+    classes = compact_dict["classes"]
+    style_keys = compact_dict["style_keys"]
+    tags = compact_dict["tags"]
+    tables = compact_dict["tables"]
+    styles = [
+        {"class_name": classes[class_idx], "style": dict(zip(style_keys, values))}
+        for class_idx, values in zip(
+            compact_dict["style_classes"], compact_dict["styles"]
+        )
+    ]
+    columns = compact_dict["blocks"]
+    num_blocks = len(columns.get("tag", []))
+
+    blocks = []
+    for position in range(num_blocks):
+        values = {
+            column: column_values[position] for column, column_values in columns.items()
+        }
+        block = {
+            "tag": tags[values["tag"]],
+            "page_idx": values["page_idx"],
+            "block_class": classes[values["block_class"]],
+        }
+        rows = None
+        if values.get("table") is not None:
+            top, left, name, rows = tables[values["table"]]
+            block.update({"top": top, "left": left, "name": name})
+        for column in ("sentences", "block_idx", "level"):
+            if values.get(column) is not None:
+                block[column] = values[column]
+        if rows is not None:
+            block["table_rows"] = [expand_row(row) for row in rows]
+        if values.get("bbox") is not None:
+            block["bbox"] = values["bbox"]
+        block.update(values.get("extra") or {})
+        blocks.append(block)
+    return {"styles": styles, "blocks": blocks}
+
+
+def with_schema_version(return_dict, schema_version):
+    """
+    :param return_dict: Result of an ingestor, with the v1 JSON result
+    :param schema_version: Schema version of the JSON result to return
+    :return: return_dict with its JSON result in schema_version, without changing
+    return_dict as it can be a cached result
+    """
+    if schema_version not in SCHEMA_VERSIONS:
+        raise ValueError(f"unsupported schema version {schema_version}")
+    result = (return_dict or {}).get("result")
+    if schema_version == 1 or not isinstance(result, dict) or "blocks" not in result:
+        return return_dict
+    return {**return_dict, "result": compact_result(result)}
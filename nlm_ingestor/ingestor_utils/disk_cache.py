@@ -0,0 +1,104 @@
+import gzip
+import hashlib
+import logging
+import os
+import tempfile
+
+logger = logging.getLogger(__name__)
+
+
+def file_hash(file_path, chunk_size=1 << 20):
+    """
+    :param file_path: File to hash
+    :return: sha256 hex digest of the file contents
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        for chunk in iter(lambda: file.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class DiskCache:
+    """
+    Size bounded, gzip compressed key/value store in a local directory.
+    Entries are evicted least recently used first, using the file mtime as the
+    access time, so several processes can share the same directory.
+    """
+
+    def __init__(self, cache_dir, max_bytes, suffix=".gz"):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.evictions = 0
+        self.total_bytes = sum(size for _, _, size in self._entries())
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key + self.suffix)
+
+    def _entries(self):
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file() and entry.name.endswith(self.suffix):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, entry.path, stat.st_size))
+        return entries
+
+    def get(self, key):
+        """
+        :return: Stored bytes or None if the key is not in the cache
+        """
+        path = self._path(key)
+        try:
+            with gzip.open(path, "rb") as file:
+                value = file.read()
+        except (FileNotFoundError, OSError, EOFError):
+            return None
+        # mark as recently used
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return value
+
+    def put(self, key, value: bytes):
+        path = self._path(key)
+        handle, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with (
+                os.fdopen(handle, "wb") as raw_file,
+                gzip.GzipFile(fileobj=raw_file, mode="wb", compresslevel=6) as file,
+            ):
+                file.write(value)
+            size = os.path.getsize(tmp_path)
+            # rename is atomic, readers see either the old or the new entry
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.error(f"could not write cache entry {path}: {e}")
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            return
+        self.total_bytes += size
+        if self.total_bytes > self.max_bytes:
+            self.evict()
+
+    def evict(self):
+        """
+        Removes least recently used entries until the cache fits in max_bytes.
+        """
+        # rescan, other processes may have added or removed entries
+        entries = sorted(self._entries())
+        self.total_bytes = sum(size for _, _, size in entries)
+        for _, path, size in entries:
+            if self.total_bytes <= self.max_bytes:
+                break
+            try:
+                os.unlink(path)
+                self.evictions += 1
+            except FileNotFoundError:
+                pass
+            self.total_bytes -= size
+
+    def __contains__(self, key):
+        return os.path.exists(self._path(key))
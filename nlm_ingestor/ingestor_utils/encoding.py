@@ -0,0 +1,133 @@
+"""
+Serialization of the ingestion results.
+JSON uses orjson, which is much faster on large results, and falls back to the
+standard library json module with NpEncoder when orjson is not installed or cannot
+encode a value. orjson writes NaN and infinity as null, where json writes NaN.
+For the clients that ask for a binary format the same results can be encoded as
+MessagePack, with ormsgpack or else msgpack, and as CBOR with cbor2. The msgpack
+version pinned by nlm-utils has no C extension for current pythons, and its pure
+python fallback is about 10x slower than ormsgpack.
+"""
+
+import json
+
+import numpy as np
+
+from nlm_ingestor.ingestor_utils.utils import NpEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ormsgpack
+except ImportError:
+    ormsgpack = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import cbor2
+except ImportError:
+    cbor2 = None
+
+JSON_MIMETYPE = "application/json"
+MSGPACK_MIMETYPES = ("application/msgpack", "application/x-msgpack")
+CBOR_MIMETYPE = "application/cbor"
+
+
+def to_native(obj):
+    """
+    Default of orjson for the types it does not serialize, as NpEncoder does
+    """
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(obj, sort_keys=False):
+    """
+    :param obj: Result with plain python or numpy values
+    :param sort_keys: Whether to sort the keys of the dicts
+    :return: Compact utf-8 JSON of obj
+    """
+    if orjson is not None:
+        option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        try:
+            return orjson.dumps(obj, default=to_native, option=option)
+        except TypeError:
+            # e.g. integers that do not fit in 64 bits, which json handles
+            pass
+    return json.dumps(
+        obj, cls=NpEncoder, sort_keys=sort_keys, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def loads(data):
+    """
+    :param data: JSON as bytes or str
+    :return: Decoded value
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def mimetypes():
+    """
+    :return: Mime types of the installed encodings, json first
+    """
+    supported = [JSON_MIMETYPE]
+    if ormsgpack is not None or msgpack is not None:
+        supported += MSGPACK_MIMETYPES
+    if cbor2 is not None:
+        supported.append(CBOR_MIMETYPE)
+    return supported
+
+
+def cbor_default(encoder, obj):
+    encoder.encode(to_native(obj))
+
+
+def encode(obj, mimetype=JSON_MIMETYPE, sort_keys=False):
+    """
+    :param obj: Result with plain python or numpy values
+    :param mimetype: One of mimetypes()
+    :param sort_keys: Whether to sort the keys of the dicts, for json only
+    :return: obj encoded as mimetype
+    """
+    if mimetype == JSON_MIMETYPE:
+        return dumps(obj, sort_keys=sort_keys)
+    if mimetype in MSGPACK_MIMETYPES and ormsgpack is not None:
+        option = ormsgpack.OPT_SERIALIZE_NUMPY | ormsgpack.OPT_NON_STR_KEYS
+        return ormsgpack.packb(obj, default=to_native, option=option)
+    if mimetype in MSGPACK_MIMETYPES and msgpack is not None:
+        return msgpack.packb(obj, default=to_native, use_bin_type=True)
+    if mimetype == CBOR_MIMETYPE and cbor2 is not None:
+        return cbor2.dumps(obj, default=cbor_default)
+    raise ValueError(f"unsupported result encoding {mimetype}")
+
+
+def decode(data, mimetype=JSON_MIMETYPE):
+    """
+    :param data: Result encoded as mimetype
+    :param mimetype: One of mimetypes()
+    :return: Decoded value
+    """
+    if mimetype == JSON_MIMETYPE:
+        return loads(data)
+    if mimetype in MSGPACK_MIMETYPES and ormsgpack is not None:
+        return ormsgpack.unpackb(data, option=ormsgpack.OPT_NON_STR_KEYS)
+    if mimetype in MSGPACK_MIMETYPES and msgpack is not None:
+        return msgpack.unpackb(data, raw=False, strict_map_key=False)
+    if mimetype == CBOR_MIMETYPE and cbor2 is not None:
+        return cbor2.loads(data)
+    raise ValueError(f"unsupported result encoding {mimetype}")
@@ -5,4 +5,8 @@ LineStyle = namedtuple(
     "LineStyle",
     "font_family, font_style, font_size, font_weight, text_transform, font_space_width, text_align",
 )
-LocationKey = namedtuple("location_key", "top, left, text")
+LocationKey = namedtuple("LocationKey", "top, left, text")
+# text and style of a tika p tag, what is kept of a page once its lines are styled
+PTagRecord = namedtuple("PTagRecord", "text, style")
+# attributes and XHTML of a tika page div, parsed into a tag where it is needed
+PageHtml = namedtuple("PageHtml", "attrs, html")
@@ -0,0 +1,125 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+
+import nlm_ingestor.ingestion_daemon.config as cfg
+from nlm_ingestor.ingestor_utils import encoding
+from nlm_ingestor.ingestor_utils.disk_cache import DiskCache, file_hash
+from nlm_ingestor.ingestor_utils.lru_cache import LRUCache
+
+logger = logging.getLogger(__name__)
+logger.setLevel(cfg.log_level())
+
+# parse options that change the result, with their defaults in the ingestors
+result_parse_options = {
+    "render_format": "all",
+    "use_new_indent_parser": False,
+    "apply_ocr": False,
+    "parse_pages": (),
+}
+
+
+def normalize_parse_options(parse_options):
+    parse_options = parse_options or {}
+    normalized = {}
+    for key, default in result_parse_options.items():
+        value = parse_options.get(key, default)
+        if key == "parse_pages":
+            value = list(value) if value else []
+        elif isinstance(default, bool):
+            value = bool(value)
+        normalized[key] = value
+    return normalized
+
+
+class ResultCache:
+    """
+    Content addressed cache of ingestion results.
+    Results are keyed by the hash of the file contents, the parse options that affect
+    the result and the ingestor VERSION, so that a code change invalidates old entries.
+    Lookups go to an in-memory LRU first and then to a size bounded directory on disk.
+    Both tiers hold the encoded result, so that every lookup returns its own copy
+    that the caller is free to change.
+    """
+
+    def __init__(self, version, max_entries=64, cache_dir=None, max_bytes=1 << 30):
+        self.version = version
+        self.memory = LRUCache(max_entries) if max_entries > 0 else None
+        self.disk = DiskCache(cache_dir, max_bytes, ".json.gz") if cache_dir else None
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def make_key(self, doc_location, mime_type, parse_options):
+        key_parts = {
+            "file_hash": file_hash(doc_location),
+            "mime_type": mime_type,
+            "parse_options": normalize_parse_options(parse_options),
+            "version": self.version,
+        }
+        return hashlib.sha256(
+            json.dumps(key_parts, sort_keys=True).encode("utf-8")
+        ).hexdigest()
+
+    def get(self, key):
+        with self._lock:
+            value = None
+            if self.memory is not None and key in self.memory:
+                self.memory_hits += 1
+                value = self.memory[key]
+        if value is None:
+            value = self.disk.get(key) if self.disk else None
+            with self._lock:
+                if value is None:
+                    self.misses += 1
+                    return None
+                self.disk_hits += 1
+                if self.memory is not None:
+                    self.memory[key] = value
+        return encoding.loads(value)
+
+    def put(self, key, return_dict):
+        value = encoding.dumps(return_dict)
+        with self._lock:
+            if self.memory is not None:
+                self.memory[key] = value
+        if self.disk:
+            self.disk.put(key, value)
+
+    def stats(self):
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_ratio": (
+                (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0
+            ),
+            "memory_entries": len(self.memory.cache) if self.memory else 0,
+            "disk_bytes": self.disk.total_bytes if self.disk else 0,
+            "disk_evictions": self.disk.evictions if self.disk else 0,
+            "version": self.version,
+        }
+
+
+def create_result_cache(version):
+    """
+    Creates the result cache from the service configuration.
+    Returns None when caching is turned off with INGESTOR_RESULT_CACHE=no.
+    """
+    if not cfg.get_config_as_bool("INGESTOR_RESULT_CACHE", "yes"):
+        return None
+    cache_dir = cfg.get_config(
+        "INGESTOR_RESULT_CACHE_DIR",
+        os.path.join(tempfile.gettempdir(), "nlm-ingestor-results"),
+    )
+    return ResultCache(
+        version,
+        max_entries=cfg.get_config_as_int("INGESTOR_RESULT_CACHE_ENTRIES", 64),
+        cache_dir=cache_dir or None,
+        max_bytes=cfg.get_config_as_int("INGESTOR_RESULT_CACHE_MAX_MB", 1024) << 20,
+    )
@@ -0,0 +1,127 @@
+"""
+Per stage wall time and peak memory accounting for the ingestion pipeline.
+
+The pipeline marks its stages with
+
+    with stage_timer.stage("render_json"):
+        ...
+
+which costs next to nothing unless a StageRecorder is active. Stages may nest and
+may run many times per document, their times are summed up per stage name.
+The active recorder is a context variable, so a recorder only sees the stages of
+its own thread. Stages run in worker threads or processes are not recorded.
+"""
+
+import contextvars
+import tracemalloc
+from timeit import default_timer
+
+_recorder = contextvars.ContextVar("stage_recorder", default=None)
+
+
+class _NoStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+_no_stage = _NoStage()
+
+
+class _Stage:
+    __slots__ = ("recorder", "name", "start", "mem_start", "peak")
+
+    def __init__(self, recorder, name):
+        self.recorder = recorder
+        self.name = name
+        self.start = 0
+        self.mem_start = 0
+        self.peak = 0
+
+    def __enter__(self):
+        self.recorder._enter(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.recorder._exit(self)
+        return False
+
+
+class StageRecorder:
+    """
+    Collects the stages run while it is active.
+    With trace_memory the peak of the memory allocated by python above the level at
+    the start of the stage is recorded as well, using tracemalloc. Tracing slows the
+    pipeline down considerably, so time and memory should be measured in separate runs.
+    """
+
+    def __init__(self, trace_memory=False):
+        self.trace_memory = trace_memory
+        self.stages = {}
+        self._stack = []
+        self._started_tracing = False
+        self._token = None
+
+    def __enter__(self):
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        self._token = _recorder.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        _recorder.reset(self._token)
+        self._token = None
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+        return False
+
+    def _update_open_peaks(self, peak):
+        for open_stage in self._stack:
+            open_stage.peak = max(open_stage.peak, peak - open_stage.mem_start)
+
+    def _enter(self, stage):
+        if self.trace_memory:
+            current, peak = tracemalloc.get_traced_memory()
+            # the enclosing stages must see the peak before it is reset
+            self._update_open_peaks(peak)
+            tracemalloc.reset_peak()
+            stage.mem_start = current
+        self._stack.append(stage)
+        stage.start = default_timer()
+
+    def _exit(self, stage):
+        wall_time = default_timer() - stage.start
+        self._stack.pop()
+        if self.trace_memory:
+            _, peak = tracemalloc.get_traced_memory()
+            stage.peak = max(stage.peak, peak - stage.mem_start)
+            self._update_open_peaks(peak)
+            tracemalloc.reset_peak()
+        stats = self.stages.get(stage.name)
+        if stats is None:
+            stats = self.stages[stage.name] = {
+                "calls": 0,
+                "wall_ms": 0.0,
+                "peak_mem_mb": 0.0,
+            }
+        stats["calls"] += 1
+        stats["wall_ms"] += wall_time * 1000
+        if self.trace_memory:
+            stats["peak_mem_mb"] = max(stats["peak_mem_mb"], stage.peak / (1 << 20))
+
+
+def stage(name):
+    """
+    :param name: Name of the pipeline stage
+    :return: Context manager that times the enclosed code under name
+    """
+    recorder = _recorder.get()
+    if recorder is None:
+        return _no_stage
+    return _Stage(recorder, name)
@@ -1,9 +1,14 @@
 import json
 import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
 
 import numpy as np
 from nltk import PunktSentenceTokenizer, load
 
+import nlm_ingestor.ingestion_daemon.config as cfg
+from nlm_ingestor.ingestor_utils.lru_cache import LRUCache
+
 nltk_abbs = load("tokenizers/punkt/{}.pickle".format("english"))._params.abbrev_types
 
 
@@ -55,6 +60,8 @@ abbs = nltk_abbs | nlm_abbs
 nltk_tokenzier = PunktSentenceTokenizer()
 
 rules = []
+# (is start rule, abbreviation) of the rules of the abbreviations
+abbreviation_rule_abbs = []
 
 for abb in abbs:
     # match start of the sentence
@@ -64,6 +71,7 @@ for abb in abbs:
     # case insensitive replacement for synonyms
     rule = re.compile(pattern, re.IGNORECASE)
     rules.append((rule, replaced))
+    abbreviation_rule_abbs.append((True, abb))
 
     # match token in sentence
     pattern = rf"\s{abb}.\s"
@@ -72,12 +80,17 @@ for abb in abbs:
     # case insensitive replacement for synonyms
     rule = re.compile(pattern, re.IGNORECASE)
     rules.append((rule, replaced))
+    abbreviation_rule_abbs.append((False, abb))
+
+abbreviation_rules = list(rules)
+special_rules = []
 
 for abb in nlm_special_abbs:
     pattern = rf"{abb}\."
     replaced = f"{abb}_"
     rule = re.compile(pattern, re.IGNORECASE)
     rules.append((rule, replaced))
+    special_rules.append((rule, replaced))
 
 # match content inside brackets
 # (?<=\() ==> starts with "("
@@ -90,6 +103,125 @@ space_rule = re.compile(
 quotation_pattern = re.compile(r'[”“"‘’\']')
 
 
+def abbreviation_alternation(abbreviations):
+    """
+    :return: Alternation of the abbreviations with their common prefixes factored out
+    as a trie, "." is a wildcard as in the rules
+    """
+    trie = {}
+    for abb in abbreviations:
+        node = trie
+        for char in abb:
+            node = node.setdefault(char, {})
+        # end of an abbreviation
+        node[""] = {}
+
+    def node_pattern(node):
+        if not node:
+            return ""
+        alternatives = [
+            (char if char == "." else re.escape(char)) + node_pattern(child)
+            for char, child in sorted(node.items())
+        ]
+        if len(alternatives) == 1:
+            return alternatives[0]
+        return "(?:" + "|".join(alternatives) + ")"
+
+    return node_pattern(trie)
+
+
+class AbbreviationRuleFinder:
+    """
+    Finds the abbreviation rules (^abb.\s and \sabb.\s) that match a text in a single
+    pass instead of running every rule over it. The windows where a rule matches are
+    found with one regex over all the abbreviations, and only the rules of the
+    abbreviations that start with the character at a window and end before a space
+    are tried there.
+    A replacement only writes whitespace, the letters it matched, the "." of the
+    abbreviation and "_", so it can't make another abbreviation rule match, and
+    applying just the matching rules in order gives the same text as applying all.
+    """
+
+    def __init__(self, rules, rule_abbs):
+        """
+        :param rules: (rule, replacement) of the abbreviations
+        :param rule_abbs: (is start rule, abbreviation) of each rule
+        """
+        self.rules = rules
+        # plain abbreviations (text and the "." wildcard) go in the trie and the
+        # index, the others are kept as they are in their rules and tried everywhere
+        abbs = {abb for _, abb in rule_abbs}
+        plain_abbs = {abb for abb in abbs if re.fullmatch(r"[\w\-&'][\w.\-&']*", abb)}
+        patterns = [abbreviation_alternation(plain_abbs)] if plain_abbs else []
+        patterns += [f"(?:{abb})" for abb in sorted(abbs - plain_abbs)]
+        # zero width, so that it finds overlapping windows too
+        self.window_rule = re.compile(
+            r"(?=(?:^|\s)(?:" + "|".join(patterns) + r").\s)", re.IGNORECASE
+        )
+        # (is start rule, first char, length of the abbreviation) -> rule positions
+        self.rule_index = {}
+        self.other_rule_idxs = []
+        for rule_idx, (is_start_rule, abb) in enumerate(rule_abbs):
+            if abb in plain_abbs:
+                rule_key = (is_start_rule, abb[0], len(abb))
+                self.rule_index.setdefault(rule_key, []).append(rule_idx)
+            else:
+                self.other_rule_idxs.append(rule_idx)
+        self.abb_lengths = sorted({len(abb) for abb in plain_abbs})
+        self.first_chars = sorted({abb[0] for abb in plain_abbs})
+        # character -> first chars of the abbreviations that it matches ignoring case
+        self.first_char_matches = {}
+
+    def matching_first_chars(self, char):
+        if char not in self.first_char_matches:
+            self.first_char_matches[char] = [
+                first_char
+                for first_char in self.first_chars
+                if re.fullmatch(re.escape(first_char), char, re.IGNORECASE)
+            ]
+        return self.first_char_matches[char]
+
+    def window_rule_idxs(self, text, start):
+        """
+        :return: Positions of the rules that may match at the start of a window
+        """
+        rule_idxs = list(self.other_rule_idxs)
+        abb_starts = []
+        if start == 0:
+            abb_starts.append((True, 0))
+        if text[start].isspace():
+            abb_starts.append((False, start + 1))
+        for is_start_rule, abb_start in abb_starts:
+            if abb_start >= len(text):
+                continue
+            for first_char in self.matching_first_chars(text[abb_start]):
+                for abb_length in self.abb_lengths:
+                    space_idx = abb_start + abb_length + 1
+                    if space_idx < len(text) and text[space_idx].isspace():
+                        rule_idxs += self.rule_index.get(
+                            (is_start_rule, first_char, abb_length), []
+                        )
+        return rule_idxs
+
+    def matching_rules(self, text):
+        """
+        :return: The rules that match the text, in the order of the rules
+        """
+        matching_rule_idxs = set()
+        for window in self.window_rule.finditer(text):
+            start = window.start()
+            for rule_idx in self.window_rule_idxs(text, start):
+                if rule_idx not in matching_rule_idxs:
+                    if self.rules[rule_idx][0].match(text, start):
+                        matching_rule_idxs.add(rule_idx)
+        return [self.rules[rule_idx] for rule_idx in sorted(matching_rule_idxs)]
+
+
+abbreviation_rule_finder = AbbreviationRuleFinder(
+    abbreviation_rules, abbreviation_rule_abbs
+)
+
+
 def sent_tokenize(org_texts):
     if not org_texts:
         return org_texts
@@ -117,7 +249,9 @@ def sent_tokenize(org_texts):
                 f"_{span.replace('.','_')}_",
             )
 
-        for rule, replaced in rules:
+        for rule, replaced in abbreviation_rule_finder.matching_rules(modified_text):
+            modified_text = rule.sub(replaced, modified_text)
+        for rule, replaced in special_rules:
             modified_text = rule.sub(replaced, modified_text)
         # Normalize all the quotation.
         modified_text = quotation_pattern.sub('"', modified_text)
@@ -144,6 +278,67 @@ def sent_tokenize(org_texts):
     return sents
 
 
+# sentences of the texts tokenized last, shared by the documents of the process
+sent_cache = LRUCache(cfg.get_config_as_int("SENT_CACHE_SIZE", 20000))
+sent_cache_lock = threading.Lock()
+
+
+def cached_sent_tokenize(text):
+    """
+    sent_tokenize with the sentences of recent texts kept in an LRU cache, for the
+    block texts that repeat in and across documents (headers, footers, clauses)
+    :param text: Text to split into sentences
+    :return: Sentences of the text, a new list that the caller can change
+    """
+    if not text:
+        return sent_tokenize(text)
+    with sent_cache_lock:
+        sents = sent_cache[text] if text in sent_cache else None
+    if sents is None:
+        sents = sent_tokenize(text)
+        with sent_cache_lock:
+            sent_cache[text] = sents
+    return list(sents)
+
+
+def batch_sent_tokenize(texts, workers=None):
+    """
+    Splits the texts into sentences, tokenizing each distinct text once and the
+    texts that are not in the sentence cache in a pool of SENT_TOKENIZE_WORKERS
+    processes when there are at least SENT_TOKENIZE_POOL_MIN_TEXTS of them.
+    :param texts: Block texts of a document
+    :param workers: Number of processes, SENT_TOKENIZE_WORKERS by default
+    :return: Sentences of each text, in the order of the texts
+    """
+    texts = list(texts)
+    sents_by_text = {}
+    with sent_cache_lock:
+        for text in texts:
+            if text and text not in sents_by_text and text in sent_cache:
+                sents_by_text[text] = sent_cache[text]
+    new_texts = [
+        text for text in dict.fromkeys(texts) if text and text not in sents_by_text
+    ]
+    if workers is None:
+        workers = cfg.get_config_as_int("SENT_TOKENIZE_WORKERS", 1)
+    min_pool_texts = cfg.get_config_as_int("SENT_TOKENIZE_POOL_MIN_TEXTS", 20000)
+    if workers > 1 and len(new_texts) >= min_pool_texts:
+        chunk_size = max(len(new_texts) // (workers * 4), 1)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            new_sents = list(
+                executor.map(sent_tokenize, new_texts, chunksize=chunk_size)
+            )
+    else:
+        new_sents = [sent_tokenize(text) for text in new_texts]
+    with sent_cache_lock:
+        for text, sents in zip(new_texts, new_sents):
+            sents_by_text[text] = sents
+            sent_cache[text] = sents
+    return [
+        list(sents_by_text[text]) if text else sent_tokenize(text) for text in texts
+    ]
+
+
 def divide_list_into_chunks(lst, n):
     # looping till length l
     for i in range(0, len(lst), n):
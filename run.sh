@@ -1,4 +1,4 @@
 #!/bin/bash
 # latest version of java and a python environment where requirements are installed is required
 nohup java -jar jars/tika-server-standard-nlm-modified-2.9.2_v2.jar > /dev/null 2>&1 &
-python -m nlm_ingestor.ingestion_daemon
\ No newline at end of file
+python -m nlm_ingestor.ingestion_daemon.server
\ No newline at end of file
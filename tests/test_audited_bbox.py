@@ -0,0 +1,87 @@
+import random
+import unittest
+import warnings
+
+from nlm_ingestor.ingestor.visual_ingestor.visual_ingestor import Doc
+
+
+class AuditedBBox(dict):
+    """
+    Audited bbox as Doc reads it, by attribute and by key
+    """
+
+    __getattr__ = dict.__getitem__
+
+
+def make_bbox(page_idx, block_type, left, top, right, bottom):
+    return AuditedBBox(
+        page_idx=page_idx, block_type=block_type, bbox=(left, top, right, bottom)
+    )
+
+
+class AuditedBBoxTest(unittest.TestCase):
+    @staticmethod
+    def make_doc(audited_bbox):
+        with warnings.catch_warnings():
+            # statistics of an empty document
+            warnings.simplefilter("ignore")
+            return Doc([], [], audited_bbox=audited_bbox)
+
+    def test_grouped_by_page(self):
+        audited_bbox = [
+            make_bbox(1, "table", 10, 10, 100, 100),
+            make_bbox(0, "para", 10, 10, 100, 100),
+            make_bbox(1, "para", 10, 200, 100, 300),
+            make_bbox(0, "table", 10, 400, 100, 500),
+            make_bbox(1, "table", 10, 600, 100, 700),
+        ]
+        doc = self.make_doc(audited_bbox)
+        self.assertEqual(
+            doc.audited_bbox,
+            {
+                0: [audited_bbox[1], audited_bbox[3]],
+                1: [audited_bbox[0], audited_bbox[2], audited_bbox[4]],
+            },
+        )
+        self.assertEqual(
+            doc.audited_table_bbox,
+            {0: [audited_bbox[3]], 1: [audited_bbox[0], audited_bbox[4]]},
+        )
+
+    def test_block_within_table_bbox(self):
+        rng = random.Random(19)
+        audited_bbox = []
+        for _ in range(500):
+            left, top = rng.uniform(0, 500), rng.uniform(0, 700)
+            audited_bbox.append(
+                make_bbox(
+                    rng.randint(0, 9),
+                    rng.choice(["table", "para"]),
+                    left,
+                    top,
+                    left + rng.uniform(5, 300),
+                    top + rng.uniform(5, 200),
+                )
+            )
+        doc = self.make_doc(audited_bbox)
+        for _ in range(2000):
+            top, left, height = (
+                rng.uniform(0, 800),
+                rng.uniform(0, 600),
+                rng.uniform(0, 20),
+            )
+            block = {
+                "page_idx": rng.randint(0, 10),
+                "box_style": (top, left, 0, 0, height),
+            }
+            expected = any(
+                bbox.page_idx == block["page_idx"]
+                and bbox.block_type == "table"
+                and Doc.check_block_within_bound(block["box_style"], bbox.bbox)
+                for bbox in audited_bbox
+            )
+            self.assertEqual(doc.check_block_within_table_bbox(block), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
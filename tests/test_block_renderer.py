@@ -0,0 +1,67 @@
+import unittest
+
+from nlm_ingestor.ingestor.visual_ingestor.block_renderer import BlockRenderer
+
+
+class Doc:
+    def __init__(self, blocks):
+        self.blocks = blocks
+        self.line_style_classes = {
+            ("Arial", "normal", 10.0, 400, "none", 0, "left"): "cls_0"
+        }
+        self.class_levels = {}
+
+
+def make_block(page_idx, block_type, block_text, **kwargs):
+    block = {
+        "page_idx": page_idx,
+        "level": 0,
+        "block_class": "cls_0",
+        "block_type": block_type,
+        "block_text": block_text,
+        "block_idx": 0,
+        "block_sents": [block_text],
+        "cell_values": block_text.split(),
+    }
+    block.update(kwargs)
+    return block
+
+
+class BlockRendererTest(unittest.TestCase):
+    def setUp(self):
+        self.doc = Doc(
+            [
+                make_block(0, "header", "Title"),
+                make_block(0, "para", "One. Two.", block_sents=["One.", "Two."]),
+                make_block(1, "table_row", "a b", is_table_start=True),
+                make_block(1, "table_row", "c d"),
+                make_block(2, "table_row", "e f", is_table_end=True),
+                make_block(2, "list_item", "1. Item"),
+            ]
+        )
+
+    def test_render_html(self):
+        html_str = BlockRenderer(self.doc).render_html()
+        self.assertTrue(html_str.startswith("<!DOCTYPE html><html><head><style>"))
+        self.assertTrue(html_str.endswith("</html>"))
+        self.assertIn('class="cls_0 nlm_sent_0"> Title </h4>', html_str)
+        self.assertIn(
+            '<span class="nlm_sent_1">One. </span><span class="nlm_sent_2">Two.',
+            html_str,
+        )
+        self.assertIn("<td style='margin-left: 0px;' page_idx=1>c</td>", html_str)
+        self.assertEqual(html_str.count("<tr "), 3)
+        self.assertEqual(html_str.count("</tbody></table>"), 1)
+
+    def test_html_pages(self):
+        renderer = BlockRenderer(self.doc)
+        pages = list(renderer.iter_html_pages())
+        # the table that starts on page 1 is in the html of page 2 where it ends
+        self.assertEqual(len(pages), 3)
+        self.assertNotIn("<table", pages[1])
+        self.assertIn("<table", pages[2])
+        self.assertEqual("".join(renderer.iter_html()), renderer.render_html())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import json
+import unittest
+
+from nlm_ingestor.ingestor.visual_ingestor.block_renderer import BlockRenderer
+from nlm_ingestor.ingestor_utils import compact_json
+from tests.test_block_renderer import Doc, make_block
+
+
+def make_render_dict():
+    box = {"box_style": [100.0, 50.0, 0, 200.0, 12.0]}
+    blocks = [
+        make_block(0, "header", "Title", level=0, **box),
+        make_block(0, "para", "One. Two.", level=1, block_sents=["One.", "Two."]),
+        make_block(0, "header", "Section", level=1, **box),
+        make_block(1, "list_item", "1. Item", level=2, **box),
+        make_block(1, "table_row", "a b", is_table_start=True, is_header=True),
+        make_block(1, "table_row", "c", is_row_group=True, col_span=2),
+        make_block(1, "table_row", "d e", is_header_group=True, col_spans=[1, 1]),
+        make_block(2, "table_row", "f g", is_table_end=True, **box),
+        make_block(2, "header", "Other title", level=0),
+        make_block(2, "para", "Three.", level=1),
+        make_block(3, "table_row", "h i", is_table_start=True),
+    ]
+    for block_idx, block in enumerate(blocks):
+        block["block_idx"] = block_idx
+    return BlockRenderer(Doc(blocks)).render_json()
+
+
+class CompactJsonTest(unittest.TestCase):
+    def test_round_trip(self):
+        render_dict = make_render_dict()
+        compact_dict = compact_json.compact_result(render_dict)
+        self.assertEqual(compact_dict["schema_version"], 2)
+        self.assertEqual(compact_dict["classes"], ["cls_0"])
+        self.assertEqual(compact_dict["tags"], ["header", "para", "list_item", "table"])
+        # the table that does not end keeps neither rows nor bbox
+        self.assertEqual(compact_dict["tables"][1][3], None)
+        self.assertEqual(compact_dict["blocks"]["bbox"][-1], None)
+        decoded = json.loads(json.dumps(compact_dict))
+        self.assertEqual(compact_json.expand_result(decoded), render_dict)
+        self.assertLess(
+            len(json.dumps(compact_dict)), len(json.dumps(render_dict)) * 0.75
+        )
+
+    def test_dict_block_class(self):
+        # blocks of the text ingestor have {} as block class
+        render_dict = make_render_dict()
+        for block in render_dict["blocks"]:
+            block["block_class"] = {}
+        compact_dict = compact_json.compact_result(render_dict)
+        self.assertEqual(compact_dict["classes"], ["cls_0", {}])
+        self.assertEqual(compact_json.expand_result(compact_dict), render_dict)
+
+    def test_parents(self):
+        compact_dict = compact_json.compact_result(make_render_dict())
+        # Title > (para, Section > (list item, table)), Other title > (para, table)
+        self.assertEqual(compact_dict["blocks"]["parent"], [-1, 0, 0, 2, 2, -1, 5, 5])
+
+    def test_with_schema_version(self):
+        return_dict = {"num_pages": 4, "result": make_render_dict()}
+        self.assertIs(compact_json.with_schema_version(return_dict, 1), return_dict)
+        compact_dict = compact_json.with_schema_version(return_dict, 2)
+        self.assertEqual(compact_dict["num_pages"], 4)
+        self.assertEqual(compact_dict["result"]["schema_version"], 2)
+        self.assertNotIn("schema_version", return_dict["result"])
+        html_dict = {"num_pages": 4, "html": "<html></html>"}
+        self.assertIs(compact_json.with_schema_version(html_dict, 2), html_dict)
+        with self.assertRaises(ValueError):
+            compact_json.with_schema_version(return_dict, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
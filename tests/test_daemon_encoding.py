@@ -0,0 +1,67 @@
+import io
+import unittest
+from unittest import mock
+
+from nlm_ingestor.ingestion_daemon.__main__ import app
+from nlm_ingestor.ingestor import ingestor_api
+from nlm_ingestor.ingestor_utils import encoding
+
+TEXT = b"Title\n\nSome text here. More text.\n"
+
+
+class DaemonEncodingTest(unittest.TestCase):
+    def setUp(self):
+        self.client = app.test_client()
+        patcher = mock.patch.object(ingestor_api, "result_cache", False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def parse(self, accept=None, query=""):
+        return self.client.post(
+            f"/api/parseDocument{query}",
+            data={"file": (io.BytesIO(TEXT), "doc.txt")},
+            headers={"Accept": accept} if accept else {},
+        )
+
+    def test_binary_results_match_json(self):
+        json_response = self.parse()
+        self.assertEqual(json_response.mimetype, encoding.JSON_MIMETYPE)
+        for mimetype in encoding.mimetypes()[1:]:
+            for query in ["", "?schemaVersion=2"]:
+                with self.subTest(mimetype=mimetype, query=query):
+                    response = self.parse(f"{mimetype}, application/json;q=0.5", query)
+                    self.assertEqual(response.status_code, 200)
+                    self.assertEqual(response.mimetype, mimetype)
+                    self.assertEqual(
+                        encoding.decode(response.data, mimetype),
+                        self.parse(query=query).get_json(),
+                    )
+
+    def test_bad_schema_version(self):
+        for query in ["?schemaVersion=3", "?schemaVersion=abc"]:
+            with self.subTest(query=query):
+                response = self.parse(query=query)
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.get_json()["status"], "fail")
+
+    def test_error_encoding(self):
+        response = self.client.get(
+            "/api/jobs/missing/result", headers={"Accept": "application/msgpack"}
+        )
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(
+            encoding.decode(response.data, response.mimetype)["status"], "fail"
+        )
+        with mock.patch.object(
+            ingestor_api, "ingest_document", side_effect=RuntimeError("bad doc")
+        ):
+            response = self.parse("application/msgpack")
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(
+            encoding.decode(response.data, response.mimetype),
+            {"status": "fail", "reason": "bad doc"},
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import json
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from nlm_ingestor.ingestor_utils import encoding
+
+RESULT = {
+    "page_dim": [np.float64(612.0), 792.0],
+    "num_pages": np.int64(3),
+    "result": {
+        "blocks": [{"bbox": np.array([1.5, 2.0]), "sentences": ["Café."]}],
+        "styles": [],
+    },
+}
+EXPECTED = {
+    "page_dim": [612.0, 792.0],
+    "num_pages": 3,
+    "result": {"blocks": [{"bbox": [1.5, 2.0], "sentences": ["Café."]}], "styles": []},
+}
+
+
+class EncodingTest(unittest.TestCase):
+    def test_dumps(self):
+        data = encoding.dumps(RESULT, sort_keys=True)
+        self.assertIsInstance(data, bytes)
+        self.assertEqual(json.loads(data), EXPECTED)
+        self.assertEqual(encoding.loads(data), EXPECTED)
+        self.assertEqual(list(encoding.loads(data)), sorted(EXPECTED))
+
+    def test_without_orjson(self):
+        with mock.patch.object(encoding, "orjson", None):
+            data = encoding.dumps(RESULT, sort_keys=True)
+            self.assertEqual(encoding.loads(data), EXPECTED)
+            self.assertEqual(encoding.loads(data.decode("utf-8")), EXPECTED)
+
+    def test_nan(self):
+        self.assertEqual(
+            encoding.dumps([float("nan"), np.float64("nan")]), b"[null,null]"
+        )
+        with mock.patch.object(encoding, "orjson", None):
+            self.assertEqual(encoding.dumps([float("nan")]), b"[NaN]")
+
+    def test_large_int_and_int_keys(self):
+        data = encoding.dumps({"n": 2**70, 1: "one"})
+        self.assertEqual(encoding.loads(data), {"n": 2**70, "1": "one"})
+
+    def test_binary_round_trip(self):
+        self.assertEqual(encoding.mimetypes()[0], encoding.JSON_MIMETYPE)
+        for mimetype in encoding.mimetypes():
+            with self.subTest(mimetype=mimetype):
+                data = encoding.encode(RESULT, mimetype)
+                self.assertIsInstance(data, bytes)
+                self.assertEqual(encoding.decode(data, mimetype), EXPECTED)
+        with self.assertRaises(ValueError):
+            encoding.encode(RESULT, "application/xml")
+
+    def test_msgpack_fallback(self):
+        data = encoding.encode(RESULT, "application/msgpack")
+        with mock.patch.object(encoding, "ormsgpack", None):
+            self.assertEqual(encoding.encode(RESULT, "application/msgpack"), data)
+            self.assertEqual(encoding.decode(data, "application/msgpack"), EXPECTED)
+
+    def test_without_msgpack(self):
+        with mock.patch.multiple(encoding, ormsgpack=None, msgpack=None):
+            self.assertNotIn("application/msgpack", encoding.mimetypes())
+            with self.assertRaises(ValueError):
+                encoding.encode(RESULT, "application/msgpack")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,152 @@
+import random
+import unittest
+from collections import Counter, namedtuple
+
+import numpy as np
+
+from nlm_ingestor.ingestor.visual_ingestor.visual_ingestor import Doc, page_num_pattern
+from nlm_ingestor.ingestor_utils.ing_named_tuples import LocationKey
+
+
+def find_true_header_footers_by_scan(
+    hf,
+    num_pages,
+    is_footer=False,
+):
+    """
+    The pairwise scan that Doc.find_true_header_footers used before it had an index.
+    """
+
+    def get_hf_keys_with_same_text(
+        hf: dict, hf_key: namedtuple, check_page_pattern, page_pat_val
+    ):
+        m_keys = []
+        m_pages = []
+        for key in hf.keys():
+            if not check_page_pattern:
+                if page_num_pattern.search(key[2]) is not None:
+                    page_pat_val.append(key[2])
+            if (
+                abs(key[0] - hf_key[0]) < 20
+                and abs(key[1] - hf_key[1]) < 20
+                and (key[2] == hf_key[2] or key[2] in page_pat_val)
+            ):
+                m_keys.append(key)
+                m_pages.append(hf[key])
+        m_pages = [item for sublist in m_pages for item in sublist]
+        return (
+            m_keys,
+            sorted(list(dict.fromkeys(m_pages))) if len(m_pages) > 1 else m_pages,
+            True,
+            page_pat_val,
+        )
+
+    def is_footer_key_below_page_num_footer(f_key, refined_footers, footers):
+        """
+        Checks whether the footer is below the page number footers.
+        :param f_key: Footer under consideration.
+        :param refined_footers: List of all footers which will be skipped.
+        :param footers: List of all footers
+        :return: True if the footer is below the page number footers
+        """
+        f_key_pages = footers[f_key]
+        for k, pages in refined_footers.items():
+            # Page number footers will have text field == ""
+            if f_key_pages[0] in pages and k[0] <= f_key[0]:
+                return True
+        return False
+
+    result = {}
+    page_pattern_list = []
+    check_page_pattern = False
+    for hf_key in hf.keys():
+        if hf_key in result:
+            continue
+        key_with_text_added = False
+        m_key = None
+        for already_added_key in result.keys():
+            if already_added_key.text == hf_key.text:
+                key_with_text_added = True
+                m_key = already_added_key
+                break
+        if not key_with_text_added:
+            matched_keys, list_of_pages, check_page_pattern, page_pattern_list = (
+                get_hf_keys_with_same_text(
+                    hf, hf_key, check_page_pattern, page_pattern_list
+                )
+            )
+        else:
+            matched_keys = [hf_key]
+            list_of_pages = result[m_key]
+            for p in hf[hf_key]:
+                if p not in list_of_pages:
+                    list_of_pages.append(p)
+        num_matched_pages = len(list_of_pages)
+        diff_of_pages = np.diff(list_of_pages)
+        if num_matched_pages > 1 and (
+            np.mean(diff_of_pages) <= 2
+            or (
+                np.median(diff_of_pages) <= 2
+                and is_footer
+                and hf_key.text != ""
+                and is_footer_key_below_page_num_footer(hf_key, result, hf)
+            )
+            or (
+                np.median(diff_of_pages) <= 2
+                and Counter(diff_of_pages).most_common()[0][0] <= 2
+                and np.percentile(diff_of_pages, 75) <= 2
+            )
+        ):
+            if (
+                num_matched_pages > 0.5 * num_pages
+                or hf_key.text == ""
+                or (num_matched_pages > 0.2 * num_pages and max(list_of_pages) > 2)
+                or (num_matched_pages > 5 and max(list_of_pages) > 2)
+            ):
+                # 50% of pages have these OR if text is empty, this is most likely to be a footer with Page numbers
+                for key in matched_keys:
+                    if hf_key.text != "" or is_footer:
+                        result[key] = list_of_pages
+                    else:
+                        result[key] = hf[key]
+    return result
+
+
+class FindTrueHeaderFootersTest(unittest.TestCase):
+    @staticmethod
+    def random_hf(rng, num_pages):
+        texts = ["", "Page 3", "page 12 of 40", "Annual Report", "Confidential", "2021"]
+        hf = {}
+        for page_idx in range(num_pages):
+            for _ in range(rng.randint(0, 4)):
+                key = LocationKey(
+                    rng.choice([-25, 0, 15, 19, 20, 39, 40, 700, 710, 731]),
+                    rng.choice([0, 10, 19, 36, 72, 300, 305, 330]),
+                    rng.choice(texts),
+                )
+                pages = hf.setdefault(key, [])
+                if page_idx not in pages:
+                    pages.append(page_idx)
+        return hf
+
+    def test_same_as_scan(self):
+        rng = random.Random(11)
+        for _ in range(300):
+            num_pages = rng.randint(1, 30)
+            hf = self.random_hf(rng, num_pages)
+            for is_footer in (False, True):
+                expected = find_true_header_footers_by_scan(
+                    {key: list(pages) for key, pages in hf.items()},
+                    num_pages,
+                    is_footer,
+                )
+                result = Doc.find_true_header_footers(
+                    {key: list(pages) for key, pages in hf.items()},
+                    num_pages,
+                    is_footer,
+                )
+                self.assertEqual(list(result.items()), list(expected.items()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+import tempfile
+import unittest
+
+from nlm_ingestor.ingestion_daemon.job_store import (
+    JOB_DONE,
+    JOB_FAILED,
+    JOB_QUEUED,
+    JOB_RUNNING,
+    JobStore,
+)
+
+
+class JobStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.store = JobStore(self.tmp_dir.name)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_job_lifecycle(self):
+        parse_options = {"render_format": "json", "apply_ocr": False}
+        job_id, doc_location = self.store.create_job(
+            "sample.pdf", "application/pdf", parse_options, ".pdf"
+        )
+        self.assertTrue(doc_location.endswith("input.pdf"))
+        job = self.store.get_job(job_id)
+        self.assertEqual(job["status"], JOB_QUEUED)
+        self.assertEqual(job["parse_options"], parse_options)
+
+        self.store.set_status(job_id, JOB_RUNNING)
+        self.assertEqual(self.store.get_job(job_id)["status"], JOB_RUNNING)
+
+        return_dict = {"num_pages": 1, "result": {"blocks": []}}
+        self.store.save_result(job_id, return_dict)
+        self.assertEqual(self.store.get_job(job_id)["status"], JOB_DONE)
+        self.assertEqual(self.store.load_result(job_id), return_dict)
+
+    def test_store_is_persistent(self):
+        job_id, _ = self.store.create_job("sample.txt", "text/plain", {})
+        reopened = JobStore(self.tmp_dir.name)
+        self.assertEqual(reopened.get_job(job_id)["filename"], "sample.txt")
+        self.assertIsNone(reopened.get_job("unknown"))
+
+    def test_interrupted_jobs_fail(self):
+        queued_id, _ = self.store.create_job("a.txt", "text/plain", {})
+        done_id, _ = self.store.create_job("b.txt", "text/plain", {})
+        self.store.save_result(done_id, {})
+        self.assertEqual(self.store.fail_interrupted_jobs(), 1)
+        self.assertEqual(self.store.get_job(queued_id)["status"], JOB_FAILED)
+        self.assertEqual(self.store.get_job(done_id)["status"], JOB_DONE)
+
+    def test_fail_stale_jobs(self):
+        job_id, _ = self.store.create_job("a.txt", "text/plain", {})
+        self.store.set_status(job_id, JOB_RUNNING)
+        self.assertEqual(self.store.fail_stale_jobs(max_age_secs=60), 0)
+        self.assertEqual(self.store.fail_stale_jobs(max_age_secs=-1), 1)
+        job = self.store.get_job(job_id)
+        self.assertEqual(job["status"], JOB_FAILED)
+        self.assertEqual(job["reason"], "not finished after -1 seconds")
+
+    def test_purge_jobs(self):
+        job_id, _ = self.store.create_job("a.txt", "text/plain", {})
+        self.store.save_result(job_id, {})
+        self.assertEqual(self.store.purge_jobs(max_age_secs=-1), 1)
+        self.assertIsNone(self.store.get_job(job_id))
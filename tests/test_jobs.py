@@ -0,0 +1,85 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from nlm_ingestor.ingestion_daemon.job_store import (
+    JOB_DONE,
+    JOB_FAILED,
+    JOB_QUEUED,
+    JOB_RUNNING,
+    JobStore,
+)
+from nlm_ingestor.ingestion_daemon.jobs import JobManager, JobQueueFull
+from nlm_ingestor.ingestor import ingestor_api
+
+
+def ingest_or_crash(doc_name, doc_location, mime_type, **kwargs):
+    # the pool workers are forked from the test process, so they run the patch
+    if doc_name == "crash.txt":
+        os._exit(1)
+    return {"num_pages": 1}, None
+
+
+class JobManagerTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.store = JobStore(self.tmp_dir.name)
+        self.manager = JobManager(self.store, max_workers=1, max_pending=4)
+
+    def tearDown(self):
+        self.manager.shutdown()
+        self.tmp_dir.cleanup()
+
+    def submit(self, filename):
+        job_id, doc_location = self.store.create_job(filename, "text/plain", {})
+        return job_id, self.manager.submit(job_id, doc_location)
+
+    def wait_for_status(self, job_id, status):
+        for _ in range(100):
+            if self.store.get_job(job_id)["status"] == status:
+                return
+            time.sleep(0.05)
+        self.assertEqual(self.store.get_job(job_id)["status"], status)
+
+    @mock.patch.object(ingestor_api, "ingest_document", ingest_or_crash)
+    def test_dead_worker(self):
+        crashed_id, future = self.submit("crash.txt")
+        self.assertIsNotNone(future.exception(timeout=60))
+        self.wait_for_status(crashed_id, JOB_FAILED)
+        # a new pool replaces the one that lost its worker
+        job_id, future = self.submit("ok.txt")
+        future.result(timeout=60)
+        self.assertEqual(self.store.get_job(job_id)["status"], JOB_DONE)
+        self.assertEqual(self.store.load_result(job_id), {"num_pages": 1})
+
+    def test_pending_limit_is_shared(self):
+        self.store.create_job("queued.txt", "text/plain", {})
+        other_manager = JobManager(self.store, max_workers=1, max_pending=1)
+        job_id, doc_location = self.store.create_job("new.txt", "text/plain", {})
+        with self.assertRaises(JobQueueFull):
+            other_manager.submit(job_id, doc_location)
+        other_manager.shutdown()
+
+    def test_expire_jobs(self):
+        done_id, _ = self.store.create_job("done.txt", "text/plain", {})
+        self.store.save_result(done_id, {})
+        running_id, _ = self.store.create_job("running.txt", "text/plain", {})
+        self.store.set_status(running_id, JOB_RUNNING)
+        new_id, _ = self.store.create_job("new.txt", "text/plain", {})
+        with self.store._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET updated_at = updated_at - 100 WHERE job_id != ?",
+                (new_id,),
+            )
+        self.manager.job_ttl = self.manager.job_timeout = 50
+        self.manager.expire_jobs(force=True)
+        self.assertIsNone(self.store.get_job(done_id))
+        self.assertFalse(os.path.exists(self.store.job_dir(done_id)))
+        self.assertEqual(self.store.get_job(running_id)["status"], JOB_FAILED)
+        self.assertEqual(self.store.get_job(new_id)["status"], JOB_QUEUED)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+import unittest
+
+from nlm_ingestor.ingestor import line_parser as lp
+
+TEXTS = [
+    "1. Introduction",
+    "  1. Introduction ",
+    "Page 3 of 12",
+    "Total revenue $ 2,000 3,000",
+    "(a) the Company shall deliver to the Purchaser,",
+    "ARTICLE IV REPRESENTATIONS AND WARRANTIES",
+]
+
+
+class LineCacheTest(unittest.TestCase):
+    def test_same_json_as_line(self):
+        line_cache = lp.LineCache()
+        for text in TEXTS + TEXTS:
+            self.assertEqual(line_cache.get_line_json(text), lp.Line(text).to_json())
+            self.assertEqual(
+                line_cache.get_line(text).to_json(), lp.Line(text).to_json()
+            )
+
+    def test_lines_are_shared(self):
+        line_cache = lp.LineCache()
+        line = line_cache.get_line("1. Introduction")
+        self.assertIs(line_cache.get_line(" 1. Introduction  "), line)
+        self.assertIsNot(lp.get_line("1. Introduction"), line)
+        self.assertIs(lp.get_line("1. Introduction", line_cache), line)
+
+    def test_json_is_a_copy(self):
+        line_cache = lp.LineCache()
+        line_json = line_cache.get_line_json("Page 3 of 12")
+        line_json["text"] = "changed"
+        line_json["words"].pop()
+        self.assertEqual(
+            line_cache.get_line_json("Page 3 of 12"),
+            lp.Line("Page 3 of 12").to_json(),
+        )
+
+    def test_bounded(self):
+        line_cache = lp.LineCache(max_length=2)
+        first_line = line_cache.get_line(TEXTS[0])
+        line_cache.get_line(TEXTS[2])
+        line_cache.get_line(TEXTS[3])
+        self.assertEqual(len(line_cache.lines.cache), 2)
+        self.assertIsNot(line_cache.get_line(TEXTS[0]), first_line)
+
+
+if __name__ == "__main__":
+    unittest.main()
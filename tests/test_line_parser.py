@@ -515,6 +515,22 @@ class MyTest(unittest.TestCase):
         line = lp.Line("Delta Airline 'DAL' went up 7.5% today \"Nov.4\"")
         self.assertEqual(line.quoted_words, ["DAL", "Nov.4"])
 
+    def test_lazy_features(self):
+        line = lp.Line("Closing Date 12/31 of Smith's Building")
+        self.assertTrue(line.is_header)
+        self.assertIsNone(line._noun_chunks)
+        self.assertIsNone(line.words[2]._is_date_entry)
+        self.assertEqual(line.date_entry_count, 1)
+        self.assertEqual(line.noun_chunks, ["Building", "Closing Date", "Smith"])
+
+    def test_json_fields(self):
+        json_lp = lp.Line("2. Closing Date").to_json()
+        self.assertEqual(list(json_lp), list(lp.LINE_JSON_FIELDS))
+        self.assertEqual(json_lp["words"][1]["text"], "Closing")
+        self.assertNotIn("start_number", lp.Line("Closing Date").to_json())
+        json_lp = lp.Line("  ").to_json()
+        self.assertEqual(list(json_lp)[-2:], ["eff_length", "uppercase_word_count"])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+
+import numpy as np
+
+from nlm_ingestor.ingestor.visual_ingestor.line_table import LineTable, group_by_style
+from nlm_ingestor.ingestor_utils.ing_named_tuples import BoxStyle
+
+
+class LineTableTest(unittest.TestCase):
+    def setUp(self):
+        self.line_table = LineTable(3)
+        for box_style, style_id, word_count in [
+            (BoxStyle(100.0, 72.0, 200.0, 128.0, 10.0), 0, 5),
+            (BoxStyle(100.0, 210.5, 300.0, 89.5, 10.0), 0, 3),
+            (BoxStyle(112.35, 72.0, 200.0, 128.0, 10.0), 0, 4),
+            (BoxStyle(112.35, 72.0, 200.0, 128.0, 10.0), 1, -1),
+            (BoxStyle(124.7, 72.0, 200.0, 128.0, 10.0), 1, 6),
+            (BoxStyle(124.72, 72.0, 200.0, 128.0, 10.0), 1, 2),
+        ]:
+            self.line_table.append(box_style, style_id, word_count)
+        self.line_table.freeze()
+
+    def test_line_view(self):
+        line = self.line_table[1]
+        self.assertEqual(line["box_style"], BoxStyle(100.0, 210.5, 300.0, 89.5, 10.0))
+        self.assertEqual(line["word_count"], 3)
+        self.assertEqual(line["page_idx"], 3)
+        self.assertEqual(dict(self.line_table[-1])["top"], 124.72)
+        with self.assertRaises(IndexError):
+            self.line_table[6]
+
+    def test_line_gaps(self):
+        (space_style_ids, spaces), (word_space_style_ids, word_spaces) = (
+            self.line_table.gaps
+        )
+        self.assertEqual(spaces.tolist(), [12.3, 12.4])
+        self.assertEqual(space_style_ids.tolist(), [0, 1])
+        # the gap of 0.02 rounds to 0 and is dropped
+        self.assertEqual(word_spaces.tolist(), [10.5])
+        self.assertEqual(word_space_style_ids.tolist(), [0])
+        self.assertEqual(
+            self.line_table.text_lines()["word_count"].tolist(), [5, 3, 4, 6, 2]
+        )
+
+    def test_gaps_rounded_like_round(self):
+        # np.round(0.35, 1) gives 0.4, 0.35 is stored as 0.34999...
+        _, gaps = LineTable.positive_rounded_gaps(
+            np.array([0, 0]), np.array([0.35, 0.45]), np.array([True, True])
+        )
+        self.assertEqual(gaps.tolist(), [round(0.35, 1), round(0.45, 1)])
+        self.assertEqual(gaps.tolist(), [0.3, 0.5])
+
+    def test_group_by_style(self):
+        groups = group_by_style(
+            np.array([4, 2, 4, 7, 2]), np.array([1.0, 2.0, 3.0, 4.0, 5.0])
+        )
+        self.assertEqual(
+            list(groups.items()), [(4, [1.0, 3.0]), (2, [2.0, 5.0]), (7, [4.0])]
+        )
+        self.assertEqual(group_by_style(np.empty(0, dtype=np.int64), np.empty(0)), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+import unittest
+
+from bs4 import BeautifulSoup
+
+from nlm_ingestor.ingestor.visual_ingestor.page_reader import TikaPageReader
+
+XHTML = """<?xml version="1.0" encoding="UTF-8"?>
+<html xmlns="http://www.w3.org/1999/xhtml">
+<head>
+<meta name="dc:title" content="Sample &amp; Title" />
+</head>
+<body><div class="page" style="height:842.0px; width:595.0px;">
+<p style="top:10px;">Tom &amp; Jerry's \x0cfirst line</p>
+<p style="top:20px;" />
+<svg width="595.0" height="842.0"><line x1="1" y1="2" x2="3" y2="2" style="stroke:rgb(0,0,0)" /></svg></div>
+<div class="annotation"><p>not a page</p></div>
+<div class="page" style="height:842.0px; width:595.0px;">
+<p style="top:10px;">Second <b>page</b></p>
+</div>
+</body></html>"""
+
+
+class TikaPageReaderTest(unittest.TestCase):
+    def test_pages_match_html_parser(self):
+        reader = TikaPageReader(XHTML)
+        pages = list(reader)
+        soup = BeautifulSoup(XHTML.replace("\x0c", " "), "html.parser")
+        expected_pages = soup.find_all("div", class_="page")
+        self.assertEqual(len(pages), len(expected_pages))
+        for page, expected_page in zip(pages, expected_pages):
+            self.assertEqual(page.attrs["style"], expected_page.attrs["style"])
+            self.assertEqual(
+                [(p.text, p.get("style")) for p in page.find_all("p")],
+                [(p.text, p.get("style")) for p in expected_page.find_all("p")],
+            )
+        lines = pages[0].find("svg").find_all("line")
+        self.assertEqual(lines[0]["x2"], "3")
+        self.assertEqual(
+            reader.meta_tags, [{"name": "dc:title", "content": "Sample & Title"}]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+import os
+import unittest
+from unittest import mock
+
+from nlm_ingestor.ingestor import pdf_ingestor
+
+
+def make_p(text, top, left=72.0, font_weight="normal", font_size=10.0):
+    words = text.split()
+    start_positions, end_positions, word_fonts = [], [], []
+    word_left = left
+    for word in words:
+        word_right = word_left + 5.0 * len(word)
+        start_positions.append(f"({word_left:.2f},{top})")
+        end_positions.append(f"({word_right:.2f},{top})")
+        word_fonts.append(
+            f"(Arial,{font_weight},normal,{font_size},{font_size * 1.4},2.5)"
+        )
+        word_left = word_right + 2.5
+    style = (
+        f"height:8.0;margin-top: 0px;font-size:{font_size}px;font-family:Arial;"
+        f"font-style:normal;font-weight:{font_weight};top:{top}px;"
+        f"position:absolute;text-indent:{left}px;"
+        f"word-start-positions:[{', '.join(start_positions)}];"
+        f"word-end-positions:[{', '.join(end_positions)}];"
+        f"word-fonts:[{', '.join(word_fonts)}]"
+    )
+    return f'<p style="{style}">{text}</p>'
+
+
+def make_tika_doc(num_pages):
+    pages = []
+    for page_idx in range(num_pages):
+        lines = [make_p("Annual Report of the Company", 40.0)]
+        lines.append(make_p(f"Section {page_idx + 1}", 150.0, font_weight="bold"))
+        for line_idx in range(8):
+            lines.append(
+                make_p(
+                    f"Line {line_idx} of page {page_idx} with some text in it.",
+                    170.0 + 14.0 * line_idx,
+                )
+            )
+        lines.append(make_p(f"Page {page_idx + 1}", 760.0, left=290.0))
+        pages.append(
+            '<div class="page" style="height:792.0px; width:612.0px;">'
+            + "".join(lines)
+            + "</div>"
+        )
+    content = (
+        '<html xmlns="http://www.w3.org/1999/xhtml"><head>'
+        '<meta name="dc:title" content="Report" /></head><body>'
+        + "".join(pages)
+        + "</body></html>"
+    )
+    return {"content": content}
+
+
+class ParallelPagesTest(unittest.TestCase):
+    def parse(self, page_workers):
+        env = {"PDF_PAGE_WORKERS": str(page_workers), "PDF_PAGE_CHUNK_SIZE": "2"}
+        with mock.patch.dict(os.environ, env):
+            blocks, block_texts, sents, file_data, result, page_dim, num_pages = (
+                pdf_ingestor.parse_blocks(make_tika_doc(7), render_format="json")
+            )
+        return block_texts, sents, result, page_dim, num_pages
+
+    def test_same_as_sequential(self):
+        sequential = self.parse(1)
+        # the running header is found across the pages and only kept once
+        self.assertEqual(sequential[0].count("Annual Report of the Company"), 1)
+        self.assertIn("Section 7", sequential[0])
+        self.assertEqual(self.parse(3), sequential)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,35 @@
+import json
+import unittest
+
+from nlm_ingestor.ingestor import pdf_ingestor
+from tests.test_parallel_pages import make_tika_doc
+
+
+class ParsedBlocksTest(unittest.TestCase):
+    def test_outputs_are_lazy(self):
+        parsed_blocks = pdf_ingestor.parse_blocks(make_tika_doc(3))
+        parsed_doc = parsed_blocks.parsed_doc
+        document = parsed_blocks.json_result["document"]
+        self.assertTrue(document["blocks"])
+        # only the json is rendered, and the blocks are not split into sentences
+        self.assertIsNone(parsed_doc._html_str)
+        self.assertIsNone(parsed_blocks._sents)
+        self.assertIsNone(parsed_blocks._file_data)
+
+    def test_unpack(self):
+        parsed_blocks = pdf_ingestor.parse_blocks(make_tika_doc(3))
+        blocks, block_texts, sents, file_data, result, page_dim, num_pages = (
+            parsed_blocks
+        )
+        self.assertIs(blocks, parsed_blocks.parsed_doc.blocks)
+        self.assertIn("Section 3", block_texts)
+        self.assertIn("Section 3", sents)
+        self.assertEqual([json.loads(data) for data in file_data], result)
+        self.assertEqual(result[1]["document"], parsed_blocks.parsed_doc.json_dict)
+        self.assertTrue(result[0]["text"].startswith("<!DOCTYPE html>"))
+        self.assertEqual(page_dim, [612.0, 792.0])
+        self.assertEqual(num_pages, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,30 @@
+import os
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from nlm_ingestor.file_parser.tika_parser import (
+    TIKA_MODE_REPLAY,
+    get_recorded_documents,
+    get_tika_mode,
+)
+from nlm_ingestor.ingestor.pdf_ingestor import PDFIngestor
+
+PDF_DIR = Path("files/pdf")
+
+
+class PDFReplayTest(unittest.TestCase):
+    def test_parse_recorded_pdfs(self):
+        recorded_pdfs = [Path(path) for path in get_recorded_documents(str(PDF_DIR))]
+        if not recorded_pdfs:
+            message = "no tika recordings in files/tika, run make fixtures"
+            # make test-replay runs the tests only for the recordings
+            if get_tika_mode() == TIKA_MODE_REPLAY:
+                self.fail(message)
+            self.skipTest(message)
+        with mock.patch.dict(os.environ, {"TIKA_MODE": "replay"}):
+            for pdf_file in recorded_pdfs:
+                with self.subTest(pdf=pdf_file.name):
+                    ingestor = PDFIngestor(str(pdf_file), {"render_format": "all"})
+                    self.assertGreater(len(ingestor.blocks), 0)
+                    self.assertIn("result", ingestor.return_dict)
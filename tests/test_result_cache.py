@@ -0,0 +1,102 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from nlm_ingestor.ingestor import ingestor_api
+from nlm_ingestor.ingestor_utils.result_cache import (
+    ResultCache,
+    normalize_parse_options,
+)
+
+
+class ResultCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.doc_location = os.path.join(self.tmp_dir.name, "doc.txt")
+        with open(self.doc_location, "w") as file:
+            file.write("Some document text.")
+        self.cache_dir = os.path.join(self.tmp_dir.name, "cache")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_normalize_parse_options(self):
+        self.assertEqual(
+            normalize_parse_options(None),
+            normalize_parse_options(
+                {
+                    "render_format": "all",
+                    "apply_ocr": False,
+                    "parse_pages": (),
+                    "parse_and_render_only": True,
+                }
+            ),
+        )
+
+    def test_key_depends_on_options_and_version(self):
+        cache = ResultCache("v1", cache_dir=self.cache_dir)
+        key = cache.make_key(self.doc_location, "text/plain", {})
+        self.assertEqual(key, cache.make_key(self.doc_location, "text/plain", {}))
+        self.assertNotEqual(
+            key,
+            cache.make_key(self.doc_location, "text/plain", {"render_format": "json"}),
+        )
+        self.assertNotEqual(
+            key,
+            ResultCache("v2", cache_dir=self.cache_dir).make_key(
+                self.doc_location, "text/plain", {}
+            ),
+        )
+
+    def test_memory_and_disk_tiers(self):
+        cache = ResultCache("v1", cache_dir=self.cache_dir)
+        key = cache.make_key(self.doc_location, "text/plain", {})
+        self.assertIsNone(cache.get(key))
+        return_dict = {"result": {"blocks": [{"sentences": ["Some document text."]}]}}
+        cache.put(key, return_dict)
+        self.assertEqual(cache.get(key), return_dict)
+        # a new process only sees the disk tier
+        cache = ResultCache("v1", cache_dir=self.cache_dir)
+        self.assertEqual(cache.get(key), return_dict)
+        self.assertEqual(cache.get(key), return_dict)
+        stats = cache.stats()
+        self.assertEqual(stats["disk_hits"], 1)
+        self.assertEqual(stats["memory_hits"], 1)
+        self.assertEqual(stats["misses"], 0)
+
+    def test_disk_eviction(self):
+        cache = ResultCache("v1", max_entries=0, cache_dir=self.cache_dir, max_bytes=1)
+        cache.put("a", {"result": "a"})
+        cache.put("b", {"result": "b"})
+        self.assertIsNone(cache.get("a"))
+        self.assertGreaterEqual(cache.stats()["disk_evictions"], 1)
+
+    def test_results_are_copies(self):
+        cache = ResultCache("v1")
+        return_dict = {"result": {"blocks": [{"sentences": ["Text."]}]}}
+        cache.put("a", return_dict)
+        return_dict["result"]["blocks"].clear()
+        cached = cache.get("a")
+        self.assertEqual(cached["result"]["blocks"], [{"sentences": ["Text."]}])
+        cached["result"]["blocks"].clear()
+        self.assertEqual(cache.get("a")["result"]["blocks"], [{"sentences": ["Text."]}])
+
+    def test_ingest_document_cache(self):
+        def ingest(use_cache=False):
+            # ingest_document deletes the document once it is parsed
+            with open(self.doc_location, "w") as file:
+                file.write("Some document text.")
+            return ingestor_api.ingest_document(
+                "doc.txt", self.doc_location, "text/plain", use_cache=use_cache
+            )
+
+        with mock.patch.object(ingestor_api, "result_cache", ResultCache("v1")):
+            return_dict, ingestor = ingest(use_cache=True)
+            self.assertIsNotNone(ingestor)
+            cached_dict, ingestor = ingest(use_cache=True)
+            self.assertEqual(cached_dict, return_dict)
+            self.assertIsNone(ingestor)
+            # callers that need the ingestor leave the cache off
+            self.assertIsNotNone(ingest()[1])
+            self.assertEqual(ingestor_api.result_cache.stats()["memory_hits"], 1)
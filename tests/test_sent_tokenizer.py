@@ -1,6 +1,10 @@
+import os
+import re
 import unittest
+from unittest import mock
 
-from nlm_ingestor.ingestor_utils.utils import sent_tokenize
+from nlm_ingestor.ingestor_utils import utils
+from nlm_ingestor.ingestor_utils.utils import AbbreviationRuleFinder, sent_tokenize
 
 
 class PreProcessingTests(unittest.TestCase):
@@ -20,3 +24,59 @@ class PreProcessingTests(unittest.TestCase):
             sentences = sent_tokenize(text)
             expected = [text]
             self.assertEquals(sentences, expected)
+
+    def test_matching_abbreviation_rules(self):
+        """
+        only the rules that match are applied, which gives the same text as applying
+        all of them in order
+        """
+        abbs = ["no", "n.a", "u.s", "u.s.a", "fig", "sec", "a", "e.g", "i.e"]
+        rules = []
+        rule_abbs = []
+        for abb in abbs:
+            rules.append((re.compile(rf"^{abb}.\s", re.IGNORECASE), f"{abb}_ "))
+            rule_abbs.append((True, abb))
+            rules.append((re.compile(rf"\s{abb}.\s", re.IGNORECASE), f" {abb}_ "))
+            rule_abbs.append((False, abb))
+        finder = AbbreviationRuleFinder(rules, rule_abbs)
+        texts = [
+            "Fig. 2 shows a U.S.A. map.",
+            "not valid NOT now. No. 3 and no. 4",
+            "a. b. e.g. i.e. sec. fig.",
+            "A U.S. N.A. bank",
+            "nothing to see here",
+            "",
+        ]
+        for text in texts:
+            all_rules_text = text
+            for rule, replaced in rules:
+                all_rules_text = rule.sub(replaced, all_rules_text)
+            matching_rules_text = text
+            for rule, replaced in finder.matching_rules(text):
+                matching_rules_text = rule.sub(replaced, matching_rules_text)
+            self.assertEqual(matching_rules_text, all_rules_text)
+        self.assertEqual(finder.matching_rules("nothing to see here"), [])
+
+    def test_batch_sent_tokenize(self):
+        texts = [
+            "Fig. 2 shows a U.S.A. map. It is big.",
+            "",
+            "Page 1 of 3",
+            "Fig. 2 shows a U.S.A. map. It is big.",
+            "The item at issue is no. 3553. See below.",
+        ]
+        expected = [sent_tokenize(text) for text in texts]
+        self.assertEqual(utils.batch_sent_tokenize(texts), expected)
+        self.assertIn(texts[0], utils.sent_cache)
+        # cached sentences are copied, changing them does not change the cache
+        batch_sents = utils.batch_sent_tokenize(texts)
+        batch_sents[0].pop()
+        self.assertEqual(utils.cached_sent_tokenize(texts[0]), expected[0])
+        self.assertEqual(utils.batch_sent_tokenize(texts), expected)
+        # in a process pool
+        pool_texts = [text + " More text." for text in texts if text]
+        with mock.patch.dict(os.environ, {"SENT_TOKENIZE_POOL_MIN_TEXTS": "2"}):
+            self.assertEqual(
+                utils.batch_sent_tokenize(pool_texts, workers=2),
+                [sent_tokenize(text) for text in pool_texts],
+            )
@@ -0,0 +1,72 @@
+import threading
+import unittest
+
+from nlm_ingestor.benchmarks.pdf_benchmark import compare_results
+from nlm_ingestor.ingestor_utils import stage_timer
+
+
+class StageTimerTest(unittest.TestCase):
+    def test_no_recorder(self):
+        with stage_timer.stage("render_json"):
+            pass
+        self.assertIsNone(stage_timer._recorder.get())
+
+    def test_nested_stages(self):
+        with stage_timer.StageRecorder(trace_memory=True) as recorder:
+            with stage_timer.stage("outer"):
+                for _ in range(3):
+                    with stage_timer.stage("inner"):
+                        data = [0] * 500000
+                del data
+        self.assertIsNone(stage_timer._recorder.get())
+        self.assertEqual(recorder.stages["inner"]["calls"], 3)
+        self.assertEqual(recorder.stages["outer"]["calls"], 1)
+        self.assertGreaterEqual(
+            recorder.stages["outer"]["wall_ms"], recorder.stages["inner"]["wall_ms"]
+        )
+        # the list of 500000 pointers takes about 3.8MB
+        self.assertGreater(recorder.stages["inner"]["peak_mem_mb"], 3)
+        self.assertGreaterEqual(
+            recorder.stages["outer"]["peak_mem_mb"],
+            recorder.stages["inner"]["peak_mem_mb"],
+        )
+
+    def test_other_threads(self):
+        def run_stage():
+            with stage_timer.stage("thread"):
+                pass
+
+        with stage_timer.StageRecorder() as recorder:
+            thread = threading.Thread(target=run_stage)
+            thread.start()
+            thread.join()
+            with stage_timer.stage("main"):
+                pass
+        self.assertEqual(list(recorder.stages), ["main"])
+
+
+class CompareResultsTest(unittest.TestCase):
+    @staticmethod
+    def results(wall_ms, peak_mem_mb):
+        stats = {"calls": 1, "wall_ms": wall_ms, "peak_mem_mb": peak_mem_mb}
+        return {"documents": {"doc.pdf": {"num_pages": 1, "stages": {"total": stats}}}}
+
+    def test_regressions(self):
+        baseline = self.results(1000, 100)
+        self.assertEqual(compare_results(baseline, self.results(1100, 110)), [])
+        self.assertEqual(
+            compare_results(baseline, self.results(1500, 100)),
+            [("doc.pdf", "total", "wall_ms", 1000, 1500)],
+        )
+        self.assertEqual(
+            compare_results(baseline, self.results(900, 150)),
+            [("doc.pdf", "total", "peak_mem_mb", 100, 150)],
+        )
+
+    def test_noise_floor(self):
+        baseline = self.results(2, 0.1)
+        self.assertEqual(compare_results(baseline, self.results(6, 0.5)), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
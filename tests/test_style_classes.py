@@ -0,0 +1,75 @@
+import random
+import unittest
+import warnings
+
+from nlm_ingestor.ingestor.visual_ingestor.visual_ingestor import Doc
+from nlm_ingestor.ingestor_utils.ing_named_tuples import LineStyle
+
+
+def get_class_by_scan(line_style_classes, class_line_styles, line_style):
+    """
+    The linear scan that Doc.get_class used before it had an index.
+    """
+    match_line_style = None
+    for key in line_style_classes:
+        if (
+            line_style[0] == key[0]
+            and line_style[1] == key[1]
+            and line_style[2] == key[2]
+            and line_style[3] == key[3]
+            and line_style[4] == key[4]
+            and abs(line_style[5] - key[5]) < 1.0
+            and line_style[6] == key[6]
+        ):
+            match_line_style = key
+            break
+    if match_line_style is not None:
+        class_name = line_style_classes[match_line_style]
+        line_style_classes[line_style] = class_name
+    else:
+        class_name = f"cls_{len(line_style_classes.keys())}"
+        line_style_classes[line_style] = class_name
+        class_line_styles[class_name] = line_style
+    return class_name
+
+
+class GetClassTest(unittest.TestCase):
+    def setUp(self):
+        with warnings.catch_warnings():
+            # statistics of an empty document
+            warnings.simplefilter("ignore")
+            self.doc = Doc([], [])
+
+    def test_same_classes_as_scan(self):
+        rng = random.Random(7)
+        line_style_classes = {}
+        class_line_styles = {}
+        for _ in range(5000):
+            line_style = LineStyle(
+                rng.choice(["Arial", "Times", "Courier"]),
+                rng.choice(["normal", "italic"]),
+                rng.choice([9.6, 10.8, 12.0, 14.4]),
+                rng.choice([400, 600]),
+                "none",
+                round(rng.uniform(0, 6), 2),
+                "left",
+            )
+            self.assertEqual(
+                self.doc.get_class(line_style),
+                get_class_by_scan(line_style_classes, class_line_styles, line_style),
+            )
+        self.assertEqual(
+            list(self.doc.line_style_classes.items()), list(line_style_classes.items())
+        )
+        self.assertEqual(self.doc.class_line_styles, class_line_styles)
+
+    def test_nan_styles_never_match(self):
+        line_style = LineStyle(
+            "Arial", "normal", 12.0, 400, "none", float("nan"), "left"
+        )
+        self.assertEqual(self.doc.get_class(line_style), "cls_0")
+        self.assertEqual(self.doc.get_class(line_style), "cls_1")
+
+
+if __name__ == "__main__":
+    unittest.main()
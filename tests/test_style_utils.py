@@ -0,0 +1,81 @@
+import unittest
+
+from nlm_ingestor.benchmarks.style_benchmark import parse_tika_style_reference
+from nlm_ingestor.ingestor.visual_ingestor import style_utils
+
+
+def make_style(start_positions, end_positions, word_fonts, font_family="Arial"):
+    return (
+        "height:8.0;margin-top: 0px;font-size:10.0px;"
+        f"font-family:{font_family};font-style:normal;font-weight:bold;"
+        "top:100.5px;position:absolute;text-indent:72.0px;"
+        f"word-start-positions:[{', '.join(start_positions)}];"
+        f"word-end-positions:[{', '.join(end_positions)}];"
+        f"word-fonts:[{', '.join(word_fonts)}]"
+    )
+
+
+class ParseTikaStyleTest(unittest.TestCase):
+    def assert_same_as_reference(self, style_str, text_str):
+        self.assertEqual(
+            style_utils.parse_tika_style(style_str, text_str, 612.0),
+            parse_tika_style_reference(style_str, text_str, 612.0),
+        )
+
+    def test_same_as_reference(self):
+        fonts = [
+            "(Arial,bold,normal,10.0,14.0,2.5)",
+            "(Arial-Italic,normal,italic,9.0,12.6,2.25)",
+        ]
+        style_str = make_style(
+            ["(72.0,100.5)", "(110.25,100.5)"],
+            ["(105.5,100.5)", "(150.75,100.5)"],
+            fonts,
+        )
+        self.assert_same_as_reference(style_str, "Section one")
+
+    def test_end_before_start(self):
+        fonts = ["(Arial,bold,normal,10.0,14.0,2.5)"] * 2
+        # last word starts after the reported end
+        style_str = make_style(
+            ["(72.0,100.5)", "(110.25,100.5)"], ["(105.5,100.5)", "(60.0,100.5)"], fonts
+        )
+        self.assert_same_as_reference(style_str, "Section one")
+        # last word starts before the first one
+        style_str = make_style(
+            ["(72.0,100.5)", "(50.0,100.5)"], ["(105.5,100.5)", "(60.0,100.5)"], fonts
+        )
+        self.assert_same_as_reference(style_str, "Section one")
+
+    def test_font_family_with_comma(self):
+        style_str = make_style(
+            ["(72.0,100.5)"],
+            ["(105.5,100.5)"],
+            ["(Times,Bold,bold,normal,10.0,14.0,2.5)"],
+            font_family="Times,Bold",
+        )
+        self.assert_same_as_reference(style_str, "Section")
+
+    def test_styles_are_interned(self):
+        fonts = ["(Arial,bold,normal,10.0,14.0,2.5)"] * 2
+        first = style_utils.parse_tika_style(
+            make_style(["(72.0,100.5)"] * 2, ["(105.5,100.5)"] * 2, fonts), "a b", 612.0
+        )
+        second = style_utils.parse_tika_style(
+            make_style(["(72.0,200.5)"] * 2, ["(95.5,200.5)"] * 2, fonts), "c d", 612.0
+        )
+        self.assertIs(first[1], second[1])
+        self.assertIs(first[2][0], second[2][1])
+
+    def test_style_caches(self):
+        word_font = "Courier,normal,normal,7.0,9.0,1.5"
+        word_style = style_utils.get_word_line_style(word_font, "Courier")
+        self.assertIs(style_utils.get_word_line_style(word_font, "Courier"), word_style)
+        # the word styles and the line styles are cached apart
+        self.assertIn((word_font, "Courier"), style_utils.word_style_cache)
+        self.assertNotIn(word_style, style_utils.word_style_cache)
+        self.assertNotIn(word_style, style_utils.line_style_cache)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,135 @@
+import random
+import unittest
+
+from nlm_ingestor.ingestor.visual_ingestor.svg_lines import SvgRectIndex, SvgRulingIndex
+from nlm_ingestor.ingestor.visual_ingestor.visual_ingestor import Doc
+
+
+def check_line_between_box_styles_by_scan(
+    prev_blk_box_style,
+    curr_blk_box_style,
+    lines_tag_list,
+    check_gap=False,
+    x_axis_relaxed=False,
+):
+    """
+    The scan over the page lines that Doc.check_line_between_box_styles used before
+    the lines were indexed.
+    """
+    ret_val = False
+    if prev_blk_box_style and curr_blk_box_style and lines_tag_list:
+        top1 = prev_blk_box_style[0]
+        bottom1 = top1 + prev_blk_box_style[4]
+        left1 = prev_blk_box_style[1]
+        right1 = prev_blk_box_style[2]
+        top2 = curr_blk_box_style[0]
+        left2 = curr_blk_box_style[1]
+        right2 = curr_blk_box_style[2]
+
+        for line in lines_tag_list:
+            line_x1 = float(line["x1"])
+            line_x2 = float(line["x2"])
+            line_y1 = float(line["y1"])
+            if (
+                bottom1 <= line_y1 <= (top2 + 2.0)
+                and line_x1 <= left1 <= line_x2
+                and line_x1 <= left2 <= line_x2
+                and line_x1 < right1 <= line_x2
+                and line_x1 < right2 <= line_x2
+            ):
+                if check_gap:
+                    if abs(abs(line_y1 - bottom1) - abs(top2 - line_y1)) < 2.0:
+                        ret_val = True
+                else:
+                    ret_val = True
+                break
+            elif (
+                x_axis_relaxed
+                and bottom1 <= line_y1 <= (top2 + 2.0)
+                and line_x1 <= left1 < line_x2
+                and line_x1 < right1 <= line_x2
+            ):
+                if check_gap:
+                    if abs(abs(line_y1 - bottom1) - abs(top2 - line_y1)) < 2.0:
+                        ret_val = True
+                else:
+                    ret_val = True
+                break
+    return ret_val
+
+
+def random_box(rng):
+    top = rng.choice(range(0, 100, 5))
+    left = rng.choice(range(0, 100, 10))
+    right = left + rng.choice(range(10, 60, 10))
+    return top, left, right, right - left, rng.choice([4, 5, 10])
+
+
+class SvgIndexTest(unittest.TestCase):
+    def test_line_between_box_styles(self):
+        rng = random.Random(13)
+        for _ in range(200):
+            lines = []
+            for _ in range(rng.randint(0, 20)):
+                x1 = rng.choice(range(0, 100, 10))
+                y1 = rng.choice(range(0, 110, 3))
+                x2 = x1 + rng.choice([20, 50, 100])
+                lines.append({"x1": x1, "y1": y1, "x2": x2, "y2": y1})
+            line_index = SvgRulingIndex(lines)
+            for _ in range(20):
+                prev_box, curr_box = random_box(rng), random_box(rng)
+                for check_gap in (False, True):
+                    for x_axis_relaxed in (False, True):
+                        args = (prev_box, curr_box)
+                        kwargs = {
+                            "check_gap": check_gap,
+                            "x_axis_relaxed": x_axis_relaxed,
+                        }
+                        expected = check_line_between_box_styles_by_scan(
+                            *args, lines, **kwargs
+                        )
+                        self.assertEqual(
+                            Doc.check_line_between_box_styles(
+                                *args, line_index, **kwargs
+                            ),
+                            expected,
+                        )
+                        self.assertEqual(
+                            Doc.check_line_between_box_styles(*args, lines, **kwargs),
+                            expected,
+                        )
+
+    def test_rect_contains_box(self):
+        rng = random.Random(17)
+        for _ in range(200):
+            rects = []
+            for _ in range(rng.randint(0, 10)):
+                rects.append(
+                    {
+                        "x": str(rng.choice(range(0, 100, 10))),
+                        "y": str(rng.choice(range(0, 100, 5))),
+                        "width": str(rng.choice([20, 50, 100])),
+                        "height": str(rng.choice([10, 20, 40])),
+                    }
+                )
+            rect_index = SvgRectIndex(rects)
+            for _ in range(20):
+                box = random_box(rng)
+                expected = False
+                for rect in rects:
+                    rect_left = float(rect["x"])
+                    rect_top = float(rect["y"])
+                    rect_bottom = rect_top + float(rect["height"])
+                    rect_right = rect_left + float(rect["width"])
+                    if (
+                        rect_top <= box[0] <= rect_bottom
+                        and rect_left <= box[1] <= rect_right
+                        and box[0] + box[4] <= rect_bottom
+                        and box[2] <= rect_right
+                    ):
+                        expected = True
+                self.assertEqual(rect_index.contains_box(box), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,31 @@
+import random
+import unittest
+
+from nlm_ingestor.benchmarks.svg_benchmark import (
+    dedupe,
+    dedupe_reference,
+    make_page_segments,
+)
+
+
+class SvgLineMergerTest(unittest.TestCase):
+    def test_same_lines_as_scan(self):
+        segments = make_page_segments(2000, seed=3)
+        self.assertEqual(dedupe(segments), dedupe_reference(segments))
+
+    def test_crowded_segments(self):
+        rng = random.Random(5)
+        coordinates = [0.0, 0.4, 0.9, 1.0, 1.5, 2.0, 2.7, 3.0, float("nan")]
+        for _ in range(200):
+            segments = []
+            for _ in range(60):
+                x1, y1 = rng.choice(coordinates), rng.choice(coordinates)
+                # mostly horizontal or vertical, some reversed or slightly slanted
+                x2 = x1 + rng.choice([0, 0.5, -1.5, 2.0])
+                y2 = y1 + rng.choice([0, 0.3, -2.0, 1.0])
+                segments.append((x1, y1, x2, y2, ""))
+            self.assertEqual(repr(dedupe(segments)), repr(dedupe_reference(segments)))
+
+
+if __name__ == "__main__":
+    unittest.main()
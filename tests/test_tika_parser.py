@@ -0,0 +1,82 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from nlm_ingestor.file_parser import tika_parser
+
+
+class TikaCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.env = mock.patch.dict(
+            os.environ, {"TIKA_CACHE_DIR": os.path.join(self.tmp_dir.name, "tika")}
+        )
+        self.env.start()
+        self.pdf_location = os.path.join(self.tmp_dir.name, "doc.pdf")
+        with open(self.pdf_location, "wb") as file:
+            file.write(b"%PDF-1.4 fake")
+
+    def tearDown(self):
+        self.env.stop()
+        self.tmp_dir.cleanup()
+
+    def test_ocr_and_text_outputs_cached_separately(self):
+        parsed = {"status": 200, "metadata": {}, "content": "<html></html>"}
+        ocr_parsed = {"status": 200, "metadata": {}, "content": "<html>ocr</html>"}
+        file_parser = tika_parser.TikaFileParser()
+        with mock.patch.object(
+            tika_parser.parser, "from_file", side_effect=[parsed, ocr_parsed]
+        ) as from_file:
+            self.assertEqual(file_parser.parse_to_html(self.pdf_location), parsed)
+            self.assertEqual(
+                file_parser.parse_to_html(self.pdf_location, do_ocr=True), ocr_parsed
+            )
+            self.assertEqual(file_parser.parse_to_html(self.pdf_location), parsed)
+            self.assertEqual(
+                file_parser.parse_to_html(self.pdf_location, do_ocr=True), ocr_parsed
+            )
+            self.assertEqual(from_file.call_count, 2)
+
+    def test_failed_calls_are_not_cached(self):
+        failed = {"status": 500, "metadata": None, "content": None}
+        file_parser = tika_parser.TikaFileParser()
+        with mock.patch.object(
+            tika_parser.parser, "from_file", return_value=failed
+        ) as from_file:
+            file_parser.parse_to_html(self.pdf_location)
+            file_parser.parse_to_html(self.pdf_location)
+            self.assertEqual(from_file.call_count, 2)
+
+
+class TikaRecordReplayTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.pdf_location = os.path.join(self.tmp_dir.name, "doc.pdf")
+        with open(self.pdf_location, "wb") as file:
+            file.write(b"%PDF-1.4 fake")
+        self.env = {
+            "TIKA_CACHE": "no",
+            "TIKA_RECORDINGS_DIR": os.path.join(self.tmp_dir.name, "recordings"),
+        }
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_record_then_replay(self):
+        parsed = {"status": 200, "metadata": {}, "content": "<html></html>"}
+        with mock.patch.dict(os.environ, dict(self.env, TIKA_MODE="record")):
+            with mock.patch.object(
+                tika_parser.parser, "from_file", return_value=parsed
+            ):
+                tika_parser.TikaFileParser().parse_to_html(self.pdf_location)
+        with mock.patch.dict(os.environ, dict(self.env, TIKA_MODE="replay")):
+            with mock.patch.object(tika_parser.parser, "from_file") as from_file:
+                replayed = tika_parser.TikaFileParser().parse_to_html(self.pdf_location)
+                from_file.assert_not_called()
+        self.assertEqual(replayed, parsed)
+
+    def test_replay_without_recording(self):
+        with mock.patch.dict(os.environ, dict(self.env, TIKA_MODE="replay")):
+            with self.assertRaises(FileNotFoundError):
+                tika_parser.TikaFileParser().parse_to_html(self.pdf_location)